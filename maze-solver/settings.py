@@ -12,6 +12,7 @@ https://docs.djangoproject.com/en/3.2/ref/settings/
 import logging
 import logging.config
 import os
+import tempfile
 
 from pathlib import Path
 from datetime import timedelta
@@ -91,12 +92,39 @@ WSGI_APPLICATION = "maze-solver.wsgi.application"
 # Database
 # https://docs.djangoproject.com/en/3.2/ref/settings/#databases
 
+# The backend and its options come from the environment. DATABASE_ENGINE is
+# sqlite3, the default, or postgresql, where JSON fields are stored as JSONB.
+DATABASE_ENGINE = os.environ.get("DATABASE_ENGINE", "sqlite3")
 DATABASES = {
     "default": {
-        "ENGINE": "django.db.backends.sqlite3",
-        "NAME": BASE_DIR / "db.sqlite3",
+        "ENGINE": f"django.db.backends.{DATABASE_ENGINE}",
+        "NAME": os.environ.get(
+            "DATABASE_NAME", BASE_DIR / "db.sqlite3" if DATABASE_ENGINE == "sqlite3" else "maze_solver"
+        ),
+        "USER": os.environ.get("DATABASE_USER", ""),
+        "PASSWORD": os.environ.get("DATABASE_PASSWORD", ""),
+        "HOST": os.environ.get("DATABASE_HOST", ""),
+        "PORT": os.environ.get("DATABASE_PORT", ""),
+        # Seconds a connection is kept open for the next requests of a worker.
+        "CONN_MAX_AGE": int(os.environ.get("DATABASE_CONN_MAX_AGE", "60")),
+        "OPTIONS": {},
     }
 }
+if DATABASE_ENGINE == "sqlite3":
+    # Seconds a write waits for the one in progress instead of failing with
+    # "database is locked".
+    DATABASES["default"]["OPTIONS"]["timeout"] = float(os.environ.get("DATABASE_BUSY_TIMEOUT", "20"))
+# Run on every new SQLite connection, see mazes.db. In WAL mode readers go on
+# while a process writes and a commit appends to the log instead of
+# rewriting pages, which with synchronous=normal is only synced at
+# checkpoints.
+SQLITE_PRAGMAS = {
+    "journal_mode": os.environ.get("SQLITE_JOURNAL_MODE", "wal"),
+    "synchronous": "normal",
+    "temp_store": "memory",
+    "cache_size": -16384,
+    "mmap_size": 256 * 1024 * 1024,
+}
 
 
 # Password validation
@@ -218,3 +246,40 @@ JWT_AUTH = {
     "JWT_AUTH_HEADER_PREFIX": "Bearer",
     "JWT_AUTH_COOKIE": None,
 }
+
+# "sync" solves a maze within the request that creates it. "async" saves it
+# as pending and answers 202, leaving it to `python manage.py solve_mazes`.
+MAZE_SOLVE_MODE = os.environ.get("MAZE_SOLVE_MODE", "sync")
+# Seconds after which a maze still running is given to another worker.
+MAZE_SOLVE_TIMEOUT = int(os.environ.get("MAZE_SOLVE_TIMEOUT", "600"))
+# Bytes of packed paths kept by each process in the in-memory front of the
+# solution cache.
+MAZE_SOLUTION_CACHE_SIZE = int(os.environ.get("MAZE_SOLUTION_CACHE_SIZE", str(64 * 1024 * 1024)))
+# Seconds a shared cache may serve a solved maze's solution, paths or
+# reachable cells before revalidating them with their ETag.
+MAZE_SOLUTION_MAX_AGE = int(os.environ.get("MAZE_SOLUTION_MAX_AGE", "60"))
+# Cache of solution responses and first pages of maze lists, which must be
+# shared by every worker for a change to invalidate them in all: files in a
+# directory every worker of the host shares by default, or any other Django
+# cache backend and its location, for instance
+# django.core.cache.backends.memcached.PyMemcacheCache and host:port.
+CACHES = {
+    "default": {
+        "BACKEND": os.environ.get("CACHE_BACKEND", "django.core.cache.backends.filebased.FileBasedCache"),
+        "LOCATION": os.environ.get("CACHE_LOCATION", os.path.join(tempfile.gettempdir(), "maze-solver-cache")),
+    }
+}
+MAZE_RESPONSE_CACHE_ALIAS = "default"
+# Seconds a cached response is kept, changes to the mazes invalidating it
+# before.
+MAZE_RESPONSE_CACHE_TIMEOUT = int(os.environ.get("MAZE_RESPONSE_CACHE_TIMEOUT", "300"))
+# Mazes accepted by POST /mazes/batch and processes solving them.
+MAZE_BATCH_MAX_SIZE = int(os.environ.get("MAZE_BATCH_MAX_SIZE", "5000"))
+MAZE_BATCH_WORKERS = int(os.environ.get("MAZE_BATCH_WORKERS", os.cpu_count() or 1))
+# Cells GET /mazes/<id>/path answers at once. Each path can run through half
+# of a 1000x1000 maze, so far fewer than the mazes of a batch.
+MAZE_PATH_MAX_SOURCES = int(os.environ.get("MAZE_PATH_MAX_SOURCES", "20"))
+# SQLite file where every worker of the host writes its metrics, and seconds
+# between two writes of a worker.
+METRICS_PATH = os.environ.get("METRICS_PATH", os.path.join(tempfile.gettempdir(), "maze-solver-metrics.sqlite3"))
+METRICS_FLUSH_INTERVAL = float(os.environ.get("METRICS_FLUSH_INTERVAL", "1"))
@@ -1,8 +1,11 @@
 from django.urls import path, include
 from rest_framework_jwt.views import refresh_jwt_token
 
+from mazes.views import metrics_view
+
 urlpatterns = [
     path("", include("users.urls")),
     path("auth/token-refresh/", refresh_jwt_token),
-    path("mazes/", include("mazes.urls"))
+    path("mazes/", include("mazes.urls")),
+    path("metrics", metrics_view)
 ]
@@ -1,6 +1,16 @@
 from django.apps import AppConfig
+from django.db.backends.signals import connection_created
+from django.db.models.signals import post_delete
+
+from mazes.db import configure_connection
 
 
 class MazesConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'mazes'
+
+    def ready(self):
+        from mazes.business.services.ResponseCache import ResponseCache
+
+        connection_created.connect(configure_connection)
+        post_delete.connect(ResponseCache.maze_deleted, sender='mazes.Maze')
@@ -0,0 +1,46 @@
+"""
+Shortest paths from every cell to the exit stored as a tree rooted at the
+exit: the 2 bit code, in the order of path_codec.MOVES, of the first move
+of each cell towards the exit, four cells a byte, row by row. Walls and
+cells out of reach get code 0, whether a cell reaches the exit at all is
+read from the reachability bitmap.
+"""
+import numpy
+
+from mazes.business.model.path_codec import MOVES
+from mazes.utils import as_cell_coordinates
+
+# Codes of the moves undoing down, up, right and left, the marks of a
+# breadth first search telling the step each cell was reached with.
+_BACK = numpy.array([1, 0, 3, 2], dtype=numpy.uint8)
+_ROW_STEPS = (1, -1, 0, 0)
+_COL_STEPS = (0, 0, 1, -1)
+
+
+def encode(grid, visited, first_mark):
+    """
+    Tree of the visited marks of a breadth first search from the exit, the
+    mark of a cell reached by stepping down being first_mark and those of
+    the other moves following in the order of MOVES.
+    """
+    marks = numpy.frombuffer(visited, dtype=numpy.uint8).reshape(grid.rows_size + 2, grid.width)[1:-1, 1:-1]
+    moves = marks.ravel().astype(numpy.int16) - first_mark
+    stepped = (moves >= 0) & (moves < len(MOVES))
+    codes = numpy.zeros(-(-len(moves) // 4) * 4, dtype=numpy.uint8)
+    codes[:len(moves)][stepped] = _BACK[moves[stepped]]
+    return (codes[0::4] | codes[1::4] << 2 | codes[2::4] << 4 | codes[3::4] << 6).tobytes()
+
+
+def path_to_exit(tree, cols_size, row, col, exit_row, exit_col):
+    """
+    Cell coordinates of the shortest path from a cell that reaches the exit
+    to it, in time linear in its length.
+    """
+    path = [as_cell_coordinates(row, col)]
+    while row != exit_row or col != exit_col:
+        position = row * cols_size + col
+        code = tree[position >> 2] >> 2 * (position & 3) & 3
+        row += _ROW_STEPS[code]
+        col += _COL_STEPS[code]
+        path.append(as_cell_coordinates(row, col))
+    return path
@@ -0,0 +1,101 @@
+from itertools import repeat
+from operator import add, floordiv, mod
+
+import numpy
+
+from mazes.utils import as_row_coordinate, cell_as_indexes, split_cells_coordinates
+
+
+class MazeGrid:
+    """
+    Maze cells as integer ids in a flat grid padded with a border of walls,
+    so a neighbour is always cell + offset and never needs a bounds check.
+    Walls are parsed once into a bytearray; solvers keep their own visited
+    bytearray, started as a copy of the walls so that a single lookup tells
+    whether a cell can still be entered.
+    """
+
+    def __init__(self, rows_size, cols_size, walls=()):
+        self.rows_size = rows_size
+        self.cols_size = cols_size
+        self.width = cols_size + 2
+        self.size = (rows_size + 2) * self.width
+        # Down, up, right, left: the order every solver explores neighbours in.
+        self.offsets = (self.width, -self.width, 1, -1)
+        self.first_exit_cell = self.cell(rows_size - 1, 0)
+        self.last_exit_cell = self.cell(rows_size - 1, cols_size - 1)
+
+        # Indexed by padded row and column, the padded column of a cell being
+        # its 1 based column number.
+        self._row_coordinates = [''] + [as_row_coordinate(row) for row in range(rows_size)] + ['']
+        self._col_coordinates = [str(col) for col in range(self.width)]
+
+        self.walls = bytearray(b'\x01') * self.size
+        for row in range(rows_size):
+            start = self.cell(row, 0)
+            self.walls[start:start + cols_size] = bytes(cols_size)
+        for wall in self.cells_of(walls):
+            self.walls[wall] = 1
+
+    def add_walls(self, rows, cols):
+        """
+        Walls given as 0 based row and column indexes, set in bulk through a
+        numpy view of the walls bytearray.
+        """
+        cells = (numpy.array(rows, dtype=numpy.intp) + 1) * self.width + numpy.array(cols, dtype=numpy.intp) + 1
+        numpy.frombuffer(self.walls, dtype=numpy.uint8)[cells] = 1
+
+    def cell(self, row, col):
+        return (row + 1) * self.width + col + 1
+
+    def cell_of(self, cell_coordinates):
+        return self.cell(*cell_as_indexes(cell_coordinates))
+
+    def cells_of(self, cells_coordinates):
+        """
+        Ids of many validated cells, split in bulk and mapped without a
+        Python level loop.
+        """
+        (row_coordinates, col_coordinates) = split_cells_coordinates(cells_coordinates)
+        row_starts = {
+            row_coordinate: self.width * (row + 1)
+            for row, row_coordinate in enumerate(self._row_coordinates[1:-1])
+        }
+        return list(map(add, map(row_starts.__getitem__, row_coordinates), map(int, col_coordinates)))
+
+    def row(self, cell):
+        return cell // self.width - 1
+
+    def col(self, cell):
+        return cell % self.width - 1
+
+    def coordinates(self, cell):
+        row, col = divmod(cell, self.width)
+        return self._row_coordinates[row] + self._col_coordinates[col]
+
+    def path_coordinates(self, path):
+        if not path:
+            return None
+        return list(map(
+            add,
+            map(self._row_coordinates.__getitem__, map(floordiv, path, repeat(self.width))),
+            map(self._col_coordinates.__getitem__, map(mod, path, repeat(self.width)))
+        ))
+
+    def is_exit(self, cell):
+        return self.first_exit_cell <= cell <= self.last_exit_cell
+
+    def is_open(self, cell):
+        return not self.walls[cell]
+
+    def open_cells(self):
+        return [cell for cell in range(self.size) if not self.walls[cell]]
+
+    def open_cells_count(self):
+        return self.size - self.walls.count(1)
+
+    def neighbours(self, cell):
+        return [cell + offset for offset in self.offsets if not self.walls[cell + offset]]
+
+    def new_visited(self):
+        return bytearray(self.walls)
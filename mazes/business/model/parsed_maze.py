@@ -0,0 +1,25 @@
+from mazes.business.model.maze_grid import MazeGrid
+
+
+class ParsedMaze:
+    """
+    A maze as parsed and validated by maze_validator: sizes, walls and
+    entrance as indexes, so that the model and the solvers never go back to
+    the coordinate strings.
+    """
+
+    def __init__(self, rows_size, cols_size, wall_rows, wall_cols, entrance_row, entrance_col):
+        self.rows_size = rows_size
+        self.cols_size = cols_size
+        self.wall_rows = wall_rows
+        self.wall_cols = wall_cols
+        self.entrance_row = entrance_row
+        self.entrance_col = entrance_col
+
+    def grid(self):
+        grid = MazeGrid(self.rows_size, self.cols_size)
+        grid.add_walls(self.wall_rows, self.wall_cols)
+        return grid
+
+    def entrance_cell(self, grid):
+        return grid.cell(self.entrance_row, self.entrance_col)
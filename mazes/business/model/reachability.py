@@ -0,0 +1,43 @@
+"""
+Cells reachable from the entrance stored as a bitmap of the grid, row by row
+and one bit a cell, the highest bit of a byte first: an eighth of a byte per
+cell, and whether a cell is reachable is a single lookup instead of a search.
+"""
+import numpy
+
+
+def encode(grid, reached):
+    """
+    Bitmap of a boolean numpy array over the padded cells of a MazeGrid.
+    """
+    cells = reached.reshape(grid.rows_size + 2, grid.width)[1:-1, 1:-1]
+    return numpy.packbits(cells, axis=None).tobytes()
+
+
+def update(index, grid, cells, reached):
+    """
+    Bitmap with the bits of some padded cells of a MazeGrid replaced by
+    whether each of them is reached.
+    """
+    bits = numpy.unpackbits(numpy.frombuffer(index, dtype=numpy.uint8), count=grid.rows_size * grid.cols_size)
+    cells = numpy.fromiter(cells, dtype=numpy.int64, count=len(cells))
+    bits[(cells // grid.width - 1) * grid.cols_size + cells % grid.width - 1] = reached
+    return numpy.packbits(bits).tobytes()
+
+
+def unreachable(index, parsed):
+    """
+    Row and column indexes of the open cells of a ParsedMaze that the
+    bitmap marks as not reachable, row by row.
+    """
+    cells_count = parsed.rows_size * parsed.cols_size
+    bits = numpy.unpackbits(numpy.frombuffer(index, dtype=numpy.uint8), count=cells_count).astype(bool)
+    bits[numpy.array(parsed.wall_rows, dtype=numpy.int64) * parsed.cols_size + parsed.wall_cols] = True
+    (rows, cols) = numpy.divmod(numpy.flatnonzero(~bits), parsed.cols_size)
+    return rows.tolist(), cols.tolist()
+
+
+def is_reachable(index, cols_size, row, col):
+    position = row * cols_size + col
+    return bool(index[position >> 3] >> (7 - (position & 7)) & 1)
+
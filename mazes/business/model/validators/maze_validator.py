@@ -1,10 +1,14 @@
 from rest_framework.exceptions import ValidationError
 
 from mazes.business.model.maze import Maze
-from mazes.utils import col_as_index, row_as_index
+from mazes.business.model.parsed_maze import ParsedMaze
+from mazes.utils import col_as_index, joined_cells_as_indexes, row_as_index
 
 
 def validate_maze(grid_size, walls, entrance):
+    """
+    Parses the maze while validating it and returns it as a ParsedMaze.
+    """
     grid_size_match = Maze.GRID_SIZE_PATTERN.match(grid_size)
     if not grid_size_match:
         raise ValidationError(
@@ -12,21 +16,48 @@ def validate_maze(grid_size, walls, entrance):
             f'format row_numberxcol_number e.g. 8x8 and got {grid_size}'
         )
     (rows_size, cols_size) = [int(x) for x in grid_size_match.groups()]
-    [_validate_cell_pattern(x) for x in walls + [entrance]]
-    [_validate_boundaries(x, rows_size, cols_size) for x in walls + [entrance]]
-
-
-def _validate_boundaries(cell_coordinates, rows_size, cols_size):
-    (entrance_row, entrance_col) = [
-        col_as_index(item) if index == 1 else row_as_index(item)
-        for index, item in enumerate(cell_coordinates)
-    ]
-
-    if entrance_row >= rows_size or entrance_col >= cols_size:
-        raise ValidationError(f'Coordinates {cell_coordinates} are outside maze')
+    if rows_size > Maze.MAX_GRID_SIZE or cols_size > Maze.MAX_GRID_SIZE:
+        raise ValidationError(
+            f'gridSize must be at most {Maze.MAX_GRID_SIZE}x{Maze.MAX_GRID_SIZE} and got {grid_size}'
+        )
+    cells = walls + [entrance]
+    indexes = _parse_cells(cells, rows_size, cols_size)
+    if indexes is None:
+        cell_matches = [_validate_cell_pattern(x) for x in cells]
+        [_validate_boundaries(x, rows_size, cols_size) for x in cell_matches]
+        raise ValidationError('Cell coordinates should be described as [A-Z]+[1-9][0-9]*')
+    (rows, cols) = indexes
+    return ParsedMaze(rows_size, cols_size, rows[:-1], cols[:-1], rows[-1], cols[-1])
+
+
+def _parse_cells(cells, rows_size, cols_size):
+    """
+    Row and column indexes of all the cells, parsed and validated at once,
+    or None, leaving it to the cell by cell checks to find out which one is
+    wrong.
+    """
+    try:
+        # Joining fails on anything but strings, sparing a scan for them.
+        joined_cells = '\n'.join(cells)
+    except TypeError:
+        return None
+    if not Maze.CELL_LIST_PATTERN.fullmatch(joined_cells):
+        return None
+    (rows, cols) = joined_cells_as_indexes(joined_cells)
+    # A cell holding the separator would pass as many.
+    if len(rows) != len(cells) or max(rows) >= rows_size or max(cols) >= cols_size:
+        return None
+    return rows, cols
+
+
+def _validate_boundaries(cell_coordinate_match, rows_size, cols_size):
+    (row_coordinate, col_coordinate) = cell_coordinate_match.groups()
+    if row_as_index(row_coordinate) >= rows_size or col_as_index(col_coordinate) >= cols_size:
+        raise ValidationError(f'Coordinates {cell_coordinate_match.string} are outside maze')
 
 
 def _validate_cell_pattern(cell_coordinate):
-    cell_coordinate_match = Maze.CELL_PATTERN.match(cell_coordinate)
+    cell_coordinate_match = isinstance(cell_coordinate, str) and Maze.CELL_PATTERN.match(cell_coordinate)
     if not cell_coordinate_match:
-        raise ValidationError(f'Cell coordinates should be described as [A-Z][1-9]+')
\ No newline at end of file
+        raise ValidationError(f'Cell coordinates should be described as [A-Z]+[1-9][0-9]*')
+    return cell_coordinate_match
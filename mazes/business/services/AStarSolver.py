@@ -0,0 +1,73 @@
+import heapq
+
+from mazes.business.services.ExitCheck import ExitCheck
+from mazes.business.services.ShortestPathSolver import DOWN, ENTRANCE, ShortestPathSolver
+
+# Heap keys pack (estimate, -steps, cell) in one integer, cheaper to compare
+# than a tuple: cells and steps both fit in KEY_BITS bits up to 1000x1000.
+KEY_BITS = 21
+KEY_MASK = (1 << KEY_BITS) - 1
+
+
+class AStarSolver:
+
+    @staticmethod
+    def solve(grid, entrance_cell, stats=None):
+        """
+        (exit cell, shortest path) like ShortestPathSolver.solve, the exit
+        being found by ExitCheck and the path by path(). The cells expanded
+        by both are stored in stats, the exit check being the larger part.
+        """
+        check = {}
+        exit_cell, _ = ExitCheck.find_exit(grid, entrance_cell, check)
+        path = None
+        if exit_cell is not None:
+            path = AStarSolver.path(grid, entrance_cell, exit_cell, stats)
+        if stats is not None:
+            stats['expanded'] = stats.get('expanded', 0) + check['expanded']
+        return exit_cell, path
+
+    @staticmethod
+    def path(grid, entrance_cell, exit_cell, stats=None):
+        """
+        A* search from the entrance to the exit, already known to be the
+        only one. The Manhattan distance to the exit never overestimates the
+        steps to it and is the heuristic; among cells of equal estimate the
+        deepest one goes first, which crosses open areas in a straight line.
+        Visited marks record the step each cell was last reached with, as
+        in ShortestPathSolver, and the path is rebuilt the same way. When a
+        stats dict is given, the number of cells expanded is stored in it.
+        """
+        width = grid.width
+        exit_row, exit_col = divmod(exit_cell, width)
+        visited = grid.new_visited()
+        visited[entrance_cell] = ENTRANCE
+        steps = {entrance_cell: 0}
+        closed = set()
+        row, col = divmod(entrance_cell, width)
+        estimate = exit_row - row + abs(exit_col - col)
+        heap = [(estimate << 2 * KEY_BITS) | KEY_MASK << KEY_BITS | entrance_cell]
+        expanded = 0
+        while heap:
+            cell = heapq.heappop(heap) & KEY_MASK
+            if cell == exit_cell:
+                break
+            if cell in closed:
+                continue
+            closed.add(cell)
+            expanded += 1
+            next_steps = steps[cell] + 1
+            for mark, offset in enumerate(grid.offsets, DOWN):
+                next_cell = cell + offset
+                if visited[next_cell] == 1 or next_steps >= steps.get(next_cell, next_steps + 1):
+                    continue
+                steps[next_cell] = next_steps
+                visited[next_cell] = mark
+                row, col = divmod(next_cell, width)
+                estimate = next_steps + exit_row - row + abs(exit_col - col)
+                heapq.heappush(
+                    heap, (estimate << 2 * KEY_BITS) | (KEY_MASK - next_steps) << KEY_BITS | next_cell
+                )
+        if stats is not None:
+            stats['expanded'] = expanded
+        return ShortestPathSolver.build_path(grid, visited, exit_cell)
@@ -0,0 +1,96 @@
+from mazes.business.services.ExitCheck import ExitCheck
+from mazes.business.services.ShortestPathSolver import DOWN, ENTRANCE, ShortestPathSolver
+
+
+class BidirectionalSolver:
+
+    @staticmethod
+    def solve(grid, entrance_cell, stats=None):
+        """
+        (exit cell, shortest path) like ShortestPathSolver.solve, the exit
+        being found by ExitCheck and the path by path(). The cells expanded
+        by both are stored in stats, the exit check being the larger part.
+        """
+        check = {}
+        exit_cell, _ = ExitCheck.find_exit(grid, entrance_cell, check)
+        path = None
+        if exit_cell is not None:
+            path = BidirectionalSolver.path(grid, entrance_cell, exit_cell, stats)
+        if stats is not None:
+            stats['expanded'] = stats.get('expanded', 0) + check['expanded']
+        return exit_cell, path
+
+    @staticmethod
+    def path(grid, entrance_cell, exit_cell, stats=None):
+        """
+        Breadth first searches from the entrance and, at the same time, from
+        the exit, already known to be the only one, one layer at a time of
+        whichever has the smaller frontier, until they meet; the shortest
+        path is the shortest of the ones joining both searches through the
+        layer where they met. When a stats dict is given, the number of
+        cells expanded by both searches is stored in it.
+        """
+        visited = grid.new_visited()
+        visited[entrance_cell] = ENTRANCE
+        backward = grid.new_visited()
+        backward[exit_cell] = ENTRANCE
+        meeting, expanded = BidirectionalSolver._meet(grid, entrance_cell, exit_cell, visited, backward)
+        if stats is not None:
+            stats['expanded'] = expanded
+        forward_cell, backward_cell = meeting
+        path = ShortestPathSolver.build_path(grid, visited, forward_cell)
+        if backward_cell != forward_cell:
+            path.append(backward_cell)
+        while backward[path[-1]] != ENTRANCE:
+            path.append(path[-1] - grid.offsets[backward[path[-1]] - DOWN])
+        return path
+
+    @staticmethod
+    def _meet(grid, entrance_cell, exit_cell, visited, backward):
+        """
+        (last cell of the forward search, first cell of the backward search)
+        on the shortest path and the number of cells expanded. The exit is
+        reachable from the entrance, so both searches always meet.
+        """
+        if entrance_cell == exit_cell:
+            return (entrance_cell, entrance_cell), 0
+        forward_steps, backward_steps = {entrance_cell: 0}, {exit_cell: 0}
+        forward_frontier, backward_frontier = [entrance_cell], [exit_cell]
+        expanded = 0
+        while True:
+            if len(forward_frontier) <= len(backward_frontier):
+                expanded += len(forward_frontier)
+                forward_frontier, meeting = BidirectionalSolver._expand(
+                    grid, forward_frontier, visited, forward_steps, backward_steps
+                )
+            else:
+                expanded += len(backward_frontier)
+                backward_frontier, meeting = BidirectionalSolver._expand(
+                    grid, backward_frontier, backward, backward_steps, forward_steps
+                )
+                if meeting is not None:
+                    meeting = meeting[::-1]
+            if meeting is not None:
+                return meeting, expanded
+
+    @staticmethod
+    def _expand(grid, frontier, marks, steps, other_steps):
+        # Next layer of one of the searches, and the pair of cells joining it
+        # to the other search along the shortest path found through it.
+        next_frontier = []
+        push = next_frontier.append
+        best = None
+        best_length = None
+        for cell in frontier:
+            next_steps = steps[cell] + 1
+            for mark, offset in enumerate(grid.offsets, DOWN):
+                next_cell = cell + offset
+                if next_cell in other_steps:
+                    length = next_steps + other_steps[next_cell]
+                    if best_length is None or length < best_length:
+                        best, best_length = (cell, next_cell), length
+                if not marks[next_cell]:
+                    marks[next_cell] = mark
+                    steps[next_cell] = next_steps
+                    push(next_cell)
+        return next_frontier, best
@@ -0,0 +1,60 @@
+from rest_framework.exceptions import ValidationError
+
+from mazes.business.services.ShortestPathSolver import DOWN, ENTRANCE, LEFT, RIGHT, UP
+
+
+class ExitCheck:
+
+    @staticmethod
+    def find_exit(grid, entrance_cell, stats=None):
+        """
+        The only exit reachable from the entrance, or None, and the visited
+        marks of the flood fill that found it. It runs before any path
+        search, in time linear in the area it reaches: it returns at once
+        when the last row has no open cell and raises as soon as a second
+        exit is reached. The flood fill is a breadth first search marking
+        cells as ShortestPathSolver.search does, so the shortest path to the
+        exit can be rebuilt from its marks. When a stats dict is given, the
+        number of cells reached is stored in it.
+        """
+        visited = grid.new_visited()
+        visited[entrance_cell] = ENTRANCE
+        if not grid.is_exit(entrance_cell) and 0 not in grid.walls[grid.first_exit_cell:grid.last_exit_cell + 1]:
+            if stats is not None:
+                stats['expanded'] = 0
+            return None, visited
+
+        first_exit_cell = grid.first_exit_cell
+        down, up, right, left = grid.offsets
+        exit_cell = None
+        queue = [entrance_cell]
+        push = queue.append
+        for cell in queue:
+            # Only cells of the last row are past the first exit cell, the
+            # padding below it is never reached.
+            if cell >= first_exit_cell:
+                if exit_cell is not None:
+                    if stats is not None:
+                        stats['expanded'] = len(queue)
+                    raise ValidationError('Maze has more than one exit')
+                exit_cell = cell
+            # Unrolled over grid.offsets, as in ShortestPathSolver.sweep.
+            next_cell = cell + down
+            if not visited[next_cell]:
+                visited[next_cell] = DOWN
+                push(next_cell)
+            next_cell = cell + up
+            if not visited[next_cell]:
+                visited[next_cell] = UP
+                push(next_cell)
+            next_cell = cell + right
+            if not visited[next_cell]:
+                visited[next_cell] = RIGHT
+                push(next_cell)
+            next_cell = cell + left
+            if not visited[next_cell]:
+                visited[next_cell] = LEFT
+                push(next_cell)
+        if stats is not None:
+            stats['expanded'] = len(queue)
+        return exit_cell, visited
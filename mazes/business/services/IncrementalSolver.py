@@ -0,0 +1,184 @@
+import heapq
+import zlib
+from array import array
+
+import numpy
+from rest_framework.exceptions import ValidationError
+
+from mazes.business.services.ShortestPathSolver import UNREACHED as SEARCH_UNREACHED, ShortestPathSolver
+
+# State values of walls, the padding included, and of open cells out of reach.
+WALL = -2
+UNREACHED = 2 ** 31 - 1
+# Cells of the state packed and compressed together, so that storing it
+# again after an edit only compresses the chunks the edit changed.
+CHUNK_CELLS = 2 ** 16
+
+
+class IncrementalSolver:
+    """
+    Shortest paths kept up to date while walls are added and removed, in
+    the way of Lifelong Planning A* without a heuristic: the state holds the
+    steps from the entrance to every cell of the padded grid, and an edit
+    only repairs the cells whose distance it changes. A cell is
+    inconsistent when its distance is not one more than the best of its
+    neighbours'; inconsistent cells are settled in order of the lowest of
+    both values, lowering a distance being final and raising one putting
+    the cell back in the queue with everything that relied on it.
+    """
+
+    @staticmethod
+    def initial_state(grid, entrance_cell):
+        """
+        State of a maze searched from scratch, by breadth first search.
+        """
+        distances = ShortestPathSolver.distances(grid, ShortestPathSolver.search(grid, entrance_cell)).ravel()
+        walls = numpy.frombuffer(bytes(grid.walls), dtype=numpy.uint8)
+        state = numpy.where(walls, WALL, numpy.where(distances == SEARCH_UNREACHED, UNREACHED, distances))
+        state[entrance_cell] = 0
+        return array('i', state.astype(numpy.int32).tobytes())
+
+    @staticmethod
+    def update(grid, state, entrance_cell, added, removed, stats=None):
+        """
+        Turns the added cells into walls and the removed ones into open
+        cells, then repairs the distances. The entrance is where the search
+        starts from, so it is never walled. Returns the cells whose value
+        changed. When a stats dict is given, the number of cells settled is
+        stored in it.
+        """
+        offsets = grid.offsets
+        queue = []
+        pending = {}
+        changed = set()
+
+        def update_cell(cell):
+            if state[cell] == WALL:
+                return
+            if cell == entrance_cell:
+                best = 0
+            else:
+                best = UNREACHED
+                for offset in offsets:
+                    distance = state[cell + offset]
+                    if 0 <= distance < best:
+                        best = distance + 1
+            pending[cell] = best
+            if best != state[cell]:
+                heapq.heappush(queue, (min(best, state[cell]), cell))
+
+        for cell in added:
+            if cell != entrance_cell and state[cell] != WALL:
+                state[cell] = WALL
+                changed.add(cell)
+                for offset in offsets:
+                    update_cell(cell + offset)
+        for cell in removed:
+            if cell != entrance_cell and state[cell] == WALL:
+                state[cell] = UNREACHED
+                changed.add(cell)
+                update_cell(cell)
+
+        settled = 0
+        while queue:
+            key, cell = heapq.heappop(queue)
+            distance, best = state[cell], pending.get(cell, state[cell])
+            if distance == WALL or distance == best or key != min(distance, best):
+                continue
+            settled += 1
+            changed.add(cell)
+            if best < distance:
+                state[cell] = best
+            else:
+                state[cell] = UNREACHED
+                update_cell(cell)
+            for offset in offsets:
+                update_cell(cell + offset)
+        if stats is not None:
+            stats['expanded'] = settled
+        return changed
+
+    @staticmethod
+    def solve(grid, state):
+        """
+        (exit cell, shortest path) read from the state, like
+        ShortestPathSolver.solve.
+        """
+        exit_cells = [
+            cell for cell in range(grid.first_exit_cell, grid.last_exit_cell + 1)
+            if 0 <= state[cell] < UNREACHED
+        ]
+        if len(exit_cells) > 1:
+            raise ValidationError('Maze has more than one exit')
+        if not exit_cells:
+            return None, None
+        down, up, right, left = grid.offsets
+        cell = exit_cells[0]
+        path = [cell]
+        for distance in range(state[cell] - 1, -1, -1):
+            # Unrolled over grid.offsets, a step back to a cell one closer.
+            if state[cell + down] == distance:
+                cell += down
+            elif state[cell + up] == distance:
+                cell += up
+            elif state[cell + right] == distance:
+                cell += right
+            else:
+                cell += left
+            path.append(cell)
+        path.reverse()
+        return exit_cells[0], path
+
+    @staticmethod
+    def reached(state):
+        """
+        Whether each cell of the padded grid is reachable from the entrance,
+        as a boolean numpy array.
+        """
+        distances = numpy.frombuffer(state, dtype=numpy.int32)
+        return (distances >= 0) & (distances < UNREACHED)
+
+    @staticmethod
+    def walls(grid, state):
+        """
+        Whether each cell of the grid, without its padding, is a wall, as a
+        boolean numpy matrix.
+        """
+        distances = numpy.frombuffer(state, dtype=numpy.int32).reshape(grid.rows_size + 2, grid.width)
+        return distances[1:-1, 1:-1] == WALL
+
+    @staticmethod
+    def dumps(state, packed=None, changed=()):
+        """
+        State packed as the sizes of its compressed chunks followed by the
+        chunks. Given the packed state it was loaded from and the cells
+        changed since, the chunks without changes are copied from it.
+        """
+        previous = _chunks(packed) if packed is not None else None
+        dirty = {cell // CHUNK_CELLS for cell in changed}
+        cells = memoryview(state)
+        chunks = [
+            zlib.compress(cells[start:start + CHUNK_CELLS], 1)
+            if previous is None or index in dirty else previous[index]
+            for index, start in enumerate(range(0, len(state), CHUNK_CELLS))
+        ]
+        return array('I', [len(chunks)] + [len(chunk) for chunk in chunks]).tobytes() + b''.join(chunks)
+
+    @staticmethod
+    def loads(packed):
+        state = array('i')
+        for chunk in _chunks(packed):
+            state.frombytes(zlib.decompress(chunk))
+        return state
+
+
+def _chunks(packed):
+    packed = bytes(packed)
+    count = array('I', packed[:4])[0]
+    sizes = array('I', packed[4:4 + 4 * count])
+    chunks = []
+    start = 4 + 4 * count
+    for size in sizes:
+        chunks.append(packed[start:start + size])
+        start += size
+    return chunks
@@ -0,0 +1,88 @@
+import threading
+import time
+import weakref
+from datetime import timedelta
+
+from django.apps import apps
+from django.conf import settings
+from django.db.models import Q
+from django.utils import timezone
+
+from mazes.business.services.SolutionCache import SolutionCache
+
+
+class LazySolution:
+    """
+    Max paths are by far the most expensive part of a solution and most
+    clients never ask for them, so one is solved the first time it is read
+    and stored on the maze and in the solution cache. First readers of the
+    same maze content solve it once: threads of a process wait on a lock
+    per content hash, processes on a claim of the MazeSolution row taken
+    with a conditional update, which like MazeSolveQueue's can be taken
+    over after MAZE_SOLVE_TIMEOUT seconds.
+    """
+    POLL_INTERVAL = 0.05
+    _lock = threading.Lock()
+    _locks = weakref.WeakValueDictionary()
+
+    @staticmethod
+    def max_moves(maze):
+        """
+        Packed max path of a solved maze, solving and storing it when it is
+        not known yet.
+        """
+        if maze.max_moves is not None:
+            return maze.max_moves
+        content_hash = maze.content_hash or SolutionCache.content_hash(maze.parsed())
+        with LazySolution._content_lock(content_hash):
+            solution = SolutionCache.get(content_hash)
+            if solution is not None and solution[2] is not None:
+                max_moves = solution[2]
+            else:
+                max_moves = LazySolution._solve_once(maze, content_hash)
+        maze_model = apps.get_model('mazes', 'Maze')
+        # Conditional on the content solved, an edit may have replaced it.
+        maze_model.objects.filter(id=maze.id, content_hash=maze.content_hash, max_moves__isnull=True).update(
+            max_moves=max_moves
+        )
+        maze.max_moves = max_moves
+        return max_moves
+
+    @staticmethod
+    def _solve_once(maze, content_hash):
+        model = apps.get_model('mazes', 'MazeSolution')
+        while True:
+            stored = model.objects.filter(content_hash=content_hash).values_list('max_moves').first()
+            if stored is None:
+                SolutionCache.put(
+                    content_hash, (maze.exit_coordinates, maze.min_moves, None, maze.reachable, maze.exit_tree)
+                )
+                continue
+            if stored[0] is not None:
+                max_moves = bytes(stored[0])
+                SolutionCache.put_max(content_hash, max_moves)
+                return max_moves
+
+            now = timezone.now()
+            stale = now - timedelta(seconds=settings.MAZE_SOLVE_TIMEOUT)
+            claimable = Q(max_started_at__isnull=True) | Q(max_started_at__lt=stale)
+            if model.objects.filter(claimable, content_hash=content_hash, max_moves__isnull=True).update(
+                max_started_at=now
+            ):
+                try:
+                    max_moves = maze.solve_max_parsed(maze.parsed(), maze.exit_coordinates)
+                except BaseException:
+                    model.objects.filter(content_hash=content_hash, max_started_at=now).update(max_started_at=None)
+                    raise
+                SolutionCache.put_max(content_hash, max_moves)
+                return max_moves
+            time.sleep(LazySolution.POLL_INTERVAL)
+
+    @staticmethod
+    def _content_lock(content_hash):
+        # Locks are dropped with the last thread holding or waiting on them.
+        with LazySolution._lock:
+            lock = LazySolution._locks.get(content_hash)
+            if lock is None:
+                lock = LazySolution._locks[content_hash] = threading.Lock()
+            return lock
@@ -0,0 +1,290 @@
+class OverLimits(Exception):
+    """
+    The maze is over the limits its longest path is searched within.
+    """
+
+
+class LongestPathSolver:
+    # Longest simple path is NP-hard, so it is only searched for when the
+    # maze has at most MAX_CELLS open cells and the blocks the path has to
+    # cross are narrow enough. The profiles of a block grow about threefold
+    # with each cell of its width, so a block costs about its lines times
+    # 3 ** width: blocks are at most MAX_PROFILE_WIDTH wide and all of them
+    # together cost at most MAX_WORK, twelve lines of width 9, benchmarked
+    # to take under a second.
+    MAX_CELLS = 10000
+    MAX_PROFILE_WIDTH = 9
+    MAX_WORK = 12 * 3 ** 9
+
+    @staticmethod
+    def solve(grid, entrance_cell, exit_cell, stats=None):
+        """
+        Longest simple path from the entrance to the exit, or None when there
+        is no exit. Raises OverLimits when the maze is over the size limits.
+        Every path crosses
+        the same chain of biconnected blocks, entering and leaving each at
+        the same cells, so the longest path is made of the longest path
+        through each block, built by dynamic programming over the profiles of
+        path segments crossing the block line by line, in time linear in its
+        cells and exponential only in its width. When a stats dict is given,
+        the number of states expanded is stored in it.
+        """
+        if exit_cell is None:
+            return None
+        search = _LongestPathSearch(grid)
+        path = search.run(entrance_cell, exit_cell)
+        if stats is not None:
+            stats['expanded'] = search.expanded
+        return path
+
+
+class _LongestPathSearch:
+    def __init__(self, grid):
+        self.grid = grid
+        self.adjacency = {}
+        self.target = None
+        self.expanded = 0
+
+    def run(self, entrance_cell, exit_cell):
+        if self.grid.open_cells_count() > LongestPathSolver.MAX_CELLS:
+            raise OverLimits()
+        # The entrance is open even when it is listed among the walls, so
+        # the blocks take in the cycles through it.
+        walls = bytearray(self.grid.walls)
+        walls[entrance_cell] = 0
+        offsets = self.grid.offsets
+        self.adjacency = {
+            cell: [cell + offset for offset in offsets if not walls[cell + offset]]
+            for cell in range(len(walls)) if not walls[cell]
+        }
+        region = 0
+        for cell in self.adjacency:
+            region |= 1 << cell
+
+        self.target = exit_cell
+        blocks = self._blocks(entrance_cell, region)
+        if blocks is None:
+            return None
+        work = 0
+        for block, _, _ in blocks:
+            if len(block) > 2:
+                _, lines, line_size, _, _ = self._box(block)
+                if line_size > LongestPathSolver.MAX_PROFILE_WIDTH:
+                    raise OverLimits()
+                work += lines * 3 ** line_size
+        if work > LongestPathSolver.MAX_WORK:
+            raise OverLimits()
+
+        path = [entrance_cell]
+        for block, block_entrance_cell, block_exit_cell in blocks:
+            if len(block) == 2:
+                path.append(block_exit_cell)
+            else:
+                path.extend(self._longest_path(block, block_entrance_cell, block_exit_cell)[1:])
+        return path
+
+    def _blocks(self, source, region):
+        """
+        Biconnected blocks, as (cells, entry cell, exit cell), that every
+        simple path from source to the target inside region has to cross,
+        in order. Empty when source is the target and None when the target
+        cannot be reached.
+        """
+        if source == self.target:
+            return []
+        discovery = {source: 0}
+        low = {source: 0}
+        parents = {source: None}
+        block_of = {}
+        blocks = []
+        edges = []
+        stack = [(source, iter(self.adjacency[source]))]
+        while stack:
+            cell, neighbours = stack[-1]
+            for next_cell in neighbours:
+                if not region >> next_cell & 1 or next_cell == parents[cell]:
+                    continue
+                if next_cell not in discovery:
+                    discovery[next_cell] = low[next_cell] = len(discovery)
+                    parents[next_cell] = cell
+                    edges.append((cell, next_cell))
+                    stack.append((next_cell, iter(self.adjacency[next_cell])))
+                    break
+                if discovery[next_cell] < discovery[cell]:
+                    edges.append((cell, next_cell))
+                    low[cell] = min(low[cell], discovery[next_cell])
+            else:
+                stack.pop()
+                parent = parents[cell]
+                if parent is None:
+                    continue
+                low[parent] = min(low[parent], low[cell])
+                if low[cell] >= discovery[parent]:
+                    block = set()
+                    while True:
+                        edge = edges.pop()
+                        block.update(edge)
+                        if parents[edge[1]] == edge[0]:
+                            block_of[edge[1]] = len(blocks)
+                        if edge == (parent, cell):
+                            break
+                    blocks.append(block)
+
+        if self.target not in discovery:
+            return None
+
+        chain = [self.target]
+        while chain[-1] != source:
+            chain.append(parents[chain[-1]])
+        chain.reverse()
+
+        chain_blocks = []
+        entry = 0
+        for index in range(1, len(chain)):
+            if index == len(chain) - 1 or block_of[chain[index + 1]] != block_of[chain[index]]:
+                chain_blocks.append((blocks[block_of[chain[index]]], chain[entry], chain[index]))
+                entry = index
+        return chain_blocks
+
+    def _longest_path(self, block, entrance_cell, exit_cell):
+        """
+        Longest path from the entrance to the exit of a block, by dynamic
+        programming over the block's bounding box line by line, along its
+        longer side. The state is the profile of path segments crossing the
+        boundary between processed and pending cells: 1 and 2 open and close
+        a segment whose two ends both cross the boundary, 3 marks a segment
+        hanging from the entrance or the exit. Its size depends on the width
+        of the box, not on the number of paths. Each state keeps the one it
+        was reached from at its best length, so the path is read back from
+        the state that completed it.
+        """
+        start, lines, line_size, across, along = self._box(block)
+        best = 0
+        finish = None
+        steps = []
+        states = {(0,) * (line_size + 1): 0}
+        for line in range(lines):
+            for position in range(line_size):
+                cell = start + line * across + position * along
+                can_down = cell + across in block
+                can_right = position + 1 < line_size and cell + along in block
+                endpoint = cell == entrance_cell or cell == exit_cell
+                next_states = {}
+                parents = {}
+                self.expanded += len(states)
+                for state, length in states.items():
+                    left, up = state[position], state[position + 1]
+                    if cell not in block:
+                        if not left and not up:
+                            _keep_longest(next_states, parents, state, length, state)
+                    elif left and up:
+                        if endpoint or (left == 1 and up == 2):
+                            continue
+                        joined = list(state)
+                        joined[position] = joined[position + 1] = 0
+                        if left == 3 and up == 3:
+                            if not any(joined) and length + 1 > best:
+                                best, finish = length + 1, (len(steps), state)
+                            continue
+                        if left == 1 and up == 1:
+                            joined[_match(state, position + 1)] = 1
+                        elif left == 2 and up == 2:
+                            joined[_match(state, position)] = 2
+                        elif left == 3:
+                            joined[_match(state, position + 1)] = 3
+                        elif up == 3:
+                            joined[_match(state, position)] = 3
+                        _keep_longest(next_states, parents, tuple(joined), length + 1, state)
+                    elif left or up:
+                        plug = left or up
+                        if endpoint:
+                            ended = list(state)
+                            ended[position] = ended[position + 1] = 0
+                            if plug == 3:
+                                if not any(ended) and length + 1 > best:
+                                    best, finish = length + 1, (len(steps), state)
+                                continue
+                            ended[_match(state, position if left else position + 1)] = 3
+                            _keep_longest(next_states, parents, tuple(ended), length + 1, state)
+                            continue
+                        if can_down:
+                            _keep_longest(next_states, parents, state[:position] + (plug, 0) + state[position + 2:],
+                                          length + 1, state)
+                        if can_right:
+                            _keep_longest(next_states, parents, state[:position] + (0, plug) + state[position + 2:],
+                                          length + 1, state)
+                    elif endpoint:
+                        if can_down:
+                            _keep_longest(next_states, parents, state[:position] + (3, 0) + state[position + 2:],
+                                          length + 1, state)
+                        if can_right:
+                            _keep_longest(next_states, parents, state[:position] + (0, 3) + state[position + 2:],
+                                          length + 1, state)
+                    else:
+                        _keep_longest(next_states, parents, state, length, state)
+                        if can_down and can_right:
+                            _keep_longest(next_states, parents, state[:position] + (1, 2) + state[position + 2:],
+                                          length + 1, state)
+                states = next_states
+                steps.append((cell, position, parents))
+            states = {(0,) + state[:line_size]: length for state, length in states.items()}
+
+        # Every link of the path is read back at the later of its two cells,
+        # from the state before it: the left plug links it to the previous
+        # cell of its line, the upper one to the cell of the previous line.
+        links = {cell: [] for cell in block}
+        step, state = finish
+        while True:
+            cell, position, parents = steps[step]
+            for plug, other in ((state[position], cell - along), (state[position + 1], cell - across)):
+                if plug:
+                    links[cell].append(other)
+                    links[other].append(cell)
+            if not step:
+                break
+            if not position:
+                state = state[1:] + (0,)
+            step -= 1
+            state = steps[step][2][state]
+
+        path = [entrance_cell]
+        previous = None
+        while path[-1] != exit_cell:
+            cell = path[-1]
+            path.append(next(other for other in links[cell] if other != previous))
+            previous = cell
+        return path
+
+
+    def _box(self, block):
+        """
+        (first cell, lines, line size, step between lines, step along a
+        line) of the bounding box of a block, swept along its longer side.
+        """
+        grid = self.grid
+        rows = [grid.row(cell) for cell in block]
+        cols = [grid.col(cell) for cell in block]
+        rows_size, cols_size = max(rows) - min(rows) + 1, max(cols) - min(cols) + 1
+        start = grid.cell(min(rows), min(cols))
+        if cols_size <= rows_size:
+            return start, rows_size, cols_size, grid.width, 1
+        return start, cols_size, rows_size, 1, grid.width
+
+
+def _keep_longest(states, parents, state, length, previous):
+    if states.get(state, -1) < length:
+        states[state] = length
+        parents[state] = previous
+
+
+def _match(state, index):
+    step = 1 if state[index] == 1 else -1
+    depth = 0
+    while True:
+        if state[index] == 1:
+            depth += 1
+        elif state[index] == 2:
+            depth -= 1
+        if depth == 0:
+            return index
+        index += step
@@ -0,0 +1,114 @@
+from concurrent.futures import ProcessPoolExecutor
+
+from django.conf import settings
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.db import connection, transaction
+from rest_framework.exceptions import ValidationError
+
+from mazes.business.services.ResponseCache import ResponseCache
+from mazes.business.services.SolutionCache import SolutionCache
+from mazes.models import Maze
+from mazes.serializers import MazeCreationSerializer
+
+
+class MazeBatch:
+    """
+    Creation of many mazes at once: each maze is validated on its own, the
+    distinct mazes that are not cached yet are solved on a pool of
+    processes and all of them are inserted in a single transaction.
+    """
+    _pool = None
+
+    @staticmethod
+    def validate(items, user):
+        """
+        Unsaved mazes, and the errors of each item, None when it is valid.
+        """
+        mazes = []
+        errors = []
+        for item in items:
+            serializer = MazeCreationSerializer(data=item)
+            if not serializer.is_valid():
+                mazes.append(None)
+                errors.append(serializer.errors)
+                continue
+            maze = Maze(user=user, **serializer.validated_data)
+            try:
+                # The user is the authenticated one, checking it is a query.
+                maze.full_clean(exclude=['user'])
+            except ValidationError as error:
+                mazes.append(None)
+                errors.append({'non_field_errors': error.detail})
+                continue
+            except DjangoValidationError as error:
+                mazes.append(None)
+                errors.append(error.message_dict)
+                continue
+            maze.content_hash = SolutionCache.content_hash(maze.parsed())
+            mazes.append(maze)
+            errors.append(None)
+        return mazes, errors
+
+    @staticmethod
+    def solve(mazes, errors):
+        """
+        Fills in the solution of every valid maze, or the error it fails
+        with.
+        """
+        valid_mazes = [maze for maze in mazes if maze is not None]
+        solutions = SolutionCache.get_many([maze.content_hash for maze in valid_mazes])
+        unsolved = {}
+        for maze in valid_mazes:
+            if maze.content_hash not in solutions:
+                unsolved.setdefault(maze.content_hash, maze.parsed())
+
+        outcomes = dict(zip(unsolved, MazeBatch._map(_solve_parsed, list(unsolved.values()))))
+        SolutionCache.put_many({
+            content_hash: solution for content_hash, (solution, error) in outcomes.items() if error is None
+        })
+        for index, maze in enumerate(mazes):
+            if maze is None:
+                continue
+            solution, error = outcomes.get(maze.content_hash, (solutions.get(maze.content_hash), None))
+            if error is not None:
+                errors[index] = {'non_field_errors': [error]}
+                continue
+            maze.exit_coordinates, maze.min_moves, maze.max_moves, maze.reachable, maze.exit_tree = solution
+            maze.status = Maze.DONE
+
+    @staticmethod
+    @transaction.atomic
+    def create(mazes):
+        """
+        Inserts the mazes and returns their ids, in order.
+        """
+        created = Maze.objects.bulk_create(mazes)
+        for email in {maze.user_id for maze in mazes}:
+            ResponseCache.invalidate(email)
+        if connection.features.can_return_rows_from_bulk_insert:
+            return [maze.id for maze in created]
+        # SQLite only lets one transaction write at a time, so the mazes just
+        # inserted are the ones with the highest ids.
+        ids = list(Maze.objects.order_by('-id').values_list('id', flat=True)[:len(mazes)])
+        ids.reverse()
+        for maze, maze_id in zip(mazes, ids):
+            maze.id = maze_id
+        return ids
+
+    @staticmethod
+    def _map(function, arguments):
+        workers = settings.MAZE_BATCH_WORKERS
+        if workers <= 1 or len(arguments) <= 1:
+            return list(map(function, arguments))
+        if MazeBatch._pool is None:
+            MazeBatch._pool = ProcessPoolExecutor(max_workers=workers)
+        return list(MazeBatch._pool.map(function, arguments, chunksize=max(1, len(arguments) // (4 * workers))))
+
+
+def _solve_parsed(parsed):
+    # Run in the pool's processes: only the parsed maze crosses the process
+    # boundary, the error being sent back as its message.
+    try:
+        return Maze.solve_parsed(parsed), None
+    except ValidationError as error:
+        return None, str(error.detail[0])
@@ -0,0 +1,111 @@
+from django.db import transaction
+from rest_framework.exceptions import ValidationError
+
+from mazes import metrics
+from mazes.business.model import path_codec, reachability
+from mazes.business.model.maze_grid import MazeGrid
+from mazes.business.model.validators import maze_validator
+from mazes.business.services.IncrementalSolver import UNREACHED, IncrementalSolver
+from mazes.business.services.ResponseCache import ResponseCache
+from mazes.business.services.SolutionCache import SolutionCache
+from mazes.models import Maze, MazeSearchState
+
+
+class MazeEditor:
+    """
+    Walls of a stored maze added and removed in place. The state of the last
+    search of each maze is kept in MazeSearchState, so an edit repairs the
+    distances it changed instead of solving the maze again; only the first
+    edit of a maze searches it from scratch.
+    """
+
+    @staticmethod
+    def edit(maze, added, removed):
+        """
+        Applies the edit to a solved maze, adding walls before removing
+        them. Returns False, leaving the maze as it is, when it was edited
+        meanwhile.
+        """
+        edited = maze_validator.validate_maze(maze.grid_size, added + removed, maze.entrance)
+        grid = MazeGrid(edited.rows_size, edited.cols_size)
+        cells = list(map(grid.cell, edited.wall_rows, edited.wall_cols))
+        entrance_cell = edited.entrance_cell(grid)
+        state, packed = MazeEditor._state(maze, entrance_cell)
+
+        stats = {}
+        with metrics.timer('maze_solver_duration_seconds', solver='incremental'):
+            changed = IncrementalSolver.update(
+                grid, state, entrance_cell, cells[:len(added)], cells[len(added):], stats
+            )
+            exit_cell, min_path = IncrementalSolver.solve(grid, state)
+        metrics.increment('maze_solver_expanded_cells_total', stats['expanded'], solver='incremental')
+        if exit_cell is None:
+            raise ValidationError('Maze has no exit')
+
+        existing = set(maze.walls)
+        removed = set(removed)
+        walls = [wall for wall in maze.walls + [x for x in dict.fromkeys(added) if x not in existing]
+                 if wall not in removed]
+        # The walls are hashed from the state rather than parsed again, but
+        # the state keeps the entrance open even when it is listed as a wall.
+        wall_cells = IncrementalSolver.walls(grid, state)
+        wall_cells[edited.entrance_row, edited.entrance_col] = (
+            maze.entrance in added or maze.entrance in existing and maze.entrance not in removed
+        )
+        content_hash = SolutionCache.walls_hash(
+            edited.rows_size, edited.cols_size, edited.entrance_row, edited.entrance_col, wall_cells
+        )
+        solution = SolutionCache.get(content_hash)
+        if solution is None:
+            if maze.reachable is None:
+                reachable = reachability.encode(grid, IncrementalSolver.reached(state))
+            else:
+                changed_cells = list(changed)
+                reachable = reachability.update(
+                    bytes(maze.reachable), grid, changed_cells, [0 <= state[cell] < UNREACHED for cell in changed_cells]
+                )
+            solution = (
+                grid.coordinates(exit_cell),
+                path_codec.encode_cells(grid, min_path),
+                None,
+                reachable,
+                # Left to be built on its first read, an edit only repairs
+                # the distances from the entrance.
+                None
+            )
+            SolutionCache.put(content_hash, solution)
+
+        with transaction.atomic():
+            # Conditional on the content the edit was applied to.
+            if not Maze.objects.filter(id=maze.id, content_hash=maze.content_hash).update(
+                walls=walls,
+                content_hash=content_hash,
+                exit_coordinates=solution[0],
+                min_moves=solution[1],
+                max_moves=solution[2],
+                reachable=solution[3],
+                exit_tree=solution[4]
+            ):
+                return False
+            MazeSearchState.objects.update_or_create(
+                maze_id=maze.id,
+                defaults={'content_hash': content_hash, 'state': IncrementalSolver.dumps(state, packed, changed)}
+            )
+            ResponseCache.invalidate(maze.user_id)
+        maze.walls, maze.content_hash = walls, content_hash
+        maze.exit_coordinates, maze.min_moves, maze.max_moves, maze.reachable, maze.exit_tree = solution
+        maze._parsed = None
+        return True
+
+    @staticmethod
+    def _state(maze, entrance_cell):
+        """
+        (state, packed state it was loaded from) of the last search of the
+        maze, searched from scratch when there is none.
+        """
+        stored = MazeSearchState.objects.filter(maze_id=maze.id, content_hash=maze.content_hash).values_list(
+            'state', flat=True
+        ).first()
+        if stored is not None:
+            return IncrementalSolver.loads(stored), stored
+        return IncrementalSolver.initial_state(maze.parsed().grid(), entrance_cell), None
@@ -0,0 +1,125 @@
+import random
+
+from mazes.business.model.maze_grid import MazeGrid
+from mazes.business.services.ShortestPathSolver import ENTRANCE, ShortestPathSolver
+
+
+class MazeGenerator:
+    """
+    Seeded random mazes, entered at A1 and with a single exit on the bottom
+    row whenever the bottom row can be reached at all:
+
+    - perfect: a spanning tree of corridors, exactly one path between cells
+    - rooms: open 10x10 rooms joined by one door in each dividing wall
+    - random: each cell is a wall with a given probability
+    - serpentine: one corridor winding down the whole grid, the longest
+      possible shortest path
+    - sparse: random with few walls, wide open rooms where the longest path
+      is the hardest to find
+    """
+    FAMILIES = ('perfect', 'rooms', 'random', 'serpentine', 'sparse')
+    ROOM_SIZE = 10
+    SPARSE_DENSITY = 0.05
+
+    @staticmethod
+    def generate(family, rows_size, cols_size, seed=0, density=0.3):
+        generator = random.Random(f'{family}:{rows_size}x{cols_size}:{seed}')
+        grid = MazeGrid(rows_size, cols_size)
+        if family == 'perfect':
+            MazeGenerator._carve_perfect(grid, generator)
+        elif family == 'rooms':
+            MazeGenerator._build_rooms(grid, generator)
+        elif family in ('random', 'sparse'):
+            if family == 'sparse':
+                density = MazeGenerator.SPARSE_DENSITY
+            for cell in grid.open_cells():
+                if generator.random() < density:
+                    grid.walls[cell] = 1
+        elif family == 'serpentine':
+            MazeGenerator._build_serpentine(grid)
+        else:
+            raise ValueError(f'Unknown maze family {family}')
+        grid.walls[grid.cell(0, 0)] = 0
+        MazeGenerator._keep_one_exit(grid, generator)
+        return grid
+
+    @staticmethod
+    def walls_of(grid):
+        walls = [
+            cell for cell in (grid.cell(row, col) for row in range(grid.rows_size) for col in range(grid.cols_size))
+            if grid.walls[cell]
+        ]
+        return grid.path_coordinates(walls) or []
+
+    @staticmethod
+    def _carve_perfect(grid, generator):
+        # Rooms are the cells at even row and column, carved into a tree by a
+        # depth first walk that opens the wall between two rooms.
+        for cell in grid.open_cells():
+            grid.walls[cell] = 1
+        start = grid.cell(0, 0)
+        grid.walls[start] = 0
+        stack = [start]
+        steps = [2 * offset for offset in grid.offsets]
+        while stack:
+            cell = stack[-1]
+            choices = [
+                step for step in steps
+                if _inside(grid, cell + step) and _is_room(grid, cell + step) and grid.walls[cell + step]
+            ]
+            if not choices:
+                stack.pop()
+                continue
+            step = generator.choice(choices)
+            grid.walls[cell + step // 2] = 0
+            grid.walls[cell + step] = 0
+            stack.append(cell + step)
+
+    @staticmethod
+    def _build_rooms(grid, generator):
+        size = MazeGenerator.ROOM_SIZE
+        for row in range(size, grid.rows_size, size + 1):
+            for col in range(grid.cols_size):
+                grid.walls[grid.cell(row, col)] = 1
+            for start in range(0, grid.cols_size, size + 1):
+                grid.walls[grid.cell(row, generator.randrange(start, min(start + size, grid.cols_size)))] = 0
+        for col in range(size, grid.cols_size, size + 1):
+            for row in range(grid.rows_size):
+                grid.walls[grid.cell(row, col)] = 1
+            for start in range(0, grid.rows_size, size + 1):
+                grid.walls[grid.cell(generator.randrange(start, min(start + size, grid.rows_size)), col)] = 0
+
+    @staticmethod
+    def _build_serpentine(grid):
+        for row in range(1, grid.rows_size, 2):
+            gap = grid.cols_size - 1 if row % 4 == 1 else 0
+            for col in range(grid.cols_size):
+                if col != gap:
+                    grid.walls[grid.cell(row, col)] = 1
+
+    @staticmethod
+    def _keep_one_exit(grid, generator):
+        """
+        Walls the bottom row but for one cell right under a cell reached
+        from the entrance.
+        """
+        if grid.rows_size == 1:
+            return
+        last_row = grid.rows_size - 1
+        for col in range(grid.cols_size):
+            grid.walls[grid.cell(last_row, col)] = 1
+        visited = ShortestPathSolver.search(grid, grid.cell(0, 0))
+        reached_cols = [
+            col for col in range(grid.cols_size)
+            if visited[grid.cell(last_row - 1, col)] >= ENTRANCE
+        ]
+        if reached_cols:
+            grid.walls[grid.cell(last_row, generator.choice(reached_cols))] = 0
+
+
+def _inside(grid, cell):
+    return 0 <= grid.row(cell) < grid.rows_size and 0 <= grid.col(cell) < grid.cols_size
+
+
+def _is_room(grid, cell):
+    return grid.row(cell) % 2 == 0 and grid.col(cell) % 2 == 0
@@ -0,0 +1,61 @@
+import logging
+from datetime import timedelta
+
+from django.conf import settings
+from django.db.models import Q
+from django.utils import timezone
+from rest_framework.exceptions import ValidationError
+
+from mazes.models import Maze
+
+logger = logging.getLogger(__name__)
+
+
+class MazeSolveQueue:
+    """
+    Pending mazes are the queue: any number of workers poll the mazes table
+    and a conditional update makes sure each maze is claimed by only one of
+    them. A maze left running for longer than MAZE_SOLVE_TIMEOUT seconds,
+    because its worker died, can be claimed again.
+    """
+
+    @staticmethod
+    def claim():
+        stale = timezone.now() - timedelta(seconds=settings.MAZE_SOLVE_TIMEOUT)
+        claimable = Q(status=Maze.PENDING) | Q(status=Maze.RUNNING, started_at__lt=stale)
+        for maze_id in Maze.objects.filter(claimable).order_by('id').values_list('id', flat=True)[:10]:
+            if Maze.objects.filter(claimable, id=maze_id).update(status=Maze.RUNNING, started_at=timezone.now()):
+                return Maze.objects.get(id=maze_id)
+        return None
+
+    @staticmethod
+    def solve(maze):
+        try:
+            maze.solve()
+            maze.error = None
+        except ValidationError as error:
+            maze.status = Maze.FAILED
+            maze.error = str(error.detail[0])
+        except Exception as error:
+            logger.exception('Failed solving maze %s', maze.id)
+            maze.status = Maze.FAILED
+            maze.error = str(error)
+        # Only the worker holding the claim writes the result.
+        Maze.objects.filter(id=maze.id, status=Maze.RUNNING, started_at=maze.started_at).update(
+            status=maze.status,
+            error=maze.error,
+            content_hash=maze.content_hash,
+            exit_coordinates=maze.exit_coordinates,
+            min_moves=maze.min_moves,
+            max_moves=maze.max_moves,
+            reachable=maze.reachable,
+            exit_tree=maze.exit_tree
+        )
+
+    @staticmethod
+    def solve_next():
+        maze = MazeSolveQueue.claim()
+        if maze is None:
+            return False
+        MazeSolveQueue.solve(maze)
+        return True
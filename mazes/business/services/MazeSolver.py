@@ -1,86 +1,74 @@
 from rest_framework.exceptions import ValidationError
 
-from mazes.utils import col_as_index, row_as_index, as_cell_coordinates
+from mazes import metrics
+from mazes.business.model.maze_grid import MazeGrid
+from mazes.business.services.ExitCheck import ExitCheck
 
 
 class MazeSolver:
 
-    @staticmethod
-    def solve_bfs(entrance_coordinates, walls, rows_size, cols_size):
-        queue = [entrance_coordinates]
-        visited = set()
-        exit_coordinates = None
-        while queue:
-            cell_coordinates = queue.pop(0)
-            visited.add(cell_coordinates)
-            (row, col) = [
-                col_as_index(item) if index == 1 else row_as_index(item)
-                for index, item in enumerate(cell_coordinates)
-            ]
-            if row == rows_size - 1:
-                if exit_coordinates and exit_coordinates != cell_coordinates:
-                    raise ValueError('Maze has more than one exit')
-                exit_coordinates = cell_coordinates
-            if MazeSolver._is_safe(walls, visited, row + 1, col, rows_size, cols_size):
-                queue.append(as_cell_coordinates(row + 1, col))
-            if MazeSolver._is_safe(walls, visited, row - 1, col, rows_size, cols_size):
-                queue.append(as_cell_coordinates(row - 1, col))
-            if MazeSolver._is_safe(walls, visited, row, col + 1, rows_size, cols_size):
-                queue.append(as_cell_coordinates(row, col + 1))
-            if MazeSolver._is_safe(walls, visited, row, col - 1, rows_size, cols_size):
-                queue.append(as_cell_coordinates(row, col - 1))
-
     @staticmethod
     def solve_maze_dfs(entrance_coordinates, walls, rows_size, cols_size):
-        paths = []
-        exit_coordinates = []
-        MazeSolver.solve_maze_dfs_rec(entrance_coordinates, walls, rows_size, cols_size, [], exit_coordinates, paths)
-        return exit_coordinates[0] if exit_coordinates else None, paths
+        paths = list(MazeSolver.iter_paths(entrance_coordinates, walls, rows_size, cols_size))
+        return paths[0][-1] if paths else None, paths
 
     @staticmethod
-    def solve_maze_dfs_rec(
-            cell_coordinates,
-            walls,
-            rows_size,
-            cols_size,
-            visited,
-            exit_coordinates,
-            paths
-    ):
-        (row, col) = [
-            col_as_index(item) if index == 1 else row_as_index(item)
-            for index, item in enumerate(cell_coordinates)
-        ]
-
-        visited.append(cell_coordinates)
-
-        if row == rows_size - 1:
-            if exit_coordinates and exit_coordinates[0] != cell_coordinates:
-                raise ValidationError('Maze has more than one exit')
-            exit_coordinates.append(cell_coordinates)
-            paths.append(visited.copy())
-
-        for next_row, next_col in [(row + 1, col), (row - 1, col), (row, col + 1), (row, col - 1)]:
-            if MazeSolver._is_safe(walls, visited, next_row, next_col, rows_size, cols_size):
-                next_cell_coordinates = as_cell_coordinates(next_row, next_col)
-                MazeSolver.solve_maze_dfs_rec(
-                    next_cell_coordinates,
-                    walls,
-                    rows_size,
-                    cols_size,
-                    visited,
-                    exit_coordinates,
-                    paths
-                )
-
-        visited.pop()
+    def iter_paths(entrance_coordinates, walls, rows_size, cols_size):
+        """
+        Yields every simple path from the entrance to the exit, one at a time,
+        from an iterative depth first search. Only the current path and the
+        next neighbour to try from each of its cells are kept, so callers can
+        stop early or keep a running best without holding every path.
+        ExitCheck runs first, so a maze without exactly one exit is known
+        before any path is enumerated.
+        """
+        grid = MazeGrid(rows_size, cols_size, walls)
+        entrance_cell = grid.cell_of(entrance_coordinates)
+        if ExitCheck.find_exit(grid, entrance_cell)[0] is None:
+            return
+        stats = {}
+        try:
+            for path in MazeSolver.iter_cell_paths(grid, entrance_cell, stats):
+                metrics.increment('maze_paths_enumerated_total')
+                yield grid.path_coordinates(path)
+        finally:
+            metrics.increment('maze_solver_expanded_cells_total', stats.get('expanded', 0), solver='dfs')
 
     @staticmethod
-    def _is_safe(walls, visited, row, col, rows_size, cols_size):
-        if ((0 <= row < rows_size)
-                and (0 <= col < cols_size)
-                and as_cell_coordinates(row, col) not in walls
-                and as_cell_coordinates(row, col) not in visited
-        ):
-            return True
-        return False
\ No newline at end of file
+    def iter_cell_paths(grid, entrance_cell, stats=None):
+        """
+        iter_paths over cell ids. When a stats dict is given, the number of
+        cells expanded so far is kept in it.
+        """
+        if stats is not None:
+            stats['expanded'] = 0
+        offsets = grid.offsets
+        visited = grid.new_visited()
+        exit_cell = None
+        path = []
+        next_offsets = []
+        cell = entrance_cell
+        while True:
+            visited[cell] = 1
+            path.append(cell)
+            next_offsets.append(0)
+            if stats is not None:
+                stats['expanded'] += 1
+            if grid.is_exit(cell):
+                if exit_cell is not None and exit_cell != cell:
+                    raise ValidationError('Maze has more than one exit')
+                exit_cell = cell
+                yield path
+
+            cell = None
+            while path and cell is None:
+                if next_offsets[-1] == len(offsets):
+                    visited[path.pop()] = 0
+                    next_offsets.pop()
+                    continue
+                next_cell = path[-1] + offsets[next_offsets[-1]]
+                next_offsets[-1] += 1
+                if not visited[next_cell]:
+                    cell = next_cell
+            if cell is None:
+                return
@@ -0,0 +1,66 @@
+import hashlib
+import json
+import uuid
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+
+from mazes import metrics
+
+
+class ResponseCache:
+    """
+    Responses built from a user's mazes, kept in the Django cache
+    MAZE_RESPONSE_CACHE_ALIAS under keys carrying a version of the user's
+    mazes. Any change to them replaces the version, orphaning the responses
+    cached before until they expire, so backends shared by every worker,
+    file based or memcached, invalidate them for all at once.
+    """
+
+    @staticmethod
+    def key(email, *parts):
+        """
+        Key of a response of the user's mazes as they are now, to be taken
+        before reading them so a change made meanwhile is not cached as
+        current.
+        """
+        cache = caches[settings.MAZE_RESPONSE_CACHE_ALIAS]
+        version_key = f'maze-responses:{_digest(email)}'
+        version = cache.get(version_key)
+        if version is None:
+            cache.add(version_key, uuid.uuid4().hex, None)
+            version = cache.get(version_key)
+        return f'maze-response:{version}:{_digest([email, *parts])}'
+
+    @staticmethod
+    def get(key, name):
+        value = caches[settings.MAZE_RESPONSE_CACHE_ALIAS].get(key)
+        metrics.increment('maze_response_cache_requests_total', cache=name,
+                          result='miss' if value is None else 'hit')
+        return value
+
+    @staticmethod
+    def put(key, value):
+        caches[settings.MAZE_RESPONSE_CACHE_ALIAS].set(key, value, settings.MAZE_RESPONSE_CACHE_TIMEOUT)
+
+    @staticmethod
+    def invalidate(email):
+        ResponseCache._replace_version(email)
+        if transaction.get_connection().in_atomic_block:
+            # Reads between the change and its commit may have cached what
+            # it replaced.
+            transaction.on_commit(lambda: ResponseCache._replace_version(email))
+
+    @staticmethod
+    def maze_deleted(sender, instance, **kwargs):
+        ResponseCache.invalidate(instance.user_id)
+
+    @staticmethod
+    def _replace_version(email):
+        caches[settings.MAZE_RESPONSE_CACHE_ALIAS].set(f'maze-responses:{_digest(email)}', uuid.uuid4().hex, None)
+
+
+def _digest(value):
+    # Keys fit memcached whatever the emails and queries they are made of.
+    return hashlib.sha256(json.dumps(value, separators=(',', ':')).encode()).hexdigest()
@@ -0,0 +1,110 @@
+import numpy
+from rest_framework.exceptions import ValidationError
+
+ENTRANCE = 2
+# Visited marks of cells reached by stepping down, up, right and left.
+DOWN, UP, RIGHT, LEFT = 3, 4, 5, 6
+UNREACHED = -1
+
+
+class ShortestPathSolver:
+
+    @staticmethod
+    def solve(grid, entrance_cell, stats=None):
+        """
+        Breadth first search from the entrance over the whole reachable area.
+        Every cell is enqueued at most once and its visited mark records the
+        step it was reached with, so the shortest path to the exit is rebuilt
+        by stepping back from the exit to the entrance. When a stats dict is
+        given, the number of cells expanded is stored in it.
+        """
+        visited = ShortestPathSolver.search(grid, entrance_cell)
+        if stats is not None:
+            stats['expanded'] = len(visited) - visited.count(0) - visited.count(1)
+        exit_cells = ShortestPathSolver.reached_exits(grid, visited)
+        if len(exit_cells) > 1:
+            raise ValidationError('Maze has more than one exit')
+        if not exit_cells:
+            return None, None
+        return exit_cells[0], ShortestPathSolver.build_path(grid, visited, exit_cells[0])
+
+    @staticmethod
+    def search(grid, entrance_cell):
+        visited = grid.new_visited()
+        visited[entrance_cell] = ENTRANCE
+        ShortestPathSolver.sweep(grid, visited, [entrance_cell])
+        return visited
+
+    @staticmethod
+    def sweep(grid, visited, queue):
+        """
+        Breadth first search from the cells in queue over the cells not
+        visited yet, marking them; returns the number of cells it reached.
+        """
+        down, up, right, left = grid.offsets
+        reached = len(queue)
+        # The list grows while it is iterated, which makes it the queue.
+        push = queue.append
+        for cell in queue:
+            # Unrolled over grid.offsets, this is the innermost loop.
+            next_cell = cell + down
+            if not visited[next_cell]:
+                visited[next_cell] = DOWN
+                push(next_cell)
+            next_cell = cell + up
+            if not visited[next_cell]:
+                visited[next_cell] = UP
+                push(next_cell)
+            next_cell = cell + right
+            if not visited[next_cell]:
+                visited[next_cell] = RIGHT
+                push(next_cell)
+            next_cell = cell + left
+            if not visited[next_cell]:
+                visited[next_cell] = LEFT
+                push(next_cell)
+        return len(queue) - reached
+
+    @staticmethod
+    def reached_exits(grid, visited):
+        return [
+            cell for cell in range(grid.first_exit_cell, grid.last_exit_cell + 1)
+            if visited[cell] >= ENTRANCE
+        ]
+
+    @staticmethod
+    def distances(grid, visited):
+        """
+        Steps from the entrance to every cell of a search, UNREACHED for walls
+        and cells that cannot be reached, as a matrix indexed like the padded
+        grid. Each mark points to the cell it was reached from; following
+        the pointers by doubling adds up the steps to the entrance in as many
+        passes over the grid as the bits of the longest distance.
+        """
+        marks = numpy.frombuffer(bytes(visited), dtype=numpy.uint8)
+        stepped = marks >= DOWN
+        parents = numpy.arange(len(marks))
+        parents[stepped] -= numpy.array(grid.offsets)[marks[stepped] - DOWN]
+        distances = stepped.astype(numpy.int32)
+        while stepped[parents].any():
+            distances += distances[parents]
+            parents = parents[parents]
+        distances[marks < ENTRANCE] = UNREACHED
+        return distances.reshape(grid.size // grid.width, grid.width)
+
+    @staticmethod
+    def build_path(grid, visited, exit_cell):
+        # Offsets indexed by the mark of the move into a cell, walking back
+        # from the exit with locals only: paths of a large maze run to
+        # hundreds of thousands of cells.
+        steps = (0,) * DOWN + grid.offsets
+        path = [exit_cell]
+        push = path.append
+        cell = exit_cell
+        mark = visited[cell]
+        while mark != ENTRANCE:
+            cell -= steps[mark]
+            push(cell)
+            mark = visited[cell]
+        path.reverse()
+        return path
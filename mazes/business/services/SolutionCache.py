@@ -0,0 +1,165 @@
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+
+import numpy
+from django.apps import apps
+from django.conf import settings
+
+
+class SolutionCache:
+    """
+    Solutions of mazes keyed by a hash of their content, so identical mazes
+    from any user are solved once. An in-process LRU, bounded by the bytes
+    of packed paths it holds, sits in front of the MazeSolution table.
+    """
+    _lock = threading.Lock()
+    _entries = OrderedDict()
+    _size = 0
+    _stats = {'memory_hits': 0, 'db_hits': 0, 'misses': 0}
+
+    @staticmethod
+    def content_hash(parsed):
+        """
+        Hash of a ParsedMaze: its sizes, entrance and a bitmap of its walls,
+        the same whatever the order the walls are listed in or repeated.
+        """
+        walls = numpy.zeros(parsed.rows_size * parsed.cols_size, dtype=bool)
+        walls[numpy.array(parsed.wall_rows, dtype=numpy.int64) * parsed.cols_size + parsed.wall_cols] = True
+        return SolutionCache.walls_hash(parsed.rows_size, parsed.cols_size, parsed.entrance_row,
+                                        parsed.entrance_col, walls)
+
+    @staticmethod
+    def walls_hash(rows_size, cols_size, entrance_row, entrance_col, walls):
+        """
+        content_hash of a maze given whether each of its cells is a wall, as
+        a boolean numpy array row by row.
+        """
+        content = hashlib.sha256(json.dumps([rows_size, cols_size, entrance_row, entrance_col]).encode())
+        content.update(numpy.packbits(walls, axis=None).tobytes())
+        return content.hexdigest()
+
+    @staticmethod
+    def get(content_hash):
+        """
+        (exit_coordinates, min_moves, max_moves, reachable, exit_tree) of a
+        maze already solved, or None.
+        """
+        return SolutionCache.get_many([content_hash]).get(content_hash)
+
+    @staticmethod
+    def get_many(content_hashes):
+        """
+        Solutions already known by content hash, reading those that are not
+        in memory with one query per thousand hashes.
+        """
+        solutions = {}
+        missing = []
+        with SolutionCache._lock:
+            for content_hash in dict.fromkeys(content_hashes):
+                solution = SolutionCache._entries.get(content_hash)
+                if solution is None:
+                    missing.append(content_hash)
+                    continue
+                SolutionCache._entries.move_to_end(content_hash)
+                SolutionCache._stats['memory_hits'] += 1
+                solutions[content_hash] = solution
+
+        model = apps.get_model('mazes', 'MazeSolution')
+        db_hits = 0
+        for start in range(0, len(missing), 1000):
+            for stored in model.objects.filter(content_hash__in=missing[start:start + 1000]):
+                solution = (
+                    stored.exit_coordinates,
+                    _as_bytes(stored.min_moves),
+                    _as_bytes(stored.max_moves),
+                    _as_bytes(stored.reachable),
+                    _as_bytes(stored.exit_tree)
+                )
+                SolutionCache._remember(stored.content_hash, solution)
+                solutions[stored.content_hash] = solution
+                db_hits += 1
+        with SolutionCache._lock:
+            SolutionCache._stats['db_hits'] += db_hits
+            SolutionCache._stats['misses'] += len(missing) - db_hits
+        return solutions
+
+    @staticmethod
+    def put(content_hash, solution):
+        SolutionCache.put_many({content_hash: solution})
+
+    @staticmethod
+    def put_many(solutions):
+        model = apps.get_model('mazes', 'MazeSolution')
+        model.objects.bulk_create([
+            model(
+                content_hash=content_hash,
+                exit_coordinates=exit_coordinates,
+                min_moves=min_moves,
+                max_moves=max_moves,
+                reachable=reachable,
+                exit_tree=exit_tree
+            )
+            for content_hash, (exit_coordinates, min_moves, max_moves, reachable, exit_tree) in solutions.items()
+        ], ignore_conflicts=True)
+        for content_hash, solution in solutions.items():
+            SolutionCache._remember(content_hash, solution)
+
+    @staticmethod
+    def put_max(content_hash, max_moves):
+        """
+        Completes a solution stored without its max path.
+        """
+        model = apps.get_model('mazes', 'MazeSolution')
+        model.objects.filter(content_hash=content_hash).update(max_moves=max_moves, max_started_at=None)
+        with SolutionCache._lock:
+            solution = SolutionCache._entries.get(content_hash)
+            if solution is None:
+                return
+            SolutionCache._size -= SolutionCache._entry_size(solution)
+            solution = solution[:2] + (max_moves,) + solution[3:]
+            SolutionCache._entries[content_hash] = solution
+            SolutionCache._size += SolutionCache._entry_size(solution)
+
+    @staticmethod
+    def stats():
+        with SolutionCache._lock:
+            return {
+                **SolutionCache._stats,
+                'entries': len(SolutionCache._entries),
+                'size': SolutionCache._size,
+                'max_size': settings.MAZE_SOLUTION_CACHE_SIZE
+            }
+
+    @staticmethod
+    def clear():
+        with SolutionCache._lock:
+            SolutionCache._entries.clear()
+            SolutionCache._size = 0
+            for name in SolutionCache._stats:
+                SolutionCache._stats[name] = 0
+
+    @staticmethod
+    def _remember(content_hash, solution):
+        size = SolutionCache._entry_size(solution)
+        max_size = settings.MAZE_SOLUTION_CACHE_SIZE
+        if size > max_size:
+            return
+        with SolutionCache._lock:
+            if content_hash in SolutionCache._entries:
+                return
+            SolutionCache._entries[content_hash] = solution
+            SolutionCache._size += size
+            while SolutionCache._size > max_size:
+                _, evicted = SolutionCache._entries.popitem(last=False)
+                SolutionCache._size -= SolutionCache._entry_size(evicted)
+
+    @staticmethod
+    def _entry_size(solution):
+        return 64 + sum(len(packed or b'') for packed in solution[1:])
+
+
+def _as_bytes(moves):
+    # Some databases return binary columns as memoryview.
+    return bytes(moves) if moves is not None else None
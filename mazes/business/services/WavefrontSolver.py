@@ -0,0 +1,72 @@
+import numpy
+from rest_framework.exceptions import ValidationError
+
+from mazes.business.services.ShortestPathSolver import UNREACHED
+
+
+class WavefrontSolver:
+    """
+    Breadth first search over the whole grid at once: the walls are a NumPy
+    array and each step grows the frontier by shifting it in the four
+    directions, masked by the cells not reached yet. A step costs the box
+    around the area reached so far instead of Python calls per cell, which
+    pays off in open mazes but adds up to the length of the longest path
+    times the area along corridors, so distance maps are served from
+    ShortestPathSolver's marks, whose total cost is the area itself.
+    """
+
+    @staticmethod
+    def solve(grid, entrance_cell, stats=None):
+        distances = WavefrontSolver.distances(grid, entrance_cell)
+        if stats is not None:
+            stats['expanded'] = int(numpy.count_nonzero(distances != UNREACHED))
+        exit_cols = numpy.flatnonzero(distances[grid.rows_size, 1:-1] != UNREACHED)
+        if len(exit_cols) > 1:
+            raise ValidationError('Maze has more than one exit')
+        if not len(exit_cols):
+            return None, None
+        exit_cell = grid.cell(grid.rows_size - 1, int(exit_cols[0]))
+        return exit_cell, WavefrontSolver.build_path(grid, distances, exit_cell)
+
+    @staticmethod
+    def distances(grid, entrance_cell):
+        """
+        Steps from the entrance to every cell, UNREACHED for walls and cells
+        that cannot be reached, as a matrix indexed like the padded grid.
+        """
+        shape = (grid.size // grid.width, grid.width)
+        unvisited = numpy.frombuffer(bytes(grid.walls), dtype=numpy.uint8).reshape(shape) == 0
+        distances = numpy.full(shape, UNREACHED, dtype=numpy.int32)
+        frontier = numpy.zeros(shape, dtype=bool)
+        row, col = divmod(entrance_cell, grid.width)
+        distances[row, col] = 0
+        unvisited[row, col] = False
+        frontier[row, col] = True
+
+        # Box of the cells reached so far, it grows by one cell a step.
+        top, bottom, left, right = row, row, col, col
+        step = 0
+        while True:
+            step += 1
+            top, bottom = max(top - 1, 1), min(bottom + 1, grid.rows_size)
+            left, right = max(left - 1, 1), min(right + 1, grid.cols_size)
+            around = frontier[top - 1:bottom + 2, left - 1:right + 2]
+            box = (slice(top, bottom + 1), slice(left, right + 1))
+            reached = around[:-2, 1:-1] | around[2:, 1:-1] | around[1:-1, :-2] | around[1:-1, 2:]
+            reached &= unvisited[box]
+            if not reached.any():
+                return distances
+            around[:] = False
+            frontier[box] = reached
+            unvisited[box] &= ~reached
+            distances[box][reached] = step
+
+    @staticmethod
+    def build_path(grid, distances, exit_cell):
+        distances = distances.ravel()
+        path = [exit_cell]
+        for distance in range(int(distances[exit_cell]) - 1, -1, -1):
+            cell = path[-1]
+            path.append(next(cell + offset for offset in grid.offsets if distances[cell + offset] == distance))
+        path.reverse()
+        return path
@@ -0,0 +1,13 @@
+from django.conf import settings
+
+
+def configure_connection(sender, connection, **kwargs):
+    """
+    Sets SQLITE_PRAGMAS on every new SQLite connection, pragmas being per
+    connection and not something the database settings can hold.
+    """
+    if connection.vendor != 'sqlite':
+        return
+    with connection.cursor() as cursor:
+        for name, value in settings.SQLITE_PRAGMAS.items():
+            cursor.execute(f'PRAGMA {name} = {value}')
@@ -0,0 +1,151 @@
+import json
+import platform
+import time
+import tracemalloc
+
+from django.core.management.base import BaseCommand, CommandError
+
+from mazes.business.services.AStarSolver import AStarSolver
+from mazes.business.services.BidirectionalSolver import BidirectionalSolver
+from mazes.business.services.ExitCheck import ExitCheck
+from mazes.business.services.LongestPathSolver import LongestPathSolver, OverLimits
+from mazes.business.services.MazeGenerator import MazeGenerator
+from mazes.business.services.MazeSolver import MazeSolver
+from mazes.business.services.ShortestPathSolver import ShortestPathSolver
+from mazes.business.services.WavefrontSolver import WavefrontSolver
+
+
+def _bfs(grid, entrance_cell, exit_cell, stats):
+    ShortestPathSolver.solve(grid, entrance_cell, stats)
+
+
+def _exit_check(grid, entrance_cell, exit_cell, stats):
+    ExitCheck.find_exit(grid, entrance_cell, stats)
+
+
+def _astar(grid, entrance_cell, exit_cell, stats):
+    AStarSolver.solve(grid, entrance_cell, stats)
+
+
+def _bidirectional(grid, entrance_cell, exit_cell, stats):
+    BidirectionalSolver.solve(grid, entrance_cell, stats)
+
+
+def _wavefront(grid, entrance_cell, exit_cell, stats):
+    WavefrontSolver.solve(grid, entrance_cell, stats)
+
+
+def _distances(grid, entrance_cell, exit_cell, stats):
+    ShortestPathSolver.distances(grid, ShortestPathSolver.search(grid, entrance_cell))
+
+
+def _longest(grid, entrance_cell, exit_cell, stats):
+    try:
+        LongestPathSolver.solve(grid, entrance_cell, exit_cell, stats)
+    except OverLimits:
+        pass
+
+
+def _dfs(grid, entrance_cell, exit_cell, stats):
+    for _ in MazeSolver.iter_cell_paths(grid, entrance_cell, stats):
+        pass
+
+
+# Engine, and whether it is worth running on a family and size: every path
+# is enumerated by dfs, only bearable when there is a single one, and each
+# wavefront step scans the area reached, too slow along long corridors.
+ENGINES = {
+    'bfs': (_bfs, lambda family, size: True),
+    'exit_check': (_exit_check, lambda family, size: True),
+    'astar': (_astar, lambda family, size: True),
+    'bidirectional': (_bidirectional, lambda family, size: True),
+    'wavefront': (_wavefront, lambda family, size: family in ('rooms', 'random', 'sparse') or size <= 200),
+    'distances': (_distances, lambda family, size: True),
+    'longest': (_longest, lambda family, size: True),
+    'dfs': (_dfs, lambda family, size: family in ('perfect', 'serpentine')),
+}
+
+
+class Command(BaseCommand):
+    help = 'Benchmarks the maze solvers on generated mazes and compares them with a baseline'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--engines', nargs='+', choices=list(ENGINES), default=list(ENGINES))
+        parser.add_argument('--families', nargs='+', choices=MazeGenerator.FAMILIES, default=MazeGenerator.FAMILIES)
+        # Rooms of 9x9 and 10x10 grids are narrow enough for the longest path.
+        parser.add_argument('--sizes', nargs='+', type=int, default=[9, 10, 50, 200, 1000],
+                            help='Sides of square grids')
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument('--repeat', type=int, default=3, help='Runs of each case, the fastest is kept')
+        parser.add_argument('--save', help='Writes the results as a baseline to this JSON file')
+        parser.add_argument('--compare', help='Compares the results with this baseline JSON file')
+        parser.add_argument('--threshold', type=float, default=0.25,
+                            help='Relative increase over the baseline reported as a regression')
+
+    def handle(self, *args, **options):
+        results = {}
+        for family in options['families']:
+            for size in options['sizes']:
+                grid = MazeGenerator.generate(family, size, size, options['seed'])
+                entrance_cell = grid.cell(0, 0)
+                exit_cell = ShortestPathSolver.solve(grid, entrance_cell)[0]
+                for engine in options['engines']:
+                    run, is_worth_running = ENGINES[engine]
+                    if not is_worth_running(family, size):
+                        continue
+                    case = f'{engine}/{family}/{size}x{size}'
+                    results[case] = self.measure(run, grid, entrance_cell, exit_cell, options['repeat'])
+                    self.stdout.write(self.format_result(case, results[case]))
+
+        if options['save']:
+            with open(options['save'], 'w') as baseline_file:
+                json.dump({'python': platform.python_version(), 'results': results}, baseline_file, indent=2)
+        if options['compare']:
+            with open(options['compare']) as baseline_file:
+                baseline = json.load(baseline_file)['results']
+            regressions = self.compare(results, baseline, options['threshold'])
+            for regression in regressions:
+                self.stderr.write(regression)
+            if regressions:
+                raise CommandError(f'{len(regressions)} regressions over {options["compare"]}')
+
+    @staticmethod
+    def measure(run, grid, entrance_cell, exit_cell, repeat):
+        stats = {}
+        seconds = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            run(grid, entrance_cell, exit_cell, stats)
+            seconds.append(time.perf_counter() - start)
+        # Tracing allocations slows the run down, so it is not timed.
+        tracemalloc.start()
+        run(grid, entrance_cell, exit_cell, {})
+        peak_memory = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        return {'seconds': min(seconds), 'peak_memory': peak_memory, 'expanded': stats.get('expanded')}
+
+    @staticmethod
+    def compare(results, baseline, threshold):
+        """
+        Cases slower, more memory hungry or expanding more cells than in the
+        baseline by more than the threshold. Times under a few milliseconds
+        are too noisy to be compared.
+        """
+        regressions = []
+        for case, result in results.items():
+            if case not in baseline:
+                continue
+            for metric, tolerance in (('seconds', 0.005), ('peak_memory', 0), ('expanded', 0)):
+                value, baseline_value = result[metric], baseline[case][metric]
+                if value is None or baseline_value is None:
+                    continue
+                if value > baseline_value * (1 + threshold) and value - baseline_value > tolerance:
+                    regressions.append(f'{case}: {metric} went from {baseline_value} to {value}')
+        return regressions
+
+    @staticmethod
+    def format_result(case, result):
+        return (
+            f'{case:<32} {result["seconds"] * 1000:>10.2f} ms '
+            f'{result["peak_memory"] / 1024:>10.0f} KiB {result["expanded"] or 0:>10} expanded'
+        )
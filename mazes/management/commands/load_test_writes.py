@@ -0,0 +1,75 @@
+import time
+from multiprocessing import Event, Process, Queue
+
+from django.core.management.base import BaseCommand
+from django.db import OperationalError, connections
+
+from mazes.business.services.MazeGenerator import MazeGenerator
+from mazes.models import Maze
+from users.models import User
+
+USER_EMAIL = 'load-test@maze-solver.local'
+
+
+class Command(BaseCommand):
+    help = 'Creates distinct mazes from concurrent processes and reports the write throughput of the database'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--processes', type=int, default=4, help='Number of processes writing at once')
+        parser.add_argument('--mazes', type=int, default=200, help='Mazes created by each process')
+        parser.add_argument('--size', type=int, default=20, help='Side of the square mazes')
+        parser.add_argument('--keep', action='store_true', help='Keeps the mazes created and their user')
+
+    def handle(self, *args, **options):
+        user = User.objects.filter(email=USER_EMAIL).first() or User.objects.create_user(USER_EMAIL, USER_EMAIL)
+        processes, mazes, size = options['processes'], options['mazes'], options['size']
+        start = Event()
+        results = Queue()
+        if processes <= 1:
+            start.set()
+            self.work(user, 0, mazes, size, start, results)
+            outcomes = [results.get()]
+        else:
+            # Forked workers must not share the parent's database connections.
+            connections.close_all()
+            workers = [
+                Process(target=self.work, args=(user, index, mazes, size, start, results))
+                for index in range(processes)
+            ]
+            for worker in workers:
+                worker.start()
+            start.set()
+            outcomes = [results.get() for _ in workers]
+            for worker in workers:
+                worker.join()
+
+        written = sum(outcome[0] for outcome in outcomes)
+        locked = sum(outcome[1] for outcome in outcomes)
+        seconds = max(outcome[3] for outcome in outcomes) - min(outcome[2] for outcome in outcomes)
+        self.stdout.write(
+            f'{processes} processes wrote {written} mazes in {seconds:.2f} s: '
+            f'{written / seconds:.1f} mazes/s, {locked} failed with database is locked'
+        )
+        if not options['keep']:
+            user.delete()
+
+    @staticmethod
+    def work(user, index, mazes, size, start, results):
+        """
+        Saves mazes solved within the save, as POST /mazes does, each one
+        distinct so that the solution cache is written as well.
+        """
+        walls = [
+            MazeGenerator.walls_of(MazeGenerator.generate('perfect', size, size, seed=index * mazes + seed))
+            for seed in range(mazes)
+        ]
+        written = locked = 0
+        start.wait()
+        started_at = time.monotonic()
+        for maze_walls in walls:
+            try:
+                Maze(grid_size=f'{size}x{size}', entrance='A1', walls=maze_walls, user=user).save()
+                written += 1
+            except OperationalError:
+                locked += 1
+        results.put((written, locked, started_at, time.monotonic()))
@@ -0,0 +1,40 @@
+import time
+from multiprocessing import Process
+
+from django.core.management.base import BaseCommand
+from django.db import connections
+
+from mazes.business.services.MazeSolveQueue import MazeSolveQueue
+
+
+class Command(BaseCommand):
+    help = 'Solves the mazes created while MAZE_SOLVE_MODE is async'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=1, help='Number of worker processes')
+        parser.add_argument('--poll', type=float, default=1.0, help='Seconds to wait when the queue is empty')
+        parser.add_argument('--once', action='store_true', help='Exit once the queue is empty')
+
+    def handle(self, *args, **options):
+        if options['workers'] <= 1:
+            self.work(options['poll'], options['once'])
+            return
+        # Forked workers must not share the parent's database connections.
+        connections.close_all()
+        workers = [
+            Process(target=self.work, args=(options['poll'], options['once']))
+            for _ in range(options['workers'])
+        ]
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+
+    @staticmethod
+    def work(poll, once):
+        while True:
+            if MazeSolveQueue.solve_next():
+                continue
+            if once:
+                return
+            time.sleep(poll)
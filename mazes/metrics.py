@@ -0,0 +1,166 @@
+"""
+Counters and latency histograms in the Prometheus text exposition format.
+
+Each process adds up its samples in memory and, at most once every
+METRICS_FLUSH_INTERVAL seconds, writes its running totals to a SQLite file
+shared by every worker of the host, one row per process, series and bucket.
+GET /metrics adds up the rows of all the processes, including those that
+have exited, so totals survive worker restarts.
+"""
+import atexit
+import functools
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from contextlib import closing, contextmanager
+
+from django.conf import settings
+
+BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, float('inf'))
+
+HELP = {
+    'maze_request_duration_seconds': ('histogram', 'Time spent answering a maze request'),
+    'maze_save_duration_seconds': ('histogram', 'Time spent in each phase of saving a maze'),
+    'maze_solver_duration_seconds': ('histogram', 'Time spent in each solver call'),
+    'maze_solver_expanded_cells_total': ('counter', 'Cells expanded by each solver'),
+    'maze_paths_enumerated_total': ('counter', 'Paths yielded by the depth first path enumeration'),
+    'maze_validation_failures_total': ('counter', 'Mazes rejected by validation'),
+    'maze_response_cache_requests_total': ('counter', 'Reads of the response cache, by cache and hit or miss'),
+}
+
+_lock = threading.Lock()
+# (name, labels, bucket) to running total, labels being a sorted tuple of
+# pairs and bucket None for counters, the index in BUCKETS for histogram
+# counts, 'sum' and 'count'.
+_samples = {}
+_process = f'{os.getpid()}-{uuid.uuid4().hex}'
+_last_flush = time.monotonic()
+
+
+def increment(name, amount=1, **labels):
+    key = (name, tuple(sorted(labels.items())), None)
+    with _lock:
+        _samples[key] = _samples.get(key, 0) + amount
+    _flush_if_due()
+
+
+def observe(name, seconds, **labels):
+    labels = tuple(sorted(labels.items()))
+    bucket = next(index for index, bound in enumerate(BUCKETS) if seconds <= bound)
+    with _lock:
+        for key, amount in (
+            ((name, labels, bucket), 1),
+            ((name, labels, 'count'), 1),
+            ((name, labels, 'sum'), seconds),
+        ):
+            _samples[key] = _samples.get(key, 0) + amount
+    _flush_if_due()
+
+
+@contextmanager
+def timer(name, **labels):
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        observe(name, time.perf_counter() - start, **labels)
+
+
+def timed(name, **labels):
+    def decorator(function):
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            with timer(name, **labels):
+                return function(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def flush():
+    global _last_flush
+    with _lock:
+        rows = [
+            (_process, name, _labels_text(labels), str(bucket), value)
+            for (name, labels, bucket), value in _samples.items()
+        ]
+        _last_flush = time.monotonic()
+    if not rows:
+        return
+    with closing(_connect()) as connection, connection:
+        connection.executemany(
+            'INSERT OR REPLACE INTO samples (process, name, labels, bucket, value) VALUES (?, ?, ?, ?, ?)',
+            rows
+        )
+
+
+def render():
+    """
+    Every series added up across processes, in the text exposition format.
+    """
+    flush()
+    with closing(_connect()) as connection:
+        rows = connection.execute(
+            'SELECT name, labels, bucket, SUM(value) FROM samples GROUP BY name, labels, bucket'
+        ).fetchall()
+    series = {}
+    for name, labels, bucket, value in rows:
+        series.setdefault(name, {}).setdefault(labels, {})[bucket] = value
+
+    lines = []
+    for name in sorted(series):
+        kind, description = HELP.get(name, ('untyped', name))
+        lines.append(f'# HELP {name} {description}')
+        lines.append(f'# TYPE {name} {kind}')
+        for labels, values in sorted(series[name].items()):
+            if 'None' in values:
+                lines.append(f'{name}{_braces(labels)} {_number(values["None"])}')
+                continue
+            cumulative = 0
+            for index, bound in enumerate(BUCKETS):
+                cumulative += values.get(str(index), 0)
+                le = 'le="' + ('+Inf' if bound == float('inf') else repr(bound)) + '"'
+                lines.append(f'{name}_bucket{_braces(labels, le)} {_number(cumulative)}')
+            lines.append(f'{name}_sum{_braces(labels)} {_number(values.get("sum", 0))}')
+            lines.append(f'{name}_count{_braces(labels)} {_number(values.get("count", 0))}')
+    return '\n'.join(lines) + '\n'
+
+
+def _flush_if_due():
+    if time.monotonic() - _last_flush >= settings.METRICS_FLUSH_INTERVAL:
+        flush()
+
+
+def _connect():
+    connection = sqlite3.connect(settings.METRICS_PATH, timeout=5)
+    connection.execute(
+        'CREATE TABLE IF NOT EXISTS samples ('
+        'process TEXT, name TEXT, labels TEXT, bucket TEXT, value REAL, '
+        'PRIMARY KEY (process, name, labels, bucket))'
+    )
+    return connection
+
+
+def _labels_text(labels):
+    return ','.join(f'{label}="{value}"' for label, value in labels)
+
+
+def _braces(labels, extra=''):
+    text = ','.join(part for part in (labels, extra) if part)
+    return '{' + text + '}' if text else ''
+
+
+def _number(value):
+    return str(int(value)) if float(value).is_integer() else repr(value)
+
+
+def _forget_parent():
+    # A forked child would otherwise write its parent's totals as its own.
+    global _process
+    _samples.clear()
+    _process = f'{os.getpid()}-{uuid.uuid4().hex}'
+
+
+atexit.register(flush)
+os.register_at_fork(after_in_child=_forget_parent)
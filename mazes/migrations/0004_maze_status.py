@@ -0,0 +1,28 @@
+# Generated by Django 3.2.8 on 2026-10-18 17:08
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('mazes', '0003_auto_20220817_0034'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='maze',
+            name='error',
+            field=models.TextField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='maze',
+            name='started_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='maze',
+            name='status',
+            field=models.CharField(choices=[('pending', 'Pending'), ('running', 'Running'), ('done', 'Done'), ('failed', 'Failed')], db_index=True, default='done', max_length=10),
+        ),
+    ]
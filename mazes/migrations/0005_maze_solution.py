@@ -0,0 +1,28 @@
+# Generated by Django 3.2.8 on 2026-10-18 17:10
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('mazes', '0004_maze_status'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MazeSolution',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('content_hash', models.CharField(max_length=64, unique=True)),
+                ('exit_coordinates', models.CharField(blank=True, max_length=20, null=True)),
+                ('min_path', models.JSONField(blank=True, null=True)),
+                ('max_path', models.JSONField(blank=True, null=True)),
+            ],
+        ),
+        migrations.AddField(
+            model_name='maze',
+            name='content_hash',
+            field=models.CharField(blank=True, max_length=64, null=True),
+        ),
+    ]
@@ -0,0 +1,78 @@
+from django.db import migrations, models
+
+from mazes.business.model import path_codec
+
+
+def pack_paths(apps, schema_editor):
+    for model_name in ('Maze', 'MazeSolution'):
+        model = apps.get_model('mazes', model_name)
+        rows = []
+        for row in model.objects.only('id', 'min_path', 'max_path').iterator(chunk_size=500):
+            row.min_moves = path_codec.encode_coordinates(row.min_path)
+            row.max_moves = path_codec.encode_coordinates(row.max_path)
+            rows.append(row)
+            if len(rows) == 500:
+                model.objects.bulk_update(rows, ['min_moves', 'max_moves'])
+                rows = []
+        model.objects.bulk_update(rows, ['min_moves', 'max_moves'])
+
+
+def unpack_paths(apps, schema_editor):
+    for model_name in ('Maze', 'MazeSolution'):
+        model = apps.get_model('mazes', model_name)
+        rows = []
+        for row in model.objects.only('id', 'min_moves', 'max_moves').iterator(chunk_size=500):
+            row.min_path = path_codec.decode_coordinates(row.min_moves)
+            row.max_path = path_codec.decode_coordinates(row.max_moves)
+            rows.append(row)
+            if len(rows) == 500:
+                model.objects.bulk_update(rows, ['min_path', 'max_path'])
+                rows = []
+        model.objects.bulk_update(rows, ['min_path', 'max_path'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('mazes', '0005_maze_solution'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='maze',
+            name='min_moves',
+            field=models.BinaryField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='maze',
+            name='max_moves',
+            field=models.BinaryField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='mazesolution',
+            name='min_moves',
+            field=models.BinaryField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='mazesolution',
+            name='max_moves',
+            field=models.BinaryField(blank=True, null=True),
+        ),
+        migrations.RunPython(pack_paths, unpack_paths),
+        migrations.RemoveField(
+            model_name='maze',
+            name='min_path',
+        ),
+        migrations.RemoveField(
+            model_name='maze',
+            name='max_path',
+        ),
+        migrations.RemoveField(
+            model_name='mazesolution',
+            name='min_path',
+        ),
+        migrations.RemoveField(
+            model_name='mazesolution',
+            name='max_path',
+        ),
+    ]
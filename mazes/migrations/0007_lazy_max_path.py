@@ -0,0 +1,36 @@
+from django.db import migrations, models
+
+from mazes.business.model import path_codec
+
+
+def mark_no_paths(apps, schema_editor):
+    # Paths used to be solved with the maze, so a missing one is known not
+    # to exist; from now on None is a path not solved yet.
+    Maze = apps.get_model('mazes', 'Maze')
+    MazeSolution = apps.get_model('mazes', 'MazeSolution')
+    for rows in (Maze.objects.filter(status='done'), MazeSolution.objects.all()):
+        for field in ('min_moves', 'max_moves'):
+            rows.filter(**{f'{field}__isnull': True}).update(**{field: path_codec.NO_PATH})
+
+
+def unmark_no_paths(apps, schema_editor):
+    for model_name in ('Maze', 'MazeSolution'):
+        model = apps.get_model('mazes', model_name)
+        for field in ('min_moves', 'max_moves'):
+            model.objects.filter(**{field: path_codec.NO_PATH}).update(**{field: None})
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('mazes', '0006_packed_paths'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='mazesolution',
+            name='max_started_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.RunPython(mark_no_paths, unmark_no_paths),
+    ]
@@ -0,0 +1,22 @@
+# Generated by Django 3.2.8 on 2026-10-18 17:33
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('mazes', '0007_lazy_max_path'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MazeSearchState',
+            fields=[
+                ('maze', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, serialize=False, to='mazes.maze')),
+                ('content_hash', models.CharField(max_length=64)),
+                ('state', models.BinaryField()),
+            ],
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 3.2.8 on 2026-10-18 17:57
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('mazes', '0008_maze_search_state'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='maze',
+            name='reachable',
+            field=models.BinaryField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='mazesolution',
+            name='reachable',
+            field=models.BinaryField(blank=True, null=True),
+        ),
+    ]
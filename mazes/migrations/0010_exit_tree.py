@@ -0,0 +1,23 @@
+# Generated by Django 3.2.8 on 2026-10-18 18:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('mazes', '0009_reachability_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='maze',
+            name='exit_tree',
+            field=models.BinaryField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='mazesolution',
+            name='exit_tree',
+            field=models.BinaryField(blank=True, null=True),
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 3.2.8 on 2026-10-18 18:01
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('mazes', '0010_exit_tree'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='maze',
+            index=models.Index(fields=['user', 'id'], name='maze_user_id_idx'),
+        ),
+    ]
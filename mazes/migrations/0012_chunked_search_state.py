@@ -0,0 +1,18 @@
+from django.db import migrations
+
+
+def drop_search_states(apps, schema_editor):
+    # States used to be packed whole, the next edit of each maze searches
+    # it from scratch and packs its state in chunks.
+    apps.get_model('mazes', 'MazeSearchState').objects.all().delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('mazes', '0011_maze_user_id_index'),
+    ]
+
+    operations = [
+        migrations.RunPython(drop_search_states, migrations.RunPython.noop),
+    ]
@@ -1,44 +1,220 @@
+import numpy
 from django.db import models
+from rest_framework.exceptions import ValidationError
 
+from mazes import metrics
+from mazes.business.model import exit_tree, path_codec, reachability
 from mazes.business.model.validators import maze_validator
-from mazes.business.services.MazeSolver import MazeSolver
+from mazes.business.services.ExitCheck import ExitCheck
+from mazes.business.services.LazySolution import LazySolution
+from mazes.business.services.LongestPathSolver import LongestPathSolver, OverLimits
+from mazes.business.services.ResponseCache import ResponseCache
+from mazes.business.services.ShortestPathSolver import DOWN, ENTRANCE, ShortestPathSolver
+from mazes.business.services.SolutionCache import SolutionCache
 from users.models import User
 
 
 class Maze(models.Model):
+    PENDING = 'pending'
+    RUNNING = 'running'
+    DONE = 'done'
+    FAILED = 'failed'
+    STATUSES = (
+        (PENDING, 'Pending'),
+        (RUNNING, 'Running'),
+        (DONE, 'Done'),
+        (FAILED, 'Failed'),
+    )
     grid_size = models.CharField(max_length=20)
     entrance = models.CharField(max_length=20)
     walls = models.JSONField()
     user = models.ForeignKey(User, to_field='email', on_delete=models.CASCADE)
     exit_coordinates = models.CharField(max_length=20, null=True, blank=True)
-    min_path = models.JSONField(null=True, blank=True)
-    max_path = models.JSONField(null=True, blank=True)
+    # Paths packed by path_codec, read as coordinates through min_path and
+    # max_path. The max path is solved on its first read: None until then,
+    # path_codec.NO_PATH when there is none.
+    min_moves = models.BinaryField(null=True, blank=True)
+    max_moves = models.BinaryField(null=True, blank=True)
+    # Cells reachable from the entrance, packed by reachability. None for
+    # mazes solved before it was stored, until it is first asked for.
+    reachable = models.BinaryField(null=True, blank=True)
+    # Shortest paths from every cell to the exit, packed by exit_tree, None
+    # like reachable until it is first asked for.
+    exit_tree = models.BinaryField(null=True, blank=True)
+    status = models.CharField(max_length=10, choices=STATUSES, default=DONE, db_index=True)
+    error = models.TextField(null=True, blank=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    content_hash = models.CharField(max_length=64, null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            # Keyset pagination of a user's mazes, see MazeCursorPagination.
+            models.Index(fields=['user', 'id'], name='maze_user_id_idx'),
+        ]
+
+    # The ParsedMaze the last clean validated, so a maze is parsed only once.
+    _parsed = None
+
+    @property
+    def min_path(self):
+        return path_codec.decode_coordinates(self.min_moves)
+
+    @property
+    def max_path(self):
+        if self.max_moves is None and self.status == Maze.DONE:
+            LazySolution.max_moves(self)
+        return path_codec.decode_coordinates(self.max_moves)
 
     def clean(self):
-        maze_validator.validate_maze(self.grid_size, self.walls, self.entrance)
+        try:
+            self._parsed = maze_validator.validate_maze(self.grid_size, self.walls, self.entrance)
+        except ValidationError:
+            metrics.increment('maze_validation_failures_total')
+            raise
+
+    def parsed(self):
+        if self._parsed is None:
+            self.clean()
+        return self._parsed
 
     def save(self, force_insert=False, force_update=False, using=None,
              update_fields=None):
-        self.full_clean()
-
-        grid_sizes = self.grid_size.split('x')
-        exit_coordinates, paths = MazeSolver.solve_maze_dfs(
-            entrance_coordinates=self.entrance,
-            walls=self.walls,
-            rows_size=int(grid_sizes[0]),
-            cols_size=int(grid_sizes[1])
+        """
+        Mazes saved as pending are left for the solve_mazes worker, any other
+        maze is solved before being saved, but for its max path.
+        """
+        with metrics.timer('maze_save_duration_seconds', phase='validation'):
+            # A user already loaded is known to exist, checking it is a query.
+            self.full_clean(exclude=['user'] if Maze.user.is_cached(self) else None)
+        if self.status != Maze.PENDING:
+            with metrics.timer('maze_save_duration_seconds', phase='solving'):
+                self.solve()
+        with metrics.timer('maze_save_duration_seconds', phase='db_write'):
+            super().save(force_insert, force_update, using, update_fields)
+        ResponseCache.invalidate(self.user_id)
+
+    def solve(self):
+        self.content_hash = SolutionCache.content_hash(self.parsed())
+        solution = SolutionCache.get(self.content_hash)
+        if solution is None:
+            solution = Maze.solve_parsed(self.parsed())
+            SolutionCache.put(self.content_hash, solution)
+        self.exit_coordinates, self.min_moves, self.max_moves, self.reachable, self.exit_tree = solution
+        self.status = Maze.DONE
+
+    def reachable_index(self):
+        """
+        Cells reachable from the entrance of a solved maze, packed by
+        reachability, built and stored the first time for mazes solved
+        before it was.
+        """
+        if self.reachable is None:
+            parsed = self.parsed()
+            grid = parsed.grid()
+            self.reachable = _encode_reachable(grid, ExitCheck.find_exit(grid, parsed.entrance_cell(grid))[1])
+            Maze.objects.filter(id=self.id, content_hash=self.content_hash).update(reachable=self.reachable)
+        return bytes(self.reachable)
+
+    def exit_tree_index(self):
+        """
+        Shortest paths from every cell to the exit of a solved maze, packed
+        by exit_tree, built and stored the first time they are asked for.
+        None for mazes saved without an exit before one was required.
+        """
+        if self.exit_coordinates is None:
+            return None
+        if self.exit_tree is None:
+            parsed = self.parsed()
+            grid = parsed.grid()
+            self.exit_tree = _encode_exit_tree(grid, parsed.entrance_cell(grid), grid.cell_of(self.exit_coordinates))
+            Maze.objects.filter(id=self.id, content_hash=self.content_hash).update(exit_tree=self.exit_tree)
+        return bytes(self.exit_tree)
+
+    @staticmethod
+    def solve_parsed(parsed):
+        """
+        (exit_coordinates, min_moves, max_moves, reachable, exit_tree) of a
+        ParsedMaze, the paths packed by path_codec and the cells reachable
+        from the entrance by reachability, without touching the database.
+        ExitCheck first makes sure the maze has exactly one exit, in time
+        linear in its area, so that no path search is spent on a maze that
+        is rejected. The check is a breadth first search, so its marks hold
+        the shortest path, while the max path is left to solve_max_parsed and
+        the exit tree to Maze.exit_tree_index.
+        """
+        grid = parsed.grid()
+        entrance_cell = parsed.entrance_cell(grid)
+        stats = {}
+        try:
+            with metrics.timer('maze_solver_duration_seconds', solver='exit_check'):
+                exit_cell, visited = ExitCheck.find_exit(grid, entrance_cell, stats)
+        finally:
+            metrics.increment('maze_solver_expanded_cells_total', stats.get('expanded', 0), solver='exit_check')
+        if exit_cell is None:
+            raise ValidationError('Maze has no exit')
+        min_path = ShortestPathSolver.build_path(grid, visited, exit_cell)
+        return (
+            grid.coordinates(exit_cell),
+            path_codec.encode_cells(grid, min_path),
+            None,
+            # The pre-check flood fills everything the entrance reaches.
+            _encode_reachable(grid, visited),
+            None
         )
 
-        max_path = None
-        min_path = None
-        for path in paths:
-            if not max_path or len(path) > len(max_path):
-                max_path = path
-            if not min_path or len(path) < len(min_path):
-                min_path = path
+    @staticmethod
+    def solve_max_parsed(parsed, exit_coordinates):
+        """
+        Packed max path of a ParsedMaze, path_codec.NO_PATH when there is
+        none and path_codec.NOT_SOLVED when the maze is over the longest
+        path solver's limits.
+        """
+        if exit_coordinates is None:
+            return path_codec.NO_PATH
+        grid = parsed.grid()
+        stats = {}
+        try:
+            with metrics.timer('maze_solver_duration_seconds', solver='longest'):
+                max_path = LongestPathSolver.solve(
+                    grid, parsed.entrance_cell(grid), grid.cell_of(exit_coordinates), stats
+                )
+        except OverLimits:
+            return path_codec.NOT_SOLVED
+        metrics.increment('maze_solver_expanded_cells_total', stats.get('expanded', 0), solver='longest')
+        return path_codec.encode_cells(grid, max_path) or path_codec.NO_PATH
+
+
+def _encode_reachable(grid, visited):
+    # Cells marked by a breadth first search from the entrance.
+    return reachability.encode(grid, numpy.frombuffer(visited, dtype=numpy.uint8) >= ENTRANCE)
+
+
+def _encode_exit_tree(grid, entrance_cell, exit_cell):
+    # A breadth first search from the exit, the maze being undirected. The
+    # entrance is open even when it is listed among the walls, as it is for
+    # the search from the entrance.
+    with metrics.timer('maze_solver_duration_seconds', solver='exit_tree'):
+        visited = grid.new_visited()
+        visited[entrance_cell] = 0
+        visited[exit_cell] = ENTRANCE
+        ShortestPathSolver.sweep(grid, visited, [exit_cell])
+        return exit_tree.encode(grid, visited, DOWN)
+
+
+class MazeSolution(models.Model):
+    content_hash = models.CharField(max_length=64, unique=True)
+    exit_coordinates = models.CharField(max_length=20, null=True, blank=True)
+    min_moves = models.BinaryField(null=True, blank=True)
+    max_moves = models.BinaryField(null=True, blank=True)
+    reachable = models.BinaryField(null=True, blank=True)
+    exit_tree = models.BinaryField(null=True, blank=True)
+    # Set while a process solves the max path, see LazySolution.
+    max_started_at = models.DateTimeField(null=True, blank=True)
 
-        self.min_path = min_path
-        self.max_path = max_path
-        self.exit_coordinates = exit_coordinates
-        return super().save(force_insert, force_update, using, update_fields)
 
+class MazeSearchState(models.Model):
+    # Distances of the last search of a maze, packed by IncrementalSolver,
+    # so that editing its walls only repairs what the edit changed.
+    maze = models.OneToOneField(Maze, on_delete=models.CASCADE, primary_key=True)
+    content_hash = models.CharField(max_length=64)
+    state = models.BinaryField()
@@ -0,0 +1,13 @@
+from rest_framework.pagination import CursorPagination
+
+
+class MazeCursorPagination(CursorPagination):
+    """
+    Keyset pagination over a user's mazes in id order: a page is the next
+    limit rows after the last id of the previous one, read from the (user,
+    id) index, so deep pages cost as much as the first and nothing is
+    counted.
+    """
+    ordering = 'id'
+    page_size_query_param = 'limit'
+    max_page_size = 1000
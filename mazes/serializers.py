@@ -5,15 +5,33 @@ from mazes.models import Maze
 
 class MazeSerializer(serializers.ModelSerializer):
     gridSize = serializers.CharField(read_only=True, source='grid_size')
+    # The user's email is the foreign key itself, read without loading the user.
+    user = serializers.CharField(read_only=True, source='user_id')
+    # Column each field is read from.
+    COLUMNS = {'id': 'id', 'entrance': 'entrance', 'walls': 'walls', 'user': 'user', 'gridSize': 'grid_size'}
 
     class Meta:
         model = Maze
         fields = ('id', 'entrance', 'walls', 'user', 'gridSize')
 
+    def __init__(self, *args, fields=None, **kwargs):
+        """
+        Only the given fields are serialized when fields is not None.
+        """
+        super().__init__(*args, **kwargs)
+        if fields is not None:
+            for name in set(self.fields) - set(fields):
+                self.fields.pop(name)
+
 
 class MazeCreationSerializer(serializers.ModelSerializer):
     gridSize = serializers.CharField(source='grid_size', required=False)
 
     class Meta:
         model = Maze
-        fields = ('entrance', 'walls', 'user', 'gridSize')
+        fields = ('entrance', 'walls', 'gridSize')
+
+
+class MazeEditSerializer(serializers.Serializer):
+    addWalls = serializers.ListField(child=serializers.CharField(), required=False, default=list)
+    removeWalls = serializers.ListField(child=serializers.CharField(), required=False, default=list)
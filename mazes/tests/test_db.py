@@ -0,0 +1,28 @@
+import io
+
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase
+
+from mazes.management.commands.load_test_writes import USER_EMAIL
+from mazes.models import Maze
+from users.models import User
+
+
+class DatabaseTest(TestCase):
+    def test_sqlite_pragmas(self):
+        with connection.cursor() as cursor:
+            cursor.execute('PRAGMA synchronous')
+            # NORMAL
+            self.assertEqual(1, cursor.fetchone()[0])
+            cursor.execute('PRAGMA temp_store')
+            # MEMORY
+            self.assertEqual(2, cursor.fetchone()[0])
+
+    def test_load_test_writes(self):
+        stdout = io.StringIO()
+        call_command('load_test_writes', processes=1, mazes=3, size=6, stdout=stdout)
+        self.assertIn('1 processes wrote 3 mazes', stdout.getvalue())
+        self.assertIn('0 failed with database is locked', stdout.getvalue())
+        self.assertFalse(User.objects.filter(email=USER_EMAIL).exists())
+        self.assertFalse(Maze.objects.exists())
@@ -0,0 +1,79 @@
+import os
+import tempfile
+from unittest import mock
+
+from django.test import Client, SimpleTestCase, TestCase, override_settings
+
+from mazes import metrics
+from mazes.business.services.SolutionCache import SolutionCache
+from users.serializers import UserRegistrationSerializer
+
+client = Client()
+
+
+class MetricsTest(SimpleTestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.path = os.path.join(directory.name, 'metrics.sqlite3')
+
+    def test_render_adds_up_processes(self):
+        with override_settings(METRICS_PATH=self.path):
+            with mock.patch.object(metrics, '_samples', {}), mock.patch.object(metrics, '_process', 'first'):
+                metrics.increment('maze_validation_failures_total', 2)
+                metrics.flush()
+            with mock.patch.object(metrics, '_samples', {}), mock.patch.object(metrics, '_process', 'second'):
+                metrics.increment('maze_validation_failures_total', 3)
+                metrics.observe('maze_solver_duration_seconds', 0.003, solver='bfs')
+                text = metrics.render()
+        self.assertIn('# TYPE maze_validation_failures_total counter\nmaze_validation_failures_total 5\n', text)
+        self.assertIn('maze_solver_duration_seconds_bucket{solver="bfs",le="0.0025"} 0\n', text)
+        self.assertIn('maze_solver_duration_seconds_bucket{solver="bfs",le="0.005"} 1\n', text)
+        self.assertIn('maze_solver_duration_seconds_bucket{solver="bfs",le="+Inf"} 1\n', text)
+        self.assertIn('maze_solver_duration_seconds_sum{solver="bfs"} 0.003\n', text)
+        self.assertIn('maze_solver_duration_seconds_count{solver="bfs"} 1\n', text)
+
+
+class MetricsViewTest(TestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.settings_override = override_settings(METRICS_PATH=os.path.join(directory.name, 'metrics.sqlite3'))
+        self.settings_override.enable()
+        self.addCleanup(self.settings_override.disable)
+        patch = mock.patch.object(metrics, '_samples', {})
+        patch.start()
+        self.addCleanup(patch.stop)
+        SolutionCache.clear()
+
+        data = {
+            "email": "rui@test.com",
+            "password": "rui",
+            "profile": {"name": "rui"},
+        }
+        serializer = UserRegistrationSerializer(data=data)
+        serializer.is_valid(raise_exception=True)
+        serializer.save()
+        response = client.post(path="/login", data={"email": "rui@test.com", "password": "rui"})
+        self.token = response.data["token"]
+
+    def test_metrics(self):
+        headers = {
+            "HTTP_AUTHORIZATION": f"Bearer {self.token}"
+        }
+        data = {
+            'entrance': 'A1',
+            'gridSize': '3x3',
+            'walls': ['C2', 'C3']
+        }
+        client.post(path="/mazes/", data=data, content_type='application/json', **headers)
+        client.post(path="/mazes/", data={**data, 'gridSize': '3'}, content_type='application/json', **headers)
+
+        response = client.get(path="/metrics")
+        self.assertEqual(200, response.status_code)
+        text = response.content.decode()
+        self.assertIn('maze_request_duration_seconds_count{view="MazeView.post"} 2\n', text)
+        self.assertIn('maze_save_duration_seconds_count{phase="db_write"} 1\n', text)
+        self.assertIn('maze_solver_duration_seconds_count{solver="exit_check"} 1\n', text)
+        self.assertIn('maze_solver_expanded_cells_total{solver="exit_check"} 7\n', text)
+        self.assertIn('maze_validation_failures_total 1\n', text)
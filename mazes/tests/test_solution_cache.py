@@ -0,0 +1,132 @@
+from unittest import mock
+
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from rest_framework.exceptions import ValidationError
+
+from mazes.business.model import path_codec
+from mazes.business.model.validators import maze_validator
+from mazes.business.services.LazySolution import LazySolution
+from mazes.business.services.LongestPathSolver import LongestPathSolver
+from mazes.business.services.SolutionCache import SolutionCache
+from mazes.models import Maze, MazeSolution
+from users.models import User
+
+WALLS = ['G1', 'H1', 'A2', 'C2', 'E2', 'H2', 'G2', 'C3',
+         'E3', 'H3', 'B4', 'C4', 'E4', 'F4', 'B5', 'E5', 'H5', 'B6', 'D6',
+         'E6', 'G6', 'H6', 'B7', 'D7', 'G7', 'H7', 'B8', 'H8']
+
+
+class SolutionCacheTest(TestCase):
+    def setUp(self):
+        SolutionCache.clear()
+        self.user = User.objects.create_user('rui@test.com', 'rui')
+
+    def test_content_hash_ignores_wall_order(self):
+        self.assertEqual(
+            SolutionCache.content_hash(maze_validator.validate_maze('8x8', WALLS, 'A1')),
+            SolutionCache.content_hash(maze_validator.validate_maze('8x8', list(reversed(WALLS)) + ['A2'], 'A1'))
+        )
+        self.assertNotEqual(
+            SolutionCache.content_hash(maze_validator.validate_maze('8x8', WALLS, 'A1')),
+            SolutionCache.content_hash(maze_validator.validate_maze('8x8', WALLS, 'B1'))
+        )
+        self.assertNotEqual(
+            SolutionCache.content_hash(maze_validator.validate_maze('8x8', WALLS, 'A1')),
+            SolutionCache.content_hash(maze_validator.validate_maze('8x9', WALLS, 'A1'))
+        )
+
+    def test_repeated_maze_is_solved_once(self):
+        first = self._save_maze(WALLS)
+        second = self._save_maze(list(reversed(WALLS)))
+        self.assertEqual(first.content_hash, second.content_hash)
+        self.assertEqual(first.min_path, second.min_path)
+        self.assertEqual('H4', second.exit_coordinates)
+        self.assertEqual(1, MazeSolution.objects.count())
+        stats = SolutionCache.stats()
+        self.assertEqual((1, 0, 1), (stats['memory_hits'], stats['db_hits'], stats['misses']))
+        self.assertEqual(first.max_path, second.max_path)
+
+        SolutionCache.clear()
+        third = self._save_maze(WALLS)
+        self.assertEqual(first.max_path, third.max_path)
+        self.assertEqual(1, SolutionCache.stats()['db_hits'])
+        self.assertEqual(1, SolutionCache.stats()['entries'])
+
+    @override_settings(MAZE_SOLUTION_CACHE_SIZE=250)
+    def test_least_recently_used_solutions_are_evicted(self):
+        SolutionCache.put('a', ('A2', bytes(10), bytes(10), None, None))
+        SolutionCache.put('b', ('A3', bytes(20), bytes(20), None, None))
+        SolutionCache.get('a')
+        SolutionCache.put('c', ('A8', bytes(40), None, None, None))
+        self.assertEqual(2, SolutionCache.stats()['entries'])
+        self.assertEqual(188, SolutionCache.stats()['size'])
+        SolutionCache.get('b')
+        self.assertEqual(1, SolutionCache.stats()['db_hits'])
+
+    def _save_maze(self, walls):
+        maze = Maze(grid_size='8x8', entrance='A1', walls=walls, user=self.user)
+        maze.save()
+        return maze
+
+
+class LazySolutionTest(TestCase):
+    def setUp(self):
+        SolutionCache.clear()
+        self.user = User.objects.create_user('rui@test.com', 'rui')
+
+    def test_max_path_is_solved_once_and_stored(self):
+        maze = Maze(grid_size='8x8', entrance='A1', walls=WALLS, user=self.user)
+        maze.save()
+        self.assertIsNone(maze.max_moves)
+        max_moves = LazySolution.max_moves(maze)
+        self.assertEqual(21, len(path_codec.decode_coordinates(max_moves)))
+        self.assertEqual(max_moves, bytes(Maze.objects.get(id=maze.id).max_moves))
+        self.assertEqual(max_moves, SolutionCache.get(maze.content_hash)[2])
+
+        other = Maze(grid_size='8x8', entrance='A1', walls=WALLS, user=self.user)
+        other.save()
+        self.assertEqual(max_moves, other.max_moves)
+
+    def test_max_path_solved_by_another_process_is_not_solved_again(self):
+        maze = Maze(grid_size='8x8', entrance='A1', walls=WALLS, user=self.user)
+        maze.save()
+        SolutionCache.clear()
+        # Another process holds the claim and stores its result meanwhile:
+        # whatever it stored is what is read.
+        MazeSolution.objects.filter(content_hash=maze.content_hash).update(
+            max_started_at=timezone.now(), max_moves=maze.min_moves
+        )
+        self.assertEqual(maze.min_moves, LazySolution.max_moves(maze))
+
+    def test_max_path_is_not_stored_over_an_edit(self):
+        maze = Maze(grid_size='8x8', entrance='A1', walls=WALLS, user=self.user)
+        maze.save()
+        # An edit lands while the max path of the walls before it is solved.
+        Maze.objects.filter(id=maze.id).update(walls=WALLS[1:], content_hash='edited')
+        self.assertEqual(21, len(path_codec.decode_coordinates(LazySolution.max_moves(maze))))
+        self.assertIsNone(Maze.objects.get(id=maze.id).max_moves)
+
+    @override_settings(MAZE_SOLVE_TIMEOUT=0)
+    def test_stale_claim_is_taken_over(self):
+        maze = Maze(grid_size='8x8', entrance='A1', walls=WALLS, user=self.user)
+        maze.save()
+        MazeSolution.objects.filter(content_hash=maze.content_hash).update(max_started_at=timezone.now())
+        self.assertEqual(21, len(maze.max_path))
+        self.assertIsNone(MazeSolution.objects.get(content_hash=maze.content_hash).max_started_at)
+
+    def test_no_exit_is_rejected(self):
+        maze = Maze(grid_size='2x2', entrance='A1', walls=['B1', 'B2'], user=self.user)
+        with self.assertRaisesMessage(ValidationError, 'Maze has no exit'):
+            maze.save()
+        self.assertFalse(Maze.objects.exists())
+
+    @mock.patch.object(LongestPathSolver, 'MAX_CELLS', 4)
+    def test_over_limits_has_no_max_path(self):
+        # The max path left in the cache is only right within the limits patched.
+        self.addCleanup(SolutionCache.clear)
+        maze = Maze(grid_size='8x8', entrance='A1', walls=WALLS, user=self.user)
+        maze.save()
+        self.assertEqual(path_codec.NOT_SOLVED, LazySolution.max_moves(maze))
+        self.assertIsNone(maze.max_path)
+        self.assertEqual(11, len(maze.min_path))
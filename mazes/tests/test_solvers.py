@@ -0,0 +1,578 @@
+import json
+import os
+import random
+import tempfile
+import zlib
+from itertools import islice
+from unittest import mock
+
+import numpy
+from django.core.management import CommandError, call_command
+from django.test import SimpleTestCase
+from rest_framework.exceptions import ValidationError
+
+from mazes.business.model import exit_tree, path_codec, reachability
+from mazes.business.model.maze_grid import MazeGrid
+from mazes.business.model.validators import maze_validator
+from mazes.business.services.AStarSolver import AStarSolver
+from mazes.business.services.BidirectionalSolver import BidirectionalSolver
+from mazes.business.services.ExitCheck import ExitCheck
+from mazes.business.services.IncrementalSolver import IncrementalSolver
+from mazes.business.services.LongestPathSolver import LongestPathSolver, OverLimits
+from mazes.business.services.MazeGenerator import MazeGenerator
+from mazes.business.services.MazeSolver import MazeSolver
+from mazes.business.services.ShortestPathSolver import DOWN, ENTRANCE, ShortestPathSolver
+from mazes.business.services.WavefrontSolver import UNREACHED, WavefrontSolver
+from mazes.utils import as_cell_coordinates
+
+WALLS = ['G1', 'H1', 'A2', 'C2', 'E2', 'H2', 'G2', 'C3',
+         'E3', 'H3', 'B4', 'C4', 'E4', 'F4', 'B5', 'E5', 'H5', 'B6', 'D6',
+         'E6', 'G6', 'H6', 'B7', 'D7', 'G7', 'H7', 'B8', 'H8']
+
+
+def shortest_path(entrance_coordinates, walls, rows_size, cols_size):
+    grid = MazeGrid(rows_size, cols_size, walls)
+    exit_cell, path = ShortestPathSolver.solve(grid, grid.cell_of(entrance_coordinates))
+    return grid.coordinates(exit_cell) if exit_cell is not None else None, grid.path_coordinates(path)
+
+
+def longest_path(entrance_coordinates, exit_coordinates, walls, rows_size, cols_size):
+    grid = MazeGrid(rows_size, cols_size, walls)
+    return grid.path_coordinates(LongestPathSolver.solve(
+        grid,
+        grid.cell_of(entrance_coordinates),
+        grid.cell_of(exit_coordinates) if exit_coordinates else None
+    ))
+
+
+class MazeGridTest(SimpleTestCase):
+    def test_cells(self):
+        grid = MazeGrid(3, 4, ['B2'])
+        cell = grid.cell_of('B2')
+        self.assertEqual('B2', grid.coordinates(cell))
+        self.assertFalse(grid.is_open(cell))
+        self.assertEqual(11, len(grid.open_cells()))
+        self.assertEqual([grid.cell_of('C3'), grid.cell_of('A3'), grid.cell_of('B4')],
+                         grid.neighbours(grid.cell_of('B3')))
+        self.assertEqual([grid.cell_of('B1'), grid.cell_of('A2')], grid.neighbours(grid.cell_of('A1')))
+        self.assertTrue(grid.is_exit(grid.cell_of('C4')))
+        self.assertFalse(grid.is_exit(grid.cell_of('B4')))
+
+    def test_large_grid_cells(self):
+        grid = MazeGrid(30, 12, ['AA12', 'Z10'])
+        self.assertEqual(grid.cell(26, 11), grid.cell_of('AA12'))
+        self.assertEqual([grid.cell(26, 11), grid.cell(25, 9)], grid.cells_of(['AA12', 'Z10']))
+        self.assertFalse(grid.is_open(grid.cell(25, 9)))
+        self.assertEqual(['AD12', 'A1'], grid.path_coordinates([grid.cell(29, 11), grid.cell(0, 0)]))
+
+    def test_parsed_maze_grid(self):
+        parsed = maze_validator.validate_maze('30x12', ['AA12', 'Z10', 'B1'], 'AD3')
+        self.assertEqual((30, 12), (parsed.rows_size, parsed.cols_size))
+        self.assertEqual(([26, 25, 1], [11, 9, 0]), (parsed.wall_rows, parsed.wall_cols))
+        grid = parsed.grid()
+        self.assertEqual(MazeGrid(30, 12, ['AA12', 'Z10', 'B1']).walls, grid.walls)
+        self.assertEqual(grid.cell_of('AD3'), parsed.entrance_cell(grid))
+
+    def test_parsed_maze_rejects_cells_with_new_lines(self):
+        for walls, entrance in ((['A1\nB2'], 'C1'), (['C2'], 'A1\nB1'), (['A1\n', 'B2'], 'C1')):
+            with self.assertRaisesMessage(ValidationError, 'Cell coordinates should be described'):
+                maze_validator.validate_maze('8x8', walls, entrance)
+
+
+class PathCodecTest(SimpleTestCase):
+    def test_encode(self):
+        path = ['A1', 'B1', 'C1', 'D1', 'D2', 'D3', 'D4', 'D5', 'C5', 'C6', 'C7',
+                'C8', 'D8', 'E8', 'F8', 'F7', 'F6', 'F5', 'G5', 'G4', 'H4']
+        grid = MazeGrid(8, 8, WALLS)
+        moves = path_codec.encode_coordinates(path)
+        self.assertEqual(moves, path_codec.encode_cells(grid, [grid.cell_of(cell) for cell in path]))
+        self.assertEqual(path_codec.HEADER.size + 5, len(moves))
+        self.assertEqual(('A1', 'DDDRRRRURRRDDDLLLDLD'), path_codec.decode_moves(moves))
+        self.assertEqual(path, path_codec.decode_coordinates(moves))
+
+    def test_encode_no_path(self):
+        self.assertIsNone(path_codec.encode_coordinates(None))
+        self.assertEqual((None, None), path_codec.decode_moves(None))
+        self.assertIsNone(path_codec.decode_coordinates(None))
+        self.assertEqual(['AB12'], path_codec.decode_coordinates(path_codec.encode_coordinates(['AB12'])))
+
+    def test_iter_coordinates(self):
+        grid = MazeGrid(30, 30)
+        path = [grid.cell(row, col if row % 2 == 0 else 29 - col) for row in range(30) for col in range(30)]
+        chunks = list(path_codec.iter_coordinates(path_codec.encode_cells(grid, path), moves_per_chunk=50))
+        self.assertEqual(20, len(chunks))
+        self.assertEqual(grid.path_coordinates(path), [cell for chunk in chunks for cell in chunk])
+
+    def test_encode_not_neighbours(self):
+        with self.assertRaises(ValueError):
+            path_codec.encode_coordinates(['A1', 'A3'])
+
+
+class ReachabilityTest(SimpleTestCase):
+    def test_encode(self):
+        grid = MazeGrid(3, 5, ['A2', 'B2', 'C2'])
+        reached = numpy.zeros(grid.size, dtype=bool)
+        for cell in ('A1', 'B1', 'C1'):
+            reached[grid.cell_of(cell)] = True
+        index = reachability.encode(grid, reached)
+        self.assertEqual(2, len(index))
+        self.assertEqual([True, False, False, False, False] * 3, [
+            reachability.is_reachable(index, 5, row, col) for row in range(3) for col in range(5)
+        ])
+
+    def test_update(self):
+        grid = MazeGrid(8, 8, WALLS)
+        entrance_cell = grid.cell_of('A1')
+        state = IncrementalSolver.initial_state(grid, entrance_cell)
+        index = reachability.encode(grid, IncrementalSolver.reached(state))
+        changed = list(IncrementalSolver.update(grid, state, entrance_cell, [grid.cell_of('F2')], []))
+        reached = IncrementalSolver.reached(state)
+        self.assertEqual(
+            reachability.encode(grid, reached),
+            reachability.update(index, grid, changed, reached[changed])
+        )
+
+    def test_encode_incremental_state(self):
+        grid = MazeGrid(8, 8, WALLS)
+        visited = ExitCheck.find_exit(grid, grid.cell_of('A1'))[1]
+        self.assertEqual(
+            reachability.encode(grid, numpy.frombuffer(visited, dtype=numpy.uint8) >= ENTRANCE),
+            reachability.encode(grid, IncrementalSolver.reached(IncrementalSolver.initial_state(grid, grid.cell_of('A1'))))
+        )
+
+
+class ExitTreeTest(SimpleTestCase):
+    def test_path_to_exit(self):
+        grid = MazeGrid(8, 8, WALLS)
+        exit_cell = grid.cell_of('H4')
+        tree = exit_tree.encode(grid, ShortestPathSolver.search(grid, exit_cell), DOWN)
+        self.assertEqual(16, len(tree))
+        distances = WavefrontSolver.distances(grid, exit_cell)
+        for row in range(8):
+            for col in range(8):
+                if not grid.is_open(grid.cell(row, col)):
+                    continue
+                path = exit_tree.path_to_exit(tree, 8, row, col, 7, 3)
+                self.assertEqual(distances[row + 1, col + 1] + 1, len(path))
+                self.assertEqual('H4', path[-1])
+                cells = [grid.cell_of(cell) for cell in path]
+                self.assertTrue(all(next_cell - cell in grid.offsets for cell, next_cell in zip(cells, cells[1:])))
+        self.assertEqual(['H4'], exit_tree.path_to_exit(tree, 8, 7, 3, 7, 3))
+
+
+class ShortestPathSolverTest(SimpleTestCase):
+    def test_solve(self):
+        exit_coordinates, path = shortest_path('A1', WALLS, 8, 8)
+        self.assertEqual('H4', exit_coordinates)
+        self.assertEqual(
+            ['A1', 'B1', 'C1', 'D1', 'E1', 'F1', 'F2', 'F3', 'G3', 'G4', 'H4'],
+            path
+        )
+
+    def test_solve_more_than_one_exit(self):
+        with self.assertRaisesMessage(ValidationError, 'Maze has more than one exit'):
+            shortest_path('A1', ['A2', 'A3'], 8, 8)
+
+    def test_solve_no_exit(self):
+        self.assertEqual((None, None), shortest_path('A1', ['B1', 'A2'], 3, 3))
+
+    def test_solve_entrance_in_walls(self):
+        self.assertEqual(
+            ['A1', 'A2', 'A3', 'B3', 'B2', 'B1', 'C1'],
+            longest_path('A1', 'C1', ['A1', 'C2', 'C3'], 3, 3)
+        )
+
+    def test_solve_open_grid(self):
+        exit_coordinates, path = shortest_path('A1', ['I' + str(col) for col in range(2, 10)], 9, 9)
+        self.assertEqual('I1', exit_coordinates)
+        self.assertEqual(['A1', 'B1', 'C1', 'D1', 'E1', 'F1', 'G1', 'H1', 'I1'], path)
+
+
+    def test_distances(self):
+        grid = MazeGrid(3, 3, ['B1', 'B2'])
+        distances = ShortestPathSolver.distances(grid, ShortestPathSolver.search(grid, grid.cell_of('A1')))
+        self.assertEqual([[0, 1, 2], [UNREACHED, UNREACHED, 3], [6, 5, 4]], distances[1:-1, 1:-1].tolist())
+        for family in MazeGenerator.FAMILIES:
+            grid = MazeGenerator.generate(family, 30, 40, seed=5)
+            visited = ShortestPathSolver.search(grid, grid.cell(0, 0))
+            self.assertEqual(
+                WavefrontSolver.distances(grid, grid.cell(0, 0)).tolist(),
+                ShortestPathSolver.distances(grid, visited).tolist()
+            )
+
+
+class ExitCheckTest(SimpleTestCase):
+    def test_find_exit(self):
+        grid = MazeGrid(8, 8, WALLS)
+        exit_cell, visited = ExitCheck.find_exit(grid, grid.cell_of('A1'))
+        self.assertEqual(grid.cell_of('H4'), exit_cell)
+        self.assertEqual(shortest_path('A1', WALLS, 8, 8)[1],
+                         grid.path_coordinates(ShortestPathSolver.build_path(grid, visited, exit_cell)))
+
+    def test_find_exit_last_row_walled(self):
+        grid = MazeGrid(1000, 1000, [as_cell_coordinates(999, col) for col in range(1000)])
+        stats = {}
+        self.assertIsNone(ExitCheck.find_exit(grid, grid.cell(0, 0), stats)[0])
+        self.assertEqual(0, stats['expanded'])
+
+    def test_find_exit_unreachable(self):
+        grid = MazeGrid(3, 3, ['B1', 'A2'])
+        stats = {}
+        self.assertIsNone(ExitCheck.find_exit(grid, grid.cell_of('A1'), stats)[0])
+        self.assertEqual(1, stats['expanded'])
+
+    def test_find_exit_stops_at_second_exit(self):
+        grid = MazeGrid(1000, 1000, [as_cell_coordinates(0, col) for col in range(1, 1000)])
+        stats = {}
+        with self.assertRaisesMessage(ValidationError, 'Maze has more than one exit'):
+            ExitCheck.find_exit(grid, grid.cell(999, 0), stats)
+        self.assertLess(stats['expanded'], 10)
+
+
+class AStarSolverTest(SimpleTestCase):
+    def test_solve(self):
+        grid = MazeGrid(8, 8, WALLS)
+        self.assertEqual(
+            ShortestPathSolver.solve(grid, grid.cell_of('A1')),
+            AStarSolver.solve(grid, grid.cell_of('A1'))
+        )
+
+    def test_solve_more_than_one_exit(self):
+        grid = MazeGrid(8, 8, ['A2', 'A3'])
+        with self.assertRaisesMessage(ValidationError, 'Maze has more than one exit'):
+            AStarSolver.solve(grid, grid.cell_of('A1'))
+
+    def test_solve_no_exit(self):
+        grid = MazeGrid(3, 3, ['B1', 'A2'])
+        self.assertEqual((None, None), AStarSolver.solve(grid, grid.cell_of('A1')))
+
+    def test_solve_same_length_as_breadth_first_search(self):
+        for family in MazeGenerator.FAMILIES:
+            grid = MazeGenerator.generate(family, 60, 60, seed=1)
+            bfs_stats, astar_stats = {}, {}
+            exit_cell, path = ShortestPathSolver.solve(grid, grid.cell(0, 0), bfs_stats)
+            astar_exit_cell, astar_path = AStarSolver.solve(grid, grid.cell(0, 0), astar_stats)
+            self.assertEqual(exit_cell, astar_exit_cell)
+            self.assertEqual(len(path), len(astar_path))
+            # The exit check already expands what breadth first search does.
+            self.assertGreaterEqual(astar_stats['expanded'], bfs_stats['expanded'])
+
+    def test_solve_expands_less_on_open_mazes(self):
+        grid = MazeGenerator.generate('random', 60, 60, seed=1)
+        bfs_stats, astar_stats = {}, {}
+        exit_cell, _ = ShortestPathSolver.solve(grid, grid.cell(0, 0), bfs_stats)
+        AStarSolver.path(grid, grid.cell(0, 0), exit_cell, astar_stats)
+        self.assertLess(astar_stats['expanded'], bfs_stats['expanded'] // 3)
+
+
+class BidirectionalSolverTest(SimpleTestCase):
+    def test_solve(self):
+        grid = MazeGrid(8, 8, WALLS)
+        exit_cell, path = BidirectionalSolver.solve(grid, grid.cell_of('A1'))
+        self.assertEqual('H4', grid.coordinates(exit_cell))
+        self.assertEqual(len(shortest_path('A1', WALLS, 8, 8)[1]), len(path))
+        self.assertEqual(grid.cell_of('A1'), path[0])
+        self.assertTrue(all(next_cell - cell in grid.offsets for cell, next_cell in zip(path, path[1:])))
+
+    def test_solve_more_than_one_exit(self):
+        grid = MazeGrid(8, 8, ['A2', 'A3'])
+        with self.assertRaisesMessage(ValidationError, 'Maze has more than one exit'):
+            BidirectionalSolver.solve(grid, grid.cell_of('A1'))
+
+    def test_solve_no_exit(self):
+        grid = MazeGrid(3, 3, ['B1', 'A2'])
+        self.assertEqual((None, None), BidirectionalSolver.solve(grid, grid.cell_of('A1')))
+
+    def test_solve_entrance_on_last_row(self):
+        grid = MazeGrid(3, 3, ['B1', 'B2', 'B3', 'C2'])
+        self.assertEqual((grid.cell_of('C1'), [grid.cell_of('C1')]), BidirectionalSolver.solve(grid, grid.cell_of('C1')))
+
+    def test_solve_same_as_breadth_first_search(self):
+        rng = random.Random(0)
+        for _ in range(300):
+            rows_size, cols_size = rng.randint(1, 10), rng.randint(1, 10)
+            grid = MazeGrid(rows_size, cols_size, [
+                as_cell_coordinates(row, col)
+                for row in range(rows_size) for col in range(cols_size) if rng.random() < 0.45
+            ])
+            entrance_cell = grid.cell(rng.randrange(rows_size), rng.randrange(cols_size))
+            try:
+                exit_cell, path = ShortestPathSolver.solve(grid, entrance_cell)
+            except ValidationError:
+                with self.assertRaises(ValidationError):
+                    BidirectionalSolver.solve(grid, entrance_cell)
+                continue
+            bidirectional_exit_cell, bidirectional_path = BidirectionalSolver.solve(grid, entrance_cell)
+            self.assertEqual(exit_cell, bidirectional_exit_cell)
+            self.assertEqual(len(path or ()), len(bidirectional_path or ()))
+
+    def test_solve_expands_less(self):
+        for family in ('rooms', 'random'):
+            grid = MazeGenerator.generate(family, 60, 60, seed=1)
+            bfs_stats, bidirectional_stats = {}, {}
+            exit_cell, _ = ShortestPathSolver.solve(grid, grid.cell(0, 0), bfs_stats)
+            BidirectionalSolver.path(grid, grid.cell(0, 0), exit_cell, bidirectional_stats)
+            self.assertLess(bidirectional_stats['expanded'], bfs_stats['expanded'] * 3 // 4)
+
+
+class IncrementalSolverTest(SimpleTestCase):
+    def test_update_matches_search_from_scratch(self):
+        rng = random.Random(0)
+        for _ in range(50):
+            rows_size, cols_size = rng.randint(1, 10), rng.randint(1, 10)
+            grid = MazeGrid(rows_size, cols_size, [
+                as_cell_coordinates(row, col)
+                for row in range(rows_size) for col in range(cols_size) if rng.random() < 0.3
+            ])
+            entrance_cell = grid.cell(rng.randrange(rows_size), rng.randrange(cols_size))
+            grid.walls[entrance_cell] = 0
+            state = IncrementalSolver.initial_state(grid, entrance_cell)
+            for _ in range(5):
+                cells = [grid.cell(rng.randrange(rows_size), rng.randrange(cols_size)) for _ in range(4)]
+                added, removed = cells[:2], cells[2:]
+                IncrementalSolver.update(grid, state, entrance_cell, added, removed)
+                for cell in added:
+                    grid.walls[cell] = cell != entrance_cell
+                for cell in removed:
+                    grid.walls[cell] = 0
+                self.assertEqual(IncrementalSolver.initial_state(grid, entrance_cell), state)
+
+    def test_solve(self):
+        grid = MazeGrid(8, 8, WALLS)
+        entrance_cell = grid.cell_of('A1')
+        state = IncrementalSolver.initial_state(grid, entrance_cell)
+        exit_cell, path = IncrementalSolver.solve(grid, state)
+        self.assertEqual(ShortestPathSolver.solve(grid, entrance_cell), (exit_cell, path))
+
+        # Closing F2 sends the path around by the right.
+        stats = {}
+        IncrementalSolver.update(grid, state, entrance_cell, [grid.cell_of('F2')], [], stats)
+        grid.walls[grid.cell_of('F2')] = 1
+        self.assertEqual(ShortestPathSolver.solve(grid, entrance_cell)[0], IncrementalSolver.solve(grid, state)[0])
+        self.assertEqual(
+            len(ShortestPathSolver.solve(grid, entrance_cell)[1]),
+            len(IncrementalSolver.solve(grid, state)[1])
+        )
+        self.assertLess(stats['expanded'], len(grid.open_cells()))
+
+    def test_solve_more_than_one_exit(self):
+        grid = MazeGrid(8, 8, WALLS)
+        entrance_cell = grid.cell_of('A1')
+        state = IncrementalSolver.initial_state(grid, entrance_cell)
+        IncrementalSolver.update(grid, state, entrance_cell, [], [grid.cell_of('H8')])
+        with self.assertRaisesMessage(ValidationError, 'Maze has more than one exit'):
+            IncrementalSolver.solve(grid, state)
+
+    def test_dumps(self):
+        grid = MazeGrid(8, 8, WALLS)
+        state = IncrementalSolver.initial_state(grid, grid.cell_of('A1'))
+        self.assertEqual(state, IncrementalSolver.loads(IncrementalSolver.dumps(state)))
+
+    @mock.patch('mazes.business.services.IncrementalSolver.CHUNK_CELLS', 8)
+    def test_dumps_changed_chunks(self):
+        grid = MazeGrid(8, 8, WALLS)
+        entrance_cell = grid.cell_of('A1')
+        state = IncrementalSolver.initial_state(grid, entrance_cell)
+        packed = IncrementalSolver.dumps(state)
+        changed = IncrementalSolver.update(grid, state, entrance_cell, [grid.cell_of('F2')], [])
+        with mock.patch('zlib.compress', wraps=zlib.compress) as compress:
+            repacked = IncrementalSolver.dumps(state, packed, changed)
+        self.assertEqual(len({cell // 8 for cell in changed}), compress.call_count)
+        self.assertEqual(IncrementalSolver.dumps(state), repacked)
+        self.assertEqual(state, IncrementalSolver.loads(repacked))
+
+
+class WavefrontSolverTest(SimpleTestCase):
+    def test_solve(self):
+        grid = MazeGrid(8, 8, WALLS)
+        exit_cell, path = WavefrontSolver.solve(grid, grid.cell_of('A1'))
+        self.assertEqual('H4', grid.coordinates(exit_cell))
+        self.assertEqual(
+            ['A1', 'B1', 'C1', 'D1', 'E1', 'F1', 'F2', 'F3', 'G3', 'G4', 'H4'],
+            grid.path_coordinates(path)
+        )
+
+    def test_solve_more_than_one_exit(self):
+        grid = MazeGrid(8, 8, ['A2', 'A3'])
+        with self.assertRaisesMessage(ValidationError, 'Maze has more than one exit'):
+            WavefrontSolver.solve(grid, grid.cell_of('A1'))
+
+    def test_distances(self):
+        grid = MazeGrid(3, 3, ['B1', 'B2'])
+        distances = WavefrontSolver.distances(grid, grid.cell_of('A1'))[1:-1, 1:-1]
+        self.assertEqual(
+            [[0, 1, 2], [UNREACHED, UNREACHED, 3], [6, 5, 4]],
+            distances.tolist()
+        )
+        self.assertEqual(UNREACHED, distances[1, 0])
+
+    def test_solve_matches_shortest_path_solver(self):
+        generator = random.Random(11)
+        for _ in range(100):
+            rows_size, cols_size = generator.randint(1, 12), generator.randint(1, 12)
+            grid = MazeGrid(rows_size, cols_size)
+            for cell in grid.open_cells():
+                if cell != grid.cell(0, 0) and generator.random() < 0.35:
+                    grid.walls[cell] = 1
+            try:
+                expected_exit_cell, expected_path = ShortestPathSolver.solve(grid, grid.cell(0, 0))
+            except ValidationError:
+                with self.assertRaises(ValidationError):
+                    WavefrontSolver.solve(grid, grid.cell(0, 0))
+                continue
+            exit_cell, path = WavefrontSolver.solve(grid, grid.cell(0, 0))
+            self.assertEqual(expected_exit_cell, exit_cell)
+            if path is None:
+                self.assertIsNone(expected_path)
+                continue
+            self.assertEqual(len(expected_path), len(path))
+            self.assertTrue(all(grid.is_open(cell) for cell in path[1:]))
+            self.assertTrue(all(cell - previous in grid.offsets for previous, cell in zip(path, path[1:])))
+
+
+class LongestPathSolverTest(SimpleTestCase):
+    def test_solve(self):
+        self.assertEqual(
+            ['A1', 'B1', 'C1', 'D1', 'D2', 'D3', 'D4', 'D5', 'C5', 'C6', 'C7',
+             'C8', 'D8', 'E8', 'E7', 'F7', 'F6', 'F5', 'G5', 'G4', 'H4'],
+            longest_path('A1', 'H4', WALLS, 8, 8)
+        )
+
+    def test_solve_no_exit(self):
+        self.assertIsNone(longest_path('A1', None, ['B1', 'A2'], 3, 3))
+
+    def test_solve_entrance_is_exit(self):
+        self.assertEqual(['C2'], longest_path('C2', 'C2', ['C1', 'C3'], 3, 3))
+
+    def test_solve_open_grid(self):
+        walls = [as_cell_coordinates(8, col) for col in range(9) if col != 4]
+        path = longest_path('A1', 'I5', walls, 9, 9)
+        self.assertEqual(73, len(path))
+        self.assertEqual(73, len(set(path)))
+
+    def test_solve_sparse_grids(self):
+        # Their blocks are too long a search for a path of the exact length.
+        for entrance_coordinates, walls, length in (
+            ('A6', ['A8', 'B1', 'D2', 'G7', 'G8', 'I1', 'I2', 'I3', 'I4', 'I5', 'I6', 'I7', 'I8'], 64),
+            ('A2', ['A3', 'D6', 'E6', 'F1', 'G8', 'H4', 'I1', 'I3', 'I4', 'I5', 'I6', 'I7', 'I8', 'I9'], 65),
+        ):
+            grid = MazeGrid(9, 9, walls)
+            entrance_cell = grid.cell_of(entrance_coordinates)
+            exit_cell, _ = ExitCheck.find_exit(grid, entrance_cell)
+            path = LongestPathSolver.solve(grid, entrance_cell, exit_cell)
+            self.assertEqual(length, len(path))
+            self.assertEqual(length, len(set(path)))
+            self.assertEqual((entrance_cell, exit_cell), (path[0], path[-1]))
+            self.assertTrue(all(grid.is_open(cell) for cell in path[1:]))
+            self.assertTrue(all(cell - previous in grid.offsets for previous, cell in zip(path, path[1:])))
+
+    def test_solve_narrow_blocks(self):
+        # Long blocks are solved as long as they are narrow.
+        path = longest_path('A1', 'D2', ['D1', 'D3'] + [f'D{col}' for col in range(4, 201)], 4, 200)
+        self.assertEqual(601, len(path))
+        self.assertEqual(601, len(set(path)))
+
+    def test_solve_over_limits(self):
+        walls = [as_cell_coordinates(11, col) for col in range(11) if col != 5]
+        with self.assertRaises(OverLimits):
+            longest_path('A1', 'L6', walls, 12, 11)
+
+    def test_solve_matches_exhaustive_search(self):
+        generator = random.Random(7)
+        for _ in range(100):
+            rows_size, cols_size = generator.randint(2, 5), generator.randint(2, 5)
+            walls = [
+                as_cell_coordinates(row, col)
+                for row in range(rows_size) for col in range(cols_size)
+                if (row, col) != (0, 0) and generator.random() < 0.3
+            ]
+            try:
+                exit_coordinates, paths = MazeSolver.solve_maze_dfs('A1', walls, rows_size, cols_size)
+            except ValidationError:
+                continue
+            max_path = None
+            for path in paths:
+                if not max_path or len(path) > len(max_path):
+                    max_path = path
+            self.assertEqual(
+                max_path,
+                longest_path('A1', exit_coordinates, walls, rows_size, cols_size)
+            )
+
+
+class MazeSolverTest(SimpleTestCase):
+    def test_solve_maze_dfs(self):
+        exit_coordinates, paths = MazeSolver.solve_maze_dfs('A1', WALLS, 8, 8)
+        self.assertEqual('H4', exit_coordinates)
+        self.assertEqual(3, len(paths))
+        self.assertIn(['A1', 'B1', 'C1', 'D1', 'E1', 'F1', 'F2', 'F3', 'G3', 'G4', 'H4'], paths)
+
+    def test_solve_maze_dfs_more_than_one_exit(self):
+        with self.assertRaisesMessage(ValidationError, 'Maze has more than one exit'):
+            MazeSolver.solve_maze_dfs('A1', ['A2', 'A3'], 8, 8)
+
+    def test_iter_paths_stops_early(self):
+        paths = list(islice(MazeSolver.iter_paths('A1', [], 9, 1), 1))
+        self.assertEqual([[as_cell_coordinates(row, 0) for row in range(9)]], paths)
+        paths = list(islice(MazeSolver.iter_paths('A1', ['C2', 'C3'], 3, 3), 2))
+        self.assertEqual([['A1', 'B1', 'C1'], ['A1', 'A2', 'B2', 'B1', 'C1']], paths)
+
+    def test_iter_paths_long_corridor(self):
+        walls = [
+            as_cell_coordinates(row, col)
+            for row in range(1, 100, 2) for col in range(100)
+            if col != (99 if row % 4 == 1 else 0)
+        ]
+        paths = list(MazeSolver.iter_paths('A1', walls, 100, 100))
+        self.assertEqual(1, len(paths))
+        self.assertEqual(5050, len(paths[0]))
+
+
+class MazeGeneratorTest(SimpleTestCase):
+    def test_generate(self):
+        for family in MazeGenerator.FAMILIES:
+            grid = MazeGenerator.generate(family, 21, 30, seed=3)
+            self.assertEqual(grid.walls, MazeGenerator.generate(family, 21, 30, seed=3).walls)
+            self.assertTrue(grid.is_open(grid.cell(0, 0)))
+            exits = [cell for cell in range(grid.first_exit_cell, grid.last_exit_cell + 1) if grid.is_open(cell)]
+            self.assertLessEqual(len(exits), 1)
+            if family != 'random':
+                exit_cell, path = ShortestPathSolver.solve(grid, grid.cell(0, 0))
+                self.assertEqual(exits, [exit_cell])
+
+    def test_generate_perfect_maze_has_a_single_path(self):
+        grid = MazeGenerator.generate('perfect', 15, 15, seed=5)
+        self.assertEqual(1, sum(1 for _ in MazeSolver.iter_cell_paths(grid, grid.cell(0, 0))))
+
+    def test_walls_of(self):
+        grid = MazeGenerator.generate('serpentine', 4, 3)
+        self.assertEqual(['B1', 'B2', 'D1', 'D3'], MazeGenerator.walls_of(grid))
+
+
+class BenchmarkSolversTest(SimpleTestCase):
+    def test_benchmark_solvers(self):
+        with tempfile.TemporaryDirectory() as directory:
+            baseline_path = os.path.join(directory, 'baseline.json')
+            options = {'sizes': [12], 'repeat': 1, 'stdout': open(os.devnull, 'w')}
+            call_command('benchmark_solvers', save=baseline_path, **options)
+            with open(baseline_path) as baseline_file:
+                baseline = json.load(baseline_file)
+            self.assertEqual(78, baseline['results']['bfs/serpentine/12x12']['expanded'])
+            self.assertEqual(78, baseline['results']['dfs/serpentine/12x12']['expanded'])
+
+            for result in baseline['results'].values():
+                result['expanded'] = result['expanded'] and result['expanded'] // 2
+            with open(baseline_path, 'w') as baseline_file:
+                json.dump(baseline, baseline_file)
+            with self.assertRaisesMessage(CommandError, 'regressions'):
+                call_command('benchmark_solvers', compare=baseline_path, stderr=open(os.devnull, 'w'), **options)
+
+    def test_benchmark_longest_in_rooms(self):
+        with tempfile.TemporaryDirectory() as directory:
+            baseline_path = os.path.join(directory, 'baseline.json')
+            call_command('benchmark_solvers', engines=['longest'], families=['rooms', 'sparse'], sizes=[9],
+                         repeat=1, save=baseline_path, stdout=open(os.devnull, 'w'))
+            with open(baseline_path) as baseline_file:
+                results = json.load(baseline_file)['results']
+            self.assertGreater(results['longest/rooms/9x9']['expanded'], 0)
+            self.assertGreater(results['longest/sparse/9x9']['expanded'], 0)
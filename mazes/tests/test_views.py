@@ -1,14 +1,35 @@
 import json
+import tempfile
+from unittest import addModuleCleanup, mock
 
-from django.test import TestCase, Client
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import TestCase, Client, override_settings
 from rest_framework import status
 
-from mazes.models import Maze
+from mazes import metrics
+from mazes.business.model.validators import maze_validator
+from mazes.business.services.LongestPathSolver import LongestPathSolver
+from mazes.business.services.SolutionCache import SolutionCache
+from mazes.models import Maze, MazeSearchState, MazeSolution
+from users.models import User
 from users.serializers import UserRegistrationSerializer
 
 client = Client()
 
 
+def setUpModule():
+    # Cached responses are cleared between tests, in a directory of their
+    # own rather than the one the workers of this host share.
+    directory = tempfile.TemporaryDirectory()
+    addModuleCleanup(directory.cleanup)
+    settings_override = override_settings(CACHES={
+        'default': {'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache', 'LOCATION': directory.name}
+    })
+    settings_override.enable()
+    addModuleCleanup(settings_override.disable)
+
+
 class MazeCreationTest(TestCase):
     def setUp(self):
         self.username = "rui"
@@ -116,7 +137,7 @@ class MazeCreationTest(TestCase):
         self.assertEqual(response.status_code, 400)
 
         self.assertEqual(
-            'Cell coordinates should be described as [A-Z][1-9]+',
+            'Cell coordinates should be described as [A-Z]+[1-9][0-9]*',
             str(response.data[0]))
 
     def test_maze_creation_invalid_walls_outside_grid(self):
@@ -148,7 +169,7 @@ class MazeCreationTest(TestCase):
         self.assertEqual(response.status_code, 400)
 
         self.assertEqual(
-            'Cell coordinates should be described as [A-Z][1-9]+',
+            'Cell coordinates should be described as [A-Z]+[1-9][0-9]*',
             str(response.data[0]))
 
     def test_maze_creation_more_than_one_exit(self):
@@ -167,6 +188,23 @@ class MazeCreationTest(TestCase):
             'Maze has more than one exit',
             str(response.data[0]))
 
+    def test_maze_creation_no_exit(self):
+        headers = {
+            "HTTP_AUTHORIZATION": f"Bearer {self.token}"
+        }
+        data = {
+            'gridSize': '8x8',
+            'entrance': 'A1',
+            'walls': ['B1', 'A2']
+        }
+        response = client.post(path="/mazes/", data=data, content_type='application/json', **headers)
+        self.assertEqual(response.status_code, 400)
+
+        self.assertEqual(
+            'Maze has no exit',
+            str(response.data[0]))
+        self.assertFalse(Maze.objects.exists())
+
     def test_maze_creation(self):
         headers = {
             "HTTP_AUTHORIZATION": f"Bearer {self.token}"
@@ -183,7 +221,7 @@ class MazeCreationTest(TestCase):
         maze = Maze.objects.get(id=response.data['id'])
         self.assertEqual(
             ['A1', 'B1', 'C1', 'D1', 'D2', 'D3', 'D4', 'D5', 'C5', 'C6', 'C7',
-             'C8', 'D8', 'E8', 'F8', 'F7', 'F6', 'F5', 'G5', 'G4', 'H4'],
+             'C8', 'D8', 'E8', 'E7', 'F7', 'F6', 'F5', 'G5', 'G4', 'H4'],
             maze.max_path
         )
         self.assertEqual(
@@ -202,8 +240,59 @@ class MazeCreationTest(TestCase):
         )
 
 
+    def test_maze_creation_large_grid(self):
+        headers = {
+            "HTTP_AUTHORIZATION": f"Bearer {self.token}"
+        }
+        data = {
+            'entrance': 'A1',
+            'gridSize': '28x30',
+            'walls': ['AB' + str(col) for col in range(2, 31)]
+        }
+        response = client.post(path="/mazes/", data=data, content_type='application/json', **headers)
+        self.assertEqual(response.status_code, 201)
+        maze = Maze.objects.get(id=response.data['id'])
+        self.assertEqual('AB1', maze.exit_coordinates)
+        self.assertEqual(28, len(maze.min_path))
+        self.assertEqual(['X1', 'Y1', 'Z1', 'AA1', 'AB1'], maze.min_path[-5:])
+
+    def test_maze_creation_maximum_grid_size(self):
+        headers = {
+            "HTTP_AUTHORIZATION": f"Bearer {self.token}"
+        }
+        data = {
+            'entrance': 'A1',
+            'gridSize': '1000x1000',
+            'walls': ['ALL' + str(col) for col in range(2, 1001)]
+        }
+        response = client.post(path="/mazes/", data=data, content_type='application/json', **headers)
+        self.assertEqual(response.status_code, 201)
+        maze = Maze.objects.get(id=response.data['id'])
+        self.assertEqual('ALL1', maze.exit_coordinates)
+        self.assertEqual(1000, len(maze.min_path))
+        self.assertIsNone(maze.max_path)
+
+    def test_maze_creation_grid_size_too_large(self):
+        headers = {
+            "HTTP_AUTHORIZATION": f"Bearer {self.token}"
+        }
+        data = {
+            'gridSize': '1001x8',
+            'entrance': 'A1',
+            'walls': ['A2', 'A3']
+        }
+        response = client.post(path="/mazes/", data=data, content_type='application/json', **headers)
+        self.assertEqual(response.status_code, 400)
+
+        self.assertEqual(
+            'gridSize must be at most 1000x1000 and got 1001x8',
+            str(response.data[0]))
+
+
 class MazeSolutionTestCase(TestCase):
     def setUp(self):
+        # Cached responses outlive the database of the previous test.
+        cache.clear()
         self.username = "rui"
         data = {
             "email": f"{self.username}@test.com",
@@ -281,10 +370,260 @@ class MazeSolutionTestCase(TestCase):
         self.assertEqual(status.HTTP_200_OK, response.status_code)
         self.assertEqual(
             ['A1', 'B1', 'C1', 'D1', 'D2', 'D3', 'D4', 'D5', 'C5', 'C6', 'C7',
-             'C8', 'D8', 'E8', 'F8', 'F7', 'F6', 'F5', 'G5', 'G4', 'H4'],
+             'C8', 'D8', 'E8', 'E7', 'F7', 'F6', 'F5', 'G5', 'G4', 'H4'],
             response.data['max_path']
         )
 
+    def test_get_solution_max_path_solved_on_first_read(self):
+        SolutionCache.clear()
+        maze = self._build_maze(self.user)
+        self.assertIsNone(Maze.objects.get(id=maze.id).max_moves)
+        headers = {
+            "HTTP_AUTHORIZATION": f"Bearer {self.token}"
+        }
+        response = client.get(path=f'/mazes/{maze.id}/solution', data={'steps': 'max'}, **headers)
+        self.assertEqual(status.HTTP_200_OK, response.status_code)
+        self.assertEqual(21, len(response.data['max_path']))
+        self.assertIsNotNone(Maze.objects.get(id=maze.id).max_moves)
+        self.assertIsNotNone(MazeSolution.objects.get(content_hash=maze.content_hash).max_moves)
+
+    def test_get_solution_stream(self):
+        maze = self._build_maze(self.user)
+        headers = {
+            "HTTP_AUTHORIZATION": f"Bearer {self.token}"
+        }
+        response = client.get(path=f'/mazes/{maze.id}/solution', data={'steps': 'max', 'stream': '1'}, **headers)
+        self.assertEqual(status.HTTP_200_OK, response.status_code)
+        self.assertTrue(response.streaming)
+        self.assertEqual('application/x-ndjson', response['Content-Type'])
+        lines = b''.join(response.streaming_content).decode().splitlines()
+        self.assertEqual(
+            ['A1', 'B1', 'C1', 'D1', 'D2', 'D3', 'D4', 'D5', 'C5', 'C6', 'C7',
+             'C8', 'D8', 'E8', 'E7', 'F7', 'F6', 'F5', 'G5', 'G4', 'H4'],
+            [json.loads(line) for line in lines]
+        )
+
+    @mock.patch.object(LongestPathSolver, 'MAX_CELLS', 4)
+    def test_get_solution_over_limits(self):
+        SolutionCache.clear()
+        # The max path left in the cache is only right within the limits patched.
+        self.addCleanup(SolutionCache.clear)
+        maze = self._build_maze(self.user)
+        headers = {
+            "HTTP_AUTHORIZATION": f"Bearer {self.token}"
+        }
+        for data in ({'steps': 'max'}, {'steps': 'max', 'stream': '1'}):
+            response = client.get(path=f'/mazes/{maze.id}/solution', data=data, **headers)
+            self.assertEqual(status.HTTP_422_UNPROCESSABLE_ENTITY, response.status_code)
+            self.assertEqual('Maze is over the limits its max path is solved within', response.data['error'])
+
+    def test_get_solution_moves(self):
+        maze = self._build_maze(self.user)
+        headers = {
+            "HTTP_AUTHORIZATION": f"Bearer {self.token}"
+        }
+        response = client.get(path=f'/mazes/{maze.id}/solution', data={'format': 'moves'}, **headers)
+        self.assertEqual(status.HTTP_200_OK, response.status_code)
+        self.assertEqual({'status': 'done', 'start': 'A1', 'min_moves': 'DDDDDRRDRD'}, response.data)
+
+    def test_get_solution_not_modified(self):
+        maze = self._build_maze(self.user)
+        headers = {
+            "HTTP_AUTHORIZATION": f"Bearer {self.token}"
+        }
+        response = client.get(path=f'/mazes/{maze.id}/solution', **headers)
+        etag = response['ETag']
+        self.assertIn('public', response['Cache-Control'])
+        self.assertIn('max-age=60', response['Cache-Control'])
+        self.assertIn('Authorization', response['Vary'])
+
+        # The user and the status are read, the path is not.
+        cache.clear()
+        with self.assertNumQueries(2):
+            response = client.get(path=f'/mazes/{maze.id}/solution', HTTP_IF_NONE_MATCH=etag, **headers)
+        self.assertEqual(status.HTTP_304_NOT_MODIFIED, response.status_code)
+        self.assertEqual(etag, response['ETag'])
+        self.assertEqual(b'', response.content)
+
+        # Each representation has its own validator.
+        response = client.get(path=f'/mazes/{maze.id}/solution', data={'format': 'moves'},
+                              HTTP_IF_NONE_MATCH=etag, **headers)
+        self.assertEqual(status.HTTP_200_OK, response.status_code)
+        self.assertNotEqual(etag, response['ETag'])
+        self.assertEqual('DDDDDRRDRD', response.data['min_moves'])
+
+        response = client.get(path=f'/mazes/{maze.id}/path', data={'from': 'F6'}, **headers)
+        response = client.get(path=f'/mazes/{maze.id}/path', data={'from': 'F6'},
+                              HTTP_IF_NONE_MATCH=response['ETag'], **headers)
+        self.assertEqual(status.HTTP_304_NOT_MODIFIED, response.status_code)
+
+    def test_get_solution_cached(self):
+        maze = self._build_maze(self.user)
+        headers = {
+            "HTTP_AUTHORIZATION": f"Bearer {self.token}"
+        }
+        response = client.get(path=f'/mazes/{maze.id}/solution', **headers)
+        # Only the user is read.
+        with self.assertNumQueries(1):
+            cached = client.get(path=f'/mazes/{maze.id}/solution', **headers)
+        self.assertEqual(response.data, cached.data)
+        self.assertEqual(response['ETag'], cached['ETag'])
+        with self.assertNumQueries(1):
+            response = client.get(path=f'/mazes/{maze.id}/solution', data={'format': 'moves'}, **headers)
+        self.assertEqual('DDDDDRRDRD', response.data['min_moves'])
+
+        # Deleting the maze invalidates its cached solution.
+        Maze.objects.filter(id=maze.id).delete()
+        response = client.get(path=f'/mazes/{maze.id}/solution', **headers)
+        self.assertEqual(status.HTTP_404_NOT_FOUND, response.status_code)
+
+    def test_get_solution_pending_not_cached(self):
+        maze = self._build_maze(self.user)
+        Maze.objects.filter(id=maze.id).update(status=Maze.PENDING)
+        headers = {
+            "HTTP_AUTHORIZATION": f"Bearer {self.token}"
+        }
+        response = client.get(path=f'/mazes/{maze.id}/solution', **headers)
+        self.assertEqual(status.HTTP_202_ACCEPTED, response.status_code)
+        self.assertEqual('no-cache', response['Cache-Control'])
+        self.assertFalse(response.has_header('ETag'))
+
+    def test_get_reachable(self):
+        maze = Maze(grid_size='3x3', entrance='A1', walls=['A2', 'B2', 'C2'], user=self.user)
+        maze.save()
+        headers = {
+            "HTTP_AUTHORIZATION": f"Bearer {self.token}"
+        }
+        expected = {'status': 'done', 'reachable': {'A1': True, 'C1': True, 'A2': False, 'C3': False}}
+        response = client.get(path=f'/mazes/{maze.id}/reachable', data={'cells': 'A1,C1,A2,C3'}, **headers)
+        self.assertEqual(status.HTTP_200_OK, response.status_code)
+        self.assertEqual(expected, response.data)
+
+        # Mazes solved before the index was stored get it on their first query.
+        Maze.objects.filter(id=maze.id).update(reachable=None)
+        response = client.get(path=f'/mazes/{maze.id}/reachable', data={'cells': 'A1,C1,A2,C3'}, **headers)
+        self.assertEqual(expected, response.data)
+        self.assertEqual(maze.reachable, bytes(Maze.objects.get(id=maze.id).reachable))
+
+    def test_get_unreachable(self):
+        maze = Maze(grid_size='3x4', entrance='A1', walls=['A2', 'B2', 'C2', 'B3', 'C4'], user=self.user)
+        maze.save()
+        headers = {
+            "HTTP_AUTHORIZATION": f"Bearer {self.token}"
+        }
+        response = client.get(path=f'/mazes/{maze.id}/reachable', **headers)
+        self.assertEqual(status.HTTP_200_OK, response.status_code)
+        self.assertEqual({'status': 'done', 'unreachable': ['A3', 'A4', 'B4', 'C3']}, response.data)
+        self.assertTrue(response.has_header('ETag'))
+
+        Maze.objects.filter(id=maze.id).update(reachable=None)
+        response = client.get(path=f'/mazes/{maze.id}/reachable', **headers)
+        self.assertEqual(['A3', 'A4', 'B4', 'C3'], response.data['unreachable'])
+
+    def test_get_reachable_invalid_cells(self):
+        maze = self._build_maze(self.user)
+        headers = {
+            "HTTP_AUTHORIZATION": f"Bearer {self.token}"
+        }
+        response = client.get(path=f'/mazes/{maze.id}/reachable', data={'cells': 'A1,I1'}, **headers)
+        self.assertEqual(status.HTTP_400_BAD_REQUEST, response.status_code)
+        self.assertEqual('Coordinates I1 are outside maze', str(response.data[0]))
+
+    def test_get_path(self):
+        maze = self._build_maze(self.user)
+        headers = {
+            "HTTP_AUTHORIZATION": f"Bearer {self.token}"
+        }
+        # The tree is built on the first query and stored.
+        self.assertIsNone(maze.exit_tree)
+        response = client.get(path=f'/mazes/{maze.id}/path', data={'from': 'F6'}, **headers)
+        self.assertEqual(status.HTTP_200_OK, response.status_code)
+        self.assertEqual({'status': 'done', 'paths': {'F6': ['F6', 'F5', 'G5', 'G4', 'H4']}}, response.data)
+        tree = bytes(Maze.objects.get(id=maze.id).exit_tree)
+
+        # As are the indexes of mazes solved before they were stored.
+        Maze.objects.filter(id=maze.id).update(reachable=None, exit_tree=None)
+        response = client.get(path=f'/mazes/{maze.id}/path', data={'from': 'A1,A2,H4'}, **headers)
+        self.assertEqual(status.HTTP_200_OK, response.status_code)
+        paths = response.data['paths']
+        self.assertEqual(len(maze.min_path), len(paths['A1']))
+        self.assertIsNone(paths['A2'])
+        self.assertEqual(['H4'], paths['H4'])
+        self.assertEqual(tree, bytes(Maze.objects.get(id=maze.id).exit_tree))
+
+    def test_get_path_entrance_in_walls(self):
+        maze = Maze(grid_size='3x3', entrance='B2', walls=['B2', 'B1', 'B3', 'C1', 'C3'], user=self.user)
+        maze.save()
+        headers = {
+            "HTTP_AUTHORIZATION": f"Bearer {self.token}"
+        }
+        response = client.get(path=f'/mazes/{maze.id}/path', data={'from': 'A1,B2'}, **headers)
+        self.assertEqual(status.HTTP_200_OK, response.status_code)
+        self.assertEqual({'A1': ['A1', 'A2', 'B2', 'C2'], 'B2': ['B2', 'C2']}, response.data['paths'])
+
+    def test_get_path_no_exit(self):
+        # Mazes saved before an exit was required.
+        maze = self._build_maze(self.user)
+        Maze.objects.filter(id=maze.id).update(exit_coordinates=None, reachable=None, exit_tree=None)
+        headers = {
+            "HTTP_AUTHORIZATION": f"Bearer {self.token}"
+        }
+        response = client.get(path=f'/mazes/{maze.id}/path', data={'from': 'A1,F6'}, **headers)
+        self.assertEqual(status.HTTP_200_OK, response.status_code)
+        self.assertEqual({'status': 'done', 'paths': {'A1': None, 'F6': None}}, response.data)
+
+    @override_settings(MAZE_PATH_MAX_SOURCES=2, MAZE_BATCH_MAX_SIZE=5)
+    def test_get_path_invalid_sources(self):
+        maze = self._build_maze(self.user)
+        headers = {
+            "HTTP_AUTHORIZATION": f"Bearer {self.token}"
+        }
+        response = client.get(path=f'/mazes/{maze.id}/path', **headers)
+        self.assertEqual(status.HTTP_400_BAD_REQUEST, response.status_code)
+        response = client.get(path=f'/mazes/{maze.id}/path', data={'from': 'A1,B1,C1'}, **headers)
+        self.assertEqual(status.HTTP_400_BAD_REQUEST, response.status_code)
+        self.assertEqual('At most 2 paths can be asked for at once', str(response.data[0]))
+        response = client.get(path=f'/mazes/{maze.id}/path', data={'from': 'A9'}, **headers)
+        self.assertEqual('Coordinates A9 are outside maze', str(response.data[0]))
+
+    def test_get_distances(self):
+        maze = self._build_maze(self.user)
+        headers = {
+            "HTTP_AUTHORIZATION": f"Bearer {self.token}"
+        }
+        response = client.get(path=f'/mazes/{maze.id}/distances', **headers)
+        self.assertEqual(status.HTTP_200_OK, response.status_code)
+        distances = response.data['distances']
+        self.assertEqual(8, len(distances))
+        self.assertEqual([0, None, 4, 5, 6, 7, 8, 9], distances[0])
+        self.assertEqual(10, distances[7][3])
+        self.assertIsNone(distances[7][0])
+        self.assertEqual('done', response.data['status'])
+        etag = response['ETag']
+
+        # Cached, neither the maze nor its walls are read again.
+        with self.assertNumQueries(1):
+            response = client.get(path=f'/mazes/{maze.id}/distances', **headers)
+        self.assertEqual(distances, response.data['distances'])
+        with self.assertNumQueries(1):
+            response = client.get(path=f'/mazes/{maze.id}/distances', HTTP_IF_NONE_MATCH=etag, **headers)
+        self.assertEqual(status.HTTP_304_NOT_MODIFIED, response.status_code)
+
+    def test_get_distances_pending(self):
+        maze = self._build_maze(self.user)
+        Maze.objects.filter(id=maze.id).update(status=Maze.PENDING)
+        headers = {
+            "HTTP_AUTHORIZATION": f"Bearer {self.token}"
+        }
+        response = client.get(path=f'/mazes/{maze.id}/distances', **headers)
+        self.assertEqual(status.HTTP_202_ACCEPTED, response.status_code)
+        self.assertEqual({'status': 'pending'}, response.data)
+        self.assertFalse(response.has_header('ETag'))
+
+        Maze.objects.filter(id=maze.id).update(status=Maze.FAILED, error='Maze has no exit')
+        response = client.get(path=f'/mazes/{maze.id}/distances', **headers)
+        self.assertEqual({'status': 'failed', 'error': 'Maze has no exit'}, response.data)
+
     def _build_maze(self, user):
         maze = Maze()
         maze.walls = []
@@ -296,3 +635,442 @@ class MazeSolutionTestCase(TestCase):
         maze.user = user
         maze.save()
         return maze
+
+
+class MazeEditTest(TestCase):
+    WALLS = ['G1', 'H1', 'A2', 'C2', 'E2', 'H2', 'G2', 'C3',
+             'E3', 'H3', 'B4', 'C4', 'E4', 'F4', 'B5', 'E5', 'H5', 'B6', 'D6',
+             'E6', 'G6', 'H6', 'B7', 'D7', 'G7', 'H7', 'B8', 'H8']
+
+    def setUp(self):
+        self.username = "rui"
+        data = {
+            "email": f"{self.username}@test.com",
+            "password": self.username,
+            "profile": {"name": self.username},
+        }
+        serializer = UserRegistrationSerializer(data=data)
+        serializer.is_valid(raise_exception=True)
+        self.user = serializer.save()
+        data = {
+            "email": f"{self.username}@test.com",
+            "password": {self.username},
+        }
+        response = client.post(path="/login", data=data)
+        self.token = response.data["token"]
+        self.maze = Maze(grid_size='8x8', entrance='A1', walls=self.WALLS, user=self.user)
+        self.maze.save()
+
+    def test_edit_walls(self):
+        headers = {
+            "HTTP_AUTHORIZATION": f"Bearer {self.token}"
+        }
+        response = client.patch(path=f'/mazes/{self.maze.id}', data={'addWalls': ['F2']},
+                                content_type='application/json', **headers)
+        self.assertEqual(status.HTTP_200_OK, response.status_code)
+        maze = Maze.objects.get(id=self.maze.id)
+        fresh = Maze(grid_size='8x8', entrance='A1', walls=self.WALLS + ['F2'], user=self.user)
+        fresh.save()
+        self.assertEqual(fresh.content_hash, maze.content_hash)
+        self.assertEqual(fresh.exit_coordinates, maze.exit_coordinates)
+        self.assertEqual(len(fresh.min_path), len(maze.min_path))
+        self.assertEqual(fresh.max_path, maze.max_path)
+        self.assertEqual(fresh.reachable, bytes(maze.reachable))
+
+        # The second edit starts from the search state the first one left.
+        search_state = MazeSearchState.objects.get(maze_id=maze.id)
+        self.assertEqual(maze.content_hash, search_state.content_hash)
+        response = client.patch(path=f'/mazes/{self.maze.id}', data={'removeWalls': ['F2']},
+                                content_type='application/json', **headers)
+        self.assertEqual(status.HTTP_200_OK, response.status_code)
+        maze = Maze.objects.get(id=self.maze.id)
+        self.assertEqual(self.maze.content_hash, maze.content_hash)
+        self.assertEqual(self.maze.min_path, maze.min_path)
+        self.assertEqual(self.WALLS, maze.walls)
+
+    def test_edit_walls_is_incremental(self):
+        headers = {
+            "HTTP_AUTHORIZATION": f"Bearer {self.token}"
+        }
+        client.patch(path=f'/mazes/{self.maze.id}', data={'addWalls': ['F2']},
+                     content_type='application/json', **headers)
+        # Once searched, an edit neither parses nor hashes every wall again.
+        with mock.patch.object(maze_validator, 'validate_maze', wraps=maze_validator.validate_maze) as validate, \
+                mock.patch.object(SolutionCache, 'content_hash', wraps=SolutionCache.content_hash) as content_hash:
+            response = client.patch(path=f'/mazes/{self.maze.id}', data={'removeWalls': ['F2']},
+                                    content_type='application/json', **headers)
+        self.assertEqual(status.HTTP_200_OK, response.status_code)
+        validate.assert_called_once_with('8x8', ['F2'], 'A1')
+        content_hash.assert_not_called()
+        self.assertEqual(self.maze.content_hash, Maze.objects.get(id=self.maze.id).content_hash)
+
+    def test_edit_walls_changes_etag(self):
+        headers = {
+            "HTTP_AUTHORIZATION": f"Bearer {self.token}"
+        }
+        etag = client.get(path=f'/mazes/{self.maze.id}/solution', **headers)['ETag']
+        client.patch(path=f'/mazes/{self.maze.id}', data={'addWalls': ['F2']},
+                     content_type='application/json', **headers)
+        response = client.get(path=f'/mazes/{self.maze.id}/solution', HTTP_IF_NONE_MATCH=etag, **headers)
+        self.assertEqual(status.HTTP_200_OK, response.status_code)
+        self.assertNotEqual(etag, response['ETag'])
+
+    def test_edit_walls_more_than_one_exit(self):
+        headers = {
+            "HTTP_AUTHORIZATION": f"Bearer {self.token}"
+        }
+        response = client.patch(path=f'/mazes/{self.maze.id}', data={'removeWalls': ['H8']},
+                                content_type='application/json', **headers)
+        self.assertEqual(status.HTTP_400_BAD_REQUEST, response.status_code)
+        self.assertEqual('Maze has more than one exit', str(response.data[0]))
+        self.assertEqual(self.WALLS, Maze.objects.get(id=self.maze.id).walls)
+        self.assertFalse(MazeSearchState.objects.exists())
+
+    def test_edit_walls_no_exit(self):
+        headers = {
+            "HTTP_AUTHORIZATION": f"Bearer {self.token}"
+        }
+        response = client.patch(path=f'/mazes/{self.maze.id}', data={'addWalls': ['H4']},
+                                content_type='application/json', **headers)
+        self.assertEqual(status.HTTP_400_BAD_REQUEST, response.status_code)
+        self.assertEqual('Maze has no exit', str(response.data[0]))
+        self.assertEqual(self.WALLS, Maze.objects.get(id=self.maze.id).walls)
+
+    def test_edit_walls_invalid(self):
+        headers = {
+            "HTTP_AUTHORIZATION": f"Bearer {self.token}"
+        }
+        response = client.patch(path=f'/mazes/{self.maze.id}', data={'addWalls': ['I1']},
+                                content_type='application/json', **headers)
+        self.assertEqual(status.HTTP_400_BAD_REQUEST, response.status_code)
+        response = client.patch(path=f'/mazes/{self.maze.id}', data={},
+                                content_type='application/json', **headers)
+        self.assertEqual(status.HTTP_400_BAD_REQUEST, response.status_code)
+
+    def test_edit_walls_pending(self):
+        headers = {
+            "HTTP_AUTHORIZATION": f"Bearer {self.token}"
+        }
+        Maze.objects.filter(id=self.maze.id).update(status=Maze.PENDING)
+        response = client.patch(path=f'/mazes/{self.maze.id}', data={'addWalls': ['F2']},
+                                content_type='application/json', **headers)
+        self.assertEqual(status.HTTP_409_CONFLICT, response.status_code)
+
+    def test_edit_walls_not_found(self):
+        headers = {
+            "HTTP_AUTHORIZATION": f"Bearer {self.token}"
+        }
+        response = client.patch(path=f'/mazes/{self.maze.id + 1}', data={'addWalls': ['F2']},
+                                content_type='application/json', **headers)
+        self.assertEqual(status.HTTP_404_NOT_FOUND, response.status_code)
+
+
+@override_settings(MAZE_SOLVE_MODE='async')
+class MazeSolveJobTest(TestCase):
+    def setUp(self):
+        self.username = "rui"
+        data = {
+            "email": f"{self.username}@test.com",
+            "password": self.username,
+            "profile": {"name": self.username},
+        }
+        serializer = UserRegistrationSerializer(data=data)
+        serializer.is_valid(raise_exception=True)
+        serializer.save()
+        data = {
+            "email": f"{self.username}@test.com",
+            "password": {self.username},
+        }
+        response = client.post(path="/login", data=data)
+        self.token = response.data["token"]
+
+    def test_maze_creation_is_solved_by_worker(self):
+        headers = {
+            "HTTP_AUTHORIZATION": f"Bearer {self.token}"
+        }
+        data = {
+            'entrance': 'A1',
+            'gridSize': '8x8',
+            'walls': ['G1', 'H1', 'A2', 'C2', 'E2', 'H2', 'G2', 'C3',
+                      'E3', 'H3', 'B4', 'C4', 'E4', 'F4', 'B5', 'E5', 'H5', 'B6', 'D6',
+                      'E6', 'G6', 'H6', 'B7', 'D7', 'G7', 'H7', 'B8', 'H8']
+        }
+        response = client.post(path="/mazes/", data=data, content_type='application/json', **headers)
+        self.assertEqual(status.HTTP_202_ACCEPTED, response.status_code)
+        self.assertEqual('pending', response.data['status'])
+        maze_id = response.data['id']
+        self.assertIsNone(Maze.objects.get(id=maze_id).min_path)
+
+        response = client.get(path=f'/mazes/{maze_id}/solution', **headers)
+        self.assertEqual(status.HTTP_202_ACCEPTED, response.status_code)
+        self.assertEqual('pending', response.data['status'])
+
+        call_command('solve_mazes', once=True)
+
+        response = client.get(path=f'/mazes/{maze_id}/solution', data={'steps': 'max'}, **headers)
+        self.assertEqual(status.HTTP_200_OK, response.status_code)
+        self.assertEqual('done', response.data['status'])
+        self.assertEqual(
+            ['A1', 'B1', 'C1', 'D1', 'D2', 'D3', 'D4', 'D5', 'C5', 'C6', 'C7',
+             'C8', 'D8', 'E8', 'E7', 'F7', 'F6', 'F5', 'G5', 'G4', 'H4'],
+            response.data['max_path']
+        )
+        self.assertEqual('H4', Maze.objects.get(id=maze_id).exit_coordinates)
+
+    def test_maze_creation_more_than_one_exit_fails(self):
+        headers = {
+            "HTTP_AUTHORIZATION": f"Bearer {self.token}"
+        }
+        data = {
+            'gridSize': '8x8',
+            'entrance': 'A1',
+            'walls': ['A2', 'A3']
+        }
+        response = client.post(path="/mazes/", data=data, content_type='application/json', **headers)
+        self.assertEqual(status.HTTP_202_ACCEPTED, response.status_code)
+
+        call_command('solve_mazes', once=True)
+
+        response = client.get(path=f'/mazes/{response.data["id"]}/solution', **headers)
+        self.assertEqual(status.HTTP_200_OK, response.status_code)
+        self.assertEqual({'status': 'failed', 'error': 'Maze has more than one exit'}, response.data)
+
+    def test_maze_creation_invalid_grid_size_is_rejected(self):
+        headers = {
+            "HTTP_AUTHORIZATION": f"Bearer {self.token}"
+        }
+        data = {
+            'gridSize': '8',
+            'entrance': 'A1',
+            'walls': []
+        }
+        response = client.post(path="/mazes/", data=data, content_type='application/json', **headers)
+        self.assertEqual(status.HTTP_400_BAD_REQUEST, response.status_code)
+        self.assertFalse(Maze.objects.exists())
+
+
+class MazeBatchTest(TestCase):
+    def setUp(self):
+        self.username = "rui"
+        data = {
+            "email": f"{self.username}@test.com",
+            "password": self.username,
+            "profile": {"name": self.username},
+        }
+        serializer = UserRegistrationSerializer(data=data)
+        serializer.is_valid(raise_exception=True)
+        serializer.save()
+        data = {
+            "email": f"{self.username}@test.com",
+            "password": {self.username},
+        }
+        response = client.post(path="/login", data=data)
+        self.token = response.data["token"]
+
+    @override_settings(MAZE_BATCH_WORKERS=2)
+    def test_maze_batch_creation(self):
+        headers = {
+            "HTTP_AUTHORIZATION": f"Bearer {self.token}"
+        }
+        data = [
+            {'gridSize': '3x3', 'entrance': 'A1', 'walls': ['C2', 'C3']},
+            {'gridSize': '8x8', 'entrance': 'A1', 'walls': ['G1', 'H1', 'A2', 'C2', 'E2', 'H2', 'G2', 'C3',
+                                                            'E3', 'H3', 'B4', 'C4', 'E4', 'F4', 'B5', 'E5',
+                                                            'H5', 'B6', 'D6', 'E6', 'G6', 'H6', 'B7', 'D7',
+                                                            'G7', 'H7', 'B8', 'H8']},
+            {'gridSize': '3x3', 'entrance': 'A1', 'walls': ['C3', 'C2', 'C3']},
+        ]
+        response = client.post(path="/mazes/batch", data=data, content_type='application/json', **headers)
+        self.assertEqual(status.HTTP_201_CREATED, response.status_code)
+        ids = response.data['ids']
+        self.assertEqual(3, len(ids))
+        mazes = [Maze.objects.get(id=maze_id) for maze_id in ids]
+        self.assertEqual(['A1', 'B1', 'C1'], mazes[0].min_path)
+        self.assertEqual('H4', mazes[1].exit_coordinates)
+        self.assertEqual(21, len(mazes[1].max_path))
+        self.assertEqual(['C3', 'C2', 'C3'], mazes[2].walls)
+        self.assertEqual(mazes[0].min_path, mazes[2].min_path)
+        self.assertTrue(all(maze.user.email == 'rui@test.com' for maze in mazes))
+
+    def test_maze_batch_creation_errors(self):
+        headers = {
+            "HTTP_AUTHORIZATION": f"Bearer {self.token}"
+        }
+        data = [
+            {'gridSize': '3x3', 'entrance': 'A1', 'walls': ['C2', 'C3']},
+            {'gridSize': '3x3', 'entrance': 'D1', 'walls': ['C2', 'C3']},
+            {'gridSize': '3x3', 'walls': ['C2', 'C3']},
+        ]
+        response = client.post(path="/mazes/batch", data=data, content_type='application/json', **headers)
+        self.assertEqual(status.HTTP_400_BAD_REQUEST, response.status_code)
+        errors = response.data['errors']
+        self.assertIsNone(errors[0])
+        self.assertEqual(1, len(errors[1]['non_field_errors']))
+        self.assertIn('entrance', errors[2])
+        self.assertFalse(Maze.objects.exists())
+
+    def test_maze_batch_creation_solving_error(self):
+        headers = {
+            "HTTP_AUTHORIZATION": f"Bearer {self.token}"
+        }
+        data = [
+            {'gridSize': '3x3', 'entrance': 'A1', 'walls': ['C2', 'C3']},
+            {'gridSize': '8x8', 'entrance': 'A1', 'walls': ['A2', 'A3']},
+        ]
+        response = client.post(path="/mazes/batch", data=data, content_type='application/json', **headers)
+        self.assertEqual(status.HTTP_400_BAD_REQUEST, response.status_code)
+        self.assertEqual(
+            [None, {'non_field_errors': ['Maze has more than one exit']}],
+            response.data['errors']
+        )
+        self.assertFalse(Maze.objects.exists())
+
+    def test_maze_batch_creation_not_a_list(self):
+        headers = {
+            "HTTP_AUTHORIZATION": f"Bearer {self.token}"
+        }
+        data = {'gridSize': '3x3', 'entrance': 'A1', 'walls': []}
+        response = client.post(path="/mazes/batch", data=data, content_type='application/json', **headers)
+        self.assertEqual(status.HTTP_400_BAD_REQUEST, response.status_code)
+
+
+class MazeCreationQueryCountTest(TestCase):
+    # The authenticated user is loaded once, by the JWT authentication, and
+    # a maze is parsed once: creating one takes the user lookup, the
+    # solution cache lookup and the inserts, nothing else.
+    def setUp(self):
+        self.username = "rui"
+        data = {
+            "email": f"{self.username}@test.com",
+            "password": self.username,
+            "profile": {"name": self.username},
+        }
+        serializer = UserRegistrationSerializer(data=data)
+        serializer.is_valid(raise_exception=True)
+        serializer.save()
+        data = {
+            "email": f"{self.username}@test.com",
+            "password": {self.username},
+        }
+        response = client.post(path="/login", data=data)
+        self.token = response.data["token"]
+        SolutionCache.clear()
+
+    def test_maze_creation_queries(self):
+        headers = {
+            "HTTP_AUTHORIZATION": f"Bearer {self.token}"
+        }
+        data = {'gridSize': '3x3', 'entrance': 'A1', 'walls': ['C2', 'C3']}
+        # User, cached solution, solution insert and maze insert.
+        with self.assertNumQueries(4):
+            response = client.post(path="/mazes/", data=data, content_type='application/json', **headers)
+        self.assertEqual(status.HTTP_201_CREATED, response.status_code)
+        # The solution is now in memory.
+        with self.assertNumQueries(2):
+            response = client.post(path="/mazes/", data=data, content_type='application/json', **headers)
+        self.assertEqual(status.HTTP_201_CREATED, response.status_code)
+        self.assertEqual(['A1', 'B1', 'C1'], Maze.objects.get(id=response.data['id']).min_path)
+
+    @override_settings(MAZE_SOLVE_MODE='async')
+    def test_maze_creation_async_queries(self):
+        headers = {
+            "HTTP_AUTHORIZATION": f"Bearer {self.token}"
+        }
+        data = {'gridSize': '3x3', 'entrance': 'A1', 'walls': ['C2', 'C3']}
+        with self.assertNumQueries(2):
+            response = client.post(path="/mazes/", data=data, content_type='application/json', **headers)
+        self.assertEqual(status.HTTP_202_ACCEPTED, response.status_code)
+
+    @override_settings(MAZE_BATCH_WORKERS=1)
+    def test_maze_batch_creation_queries(self):
+        headers = {
+            "HTTP_AUTHORIZATION": f"Bearer {self.token}"
+        }
+        data = [
+            {'gridSize': '3x3', 'entrance': 'A1', 'walls': ['C2', 'C3']},
+            {'gridSize': '3x3', 'entrance': 'A2', 'walls': ['C1', 'C3']},
+            {'gridSize': '3x3', 'entrance': 'A1', 'walls': ['C2', 'C3']},
+        ]
+        with self.assertNumQueries(7):
+            response = client.post(path="/mazes/batch", data=data, content_type='application/json', **headers)
+        self.assertEqual(status.HTTP_201_CREATED, response.status_code)
+        self.assertEqual(3, len(response.data['ids']))
+
+
+class MazeListTest(TestCase):
+    def setUp(self):
+        self.username = "rui"
+        data = {
+            "email": f"{self.username}@test.com",
+            "password": self.username,
+            "profile": {"name": self.username},
+        }
+        serializer = UserRegistrationSerializer(data=data)
+        serializer.is_valid(raise_exception=True)
+        self.user = serializer.save()
+        data = {
+            "email": f"{self.username}@test.com",
+            "password": {self.username},
+        }
+        response = client.post(path="/login", data=data)
+        self.token = response.data["token"]
+        self.ids = []
+        for row in range(5):
+            maze = Maze(grid_size='3x3', entrance='A1', walls=[f'C{col}' for col in range(1, 4) if col != row % 3 + 1],
+                        user=self.user)
+            maze.save()
+            self.ids.append(maze.id)
+        other = User.objects.create_user('other@test.com', 'other')
+        Maze(grid_size='3x3', entrance='A1', walls=['C2', 'C3'], user=other).save()
+
+    def test_list_pages(self):
+        headers = {
+            "HTTP_AUTHORIZATION": f"Bearer {self.token}"
+        }
+        response = client.get(path="/mazes/", data={'limit': 2}, **headers)
+        self.assertEqual(status.HTTP_200_OK, response.status_code)
+        self.assertNotIn('count', response.data)
+        ids = [maze['id'] for maze in response.data['results']]
+        self.assertEqual(
+            {'id': self.ids[0], 'entrance': 'A1', 'walls': ['C2', 'C3'], 'user': 'rui@test.com', 'gridSize': '3x3'},
+            response.data['results'][0]
+        )
+        while response.data['next']:
+            # The user and the page, however deep the page is.
+            with self.assertNumQueries(2):
+                response = client.get(response.data['next'], **headers)
+            ids.extend(maze['id'] for maze in response.data['results'])
+        self.assertEqual(self.ids, ids)
+
+    def test_list_fields(self):
+        headers = {
+            "HTTP_AUTHORIZATION": f"Bearer {self.token}"
+        }
+        response = client.get(path="/mazes/", data={'fields': 'id,gridSize'}, **headers)
+        self.assertEqual(status.HTTP_200_OK, response.status_code)
+        self.assertEqual([{'id': maze_id, 'gridSize': '3x3'} for maze_id in self.ids], response.data['results'])
+        response = client.get(path="/mazes/", data={'fields': 'id,min_moves'}, **headers)
+        self.assertEqual(status.HTTP_400_BAD_REQUEST, response.status_code)
+
+    def test_list_first_page_cached(self):
+        headers = {
+            "HTTP_AUTHORIZATION": f"Bearer {self.token}"
+        }
+        with mock.patch.object(metrics, '_samples', {}) as samples:
+            response = client.get(path="/mazes/", data={'limit': 2}, **headers)
+            # Only the user is read.
+            with self.assertNumQueries(1):
+                cached = client.get(path="/mazes/", data={'limit': 2}, **headers)
+            self.assertEqual(response.data, cached.data)
+            self.assertEqual(1, samples[('maze_response_cache_requests_total',
+                                         (('cache', 'list'), ('result', 'miss')), None)])
+            self.assertEqual(1, samples[('maze_response_cache_requests_total',
+                                         (('cache', 'list'), ('result', 'hit')), None)])
+
+        # A new maze of the user invalidates it, one of another user does not.
+        Maze(grid_size='3x3', entrance='A1', walls=['C2', 'C3'], user=User.objects.get(email='other@test.com')).save()
+        with self.assertNumQueries(1):
+            client.get(path="/mazes/", data={'limit': 2}, **headers)
+        Maze(grid_size='3x3', entrance='A1', walls=['C1', 'C2'], user=self.user).save()
+        response = client.get(path="/mazes/", data={'fields': 'id'}, **headers)
+        self.assertEqual(6, len(response.data['results']))
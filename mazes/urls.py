@@ -1,8 +1,17 @@
 from django.urls import path
 
-from mazes.views import MazeView, MazeSolutionView
+from mazes.views import (
+    MazeView, MazeBatchView, MazeDetailView, MazeDistancesView, MazePathView, MazeReachableView, MazeSolutionView,
+    SolutionCacheView
+)
 
 urlpatterns = [
     path("", MazeView.as_view()),
-    path("<int:id>/solution", MazeSolutionView.as_view())
+    path("batch", MazeBatchView.as_view()),
+    path("<int:id>", MazeDetailView.as_view()),
+    path("<int:id>/solution", MazeSolutionView.as_view()),
+    path("<int:id>/distances", MazeDistancesView.as_view()),
+    path("<int:id>/reachable", MazeReachableView.as_view()),
+    path("<int:id>/path", MazePathView.as_view()),
+    path("cache", SolutionCacheView.as_view())
 ]
\ No newline at end of file
@@ -1,18 +1,62 @@
+from string import ascii_uppercase, digits
+
+import numpy
+
+_WITHOUT_DIGITS = str.maketrans(digits, ' ' * len(digits))
+_WITHOUT_LETTERS = str.maketrans(ascii_uppercase, ' ' * len(ascii_uppercase))
+
+
 def row_as_index(row_coordinate):
-    return ord(row_coordinate) - ord('A')
+    index = 0
+    for letter in row_coordinate:
+        index = index * 26 + ord(letter) - ord('A') + 1
+    return index - 1
 
 
 def col_as_index(col_coordinate):
     return int(col_coordinate) - 1
 
 
+def cell_as_indexes(cell_coordinates):
+    split = 1
+    while cell_coordinates[split].isalpha():
+        split += 1
+    return row_as_index(cell_coordinates[:split]), col_as_index(cell_coordinates[split:])
+
+
+def split_cells_coordinates(cells_coordinates):
+    """
+    Row and column coordinates of many well formed cells, split in bulk
+    rather than cell by cell.
+    """
+    joined_cells = ' '.join(cells_coordinates)
+    return joined_cells.translate(_WITHOUT_DIGITS).split(), joined_cells.translate(_WITHOUT_LETTERS).split()
+
+
+def joined_cells_as_indexes(joined_cells):
+    """
+    Row and column indexes of many well formed cells joined by whitespace,
+    the columns parsed by numpy rather than one int at a time.
+    """
+    row_coordinates = joined_cells.translate(_WITHOUT_DIGITS).split()
+    row_indexes = {x: row_as_index(x) for x in set(row_coordinates)}
+    cols = numpy.fromstring(joined_cells.translate(_WITHOUT_LETTERS), dtype=numpy.int64, sep=' ') - 1
+    return list(map(row_indexes.__getitem__, row_coordinates)), cols.tolist()
+
+
 def as_cell_coordinates(row, col):
     return as_row_coordinate(row) + str(col + 1)
 
 
 def as_row_coordinate(index):
-    return chr(index + ord('A'))
+    row_coordinate = ''
+    index += 1
+    while index:
+        index, letter = divmod(index - 1, 26)
+        row_coordinate = chr(letter + ord('A')) + row_coordinate
+    return row_coordinate
 
 
 def as_col_coordinate(index):
-    return chr(index + 1)
+    return str(index + 1)
+
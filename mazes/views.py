@@ -1,11 +1,31 @@
+import hashlib
+
+from django.conf import settings
+from django.http import HttpResponse, HttpResponseNotModified, StreamingHttpResponse
+from django.utils.cache import patch_cache_control, patch_vary_headers
+from django.utils.http import parse_etags
 from rest_framework import status, mixins
+from rest_framework.exceptions import ValidationError
 from rest_framework.generics import GenericAPIView
-from rest_framework.permissions import IsAuthenticated
+from rest_framework.permissions import IsAdminUser, IsAuthenticated
+from rest_framework.renderers import JSONRenderer
 from rest_framework.response import Response
+from rest_framework.settings import api_settings
 from rest_framework_jwt.authentication import JSONWebTokenAuthentication
 
+from mazes import metrics
+from mazes.business.model import exit_tree, path_codec, reachability
+from mazes.business.model.validators import maze_validator
+from mazes.business.services.LazySolution import LazySolution
+from mazes.business.services.MazeBatch import MazeBatch
+from mazes.business.services.MazeEditor import MazeEditor
+from mazes.business.services.ResponseCache import ResponseCache
+from mazes.business.services.ShortestPathSolver import UNREACHED, ShortestPathSolver
+from mazes.business.services.SolutionCache import SolutionCache
 from mazes.models import Maze
-from mazes.serializers import MazeSerializer, MazeCreationSerializer
+from mazes.pagination import MazeCursorPagination
+from mazes.serializers import MazeSerializer, MazeCreationSerializer, MazeEditSerializer
+from mazes.utils import as_cell_coordinates, cell_as_indexes
 
 
 class MazeView(
@@ -15,17 +35,35 @@ class MazeView(
 ):
     serializer_class = MazeSerializer
     creation_serializer_class = MazeCreationSerializer
+    pagination_class = MazeCursorPagination
     permission_classes = (IsAuthenticated,)
     authentication_class = JSONWebTokenAuthentication
 
+    @metrics.timed('maze_request_duration_seconds', view='MazeView.post')
     def post(self, request, *args, **kwargs):
-        serializer = self.creation_serializer_class(data={**request.data, **{'user': request.user.email}})
+        serializer = self.creation_serializer_class(data=request.data)
         serializer.is_valid(raise_exception=True)
-        maze = serializer.save()
+        if settings.MAZE_SOLVE_MODE == 'async':
+            maze = serializer.save(user=request.user, status=Maze.PENDING)
+            return Response({'id': maze.id, 'status': maze.status}, status=status.HTTP_202_ACCEPTED)
+        maze = serializer.save(user=request.user)
         return Response({'id': maze.id}, status=status.HTTP_201_CREATED)
 
+    @metrics.timed('maze_request_duration_seconds', view='MazeView.get')
     def get(self, request, *args, **kwargs):
-        return self.list(request, *args, **kwargs)
+        """
+        Lists the mazes a page at a time, with only the fields asked for by
+        fields=, a comma separated list, when it is given. First pages are
+        answered from the response cache.
+        """
+        if 'cursor' in request.GET:
+            return self.list(request, *args, **kwargs)
+        key = ResponseCache.key(request.user.email, 'list', request.build_absolute_uri())
+        data = ResponseCache.get(key, 'list')
+        if data is None:
+            data = self.list(request, *args, **kwargs).data
+            ResponseCache.put(key, data)
+        return Response(data, status.HTTP_200_OK)
 
     def get_queryset(self):
         """
@@ -33,22 +71,356 @@ class MazeView(
         for the currently authenticated user.
         """
         user = self.request.user
-        return Maze.objects.filter(user__email=user)
+        # Paths and indexes are never listed, only the columns of the fields
+        # listed are loaded, the id always being needed to paginate.
+        columns = [MazeSerializer.COLUMNS[name] for name in self.list_fields()]
+        return Maze.objects.filter(user=user.email).only('id', *columns)
 
+    def get_serializer(self, *args, **kwargs):
+        if self.request.method == 'GET':
+            kwargs['fields'] = self.list_fields()
+        return super().get_serializer(*args, **kwargs)
 
-class MazeSolutionView(GenericAPIView, mixins.RetrieveModelMixin):
+    def list_fields(self):
+        fields = self.request.GET.get('fields')
+        if not fields:
+            return MazeSerializer.Meta.fields
+        fields = fields.split(',')
+        unknown = [name for name in fields if name not in MazeSerializer.COLUMNS]
+        if unknown:
+            raise ValidationError(f'Unknown fields {", ".join(unknown)}, expected some of '
+                                  f'{", ".join(MazeSerializer.Meta.fields)}')
+        return fields
+
+
+class MazeBatchView(GenericAPIView):
     permission_classes = (IsAuthenticated,)
     authentication_class = JSONWebTokenAuthentication
 
-    def get(self, request, id):
-        steps = request.GET.get('steps', 'min')
+    @metrics.timed('maze_request_duration_seconds', view='MazeBatchView.post')
+    def post(self, request):
+        """
+        Creates every maze of the list or none of them. Errors are listed
+        in the order of the mazes, null for the valid ones.
+        """
+        items = request.data
+        if not isinstance(items, list) or not items:
+            raise ValidationError('Expected a non empty list of mazes')
+        if len(items) > settings.MAZE_BATCH_MAX_SIZE:
+            raise ValidationError(f'At most {settings.MAZE_BATCH_MAX_SIZE} mazes can be created at once')
+
+        mazes, errors = MazeBatch.validate(items, request.user)
+        is_async = settings.MAZE_SOLVE_MODE == 'async'
+        if is_async:
+            for maze in mazes:
+                if maze is not None:
+                    maze.status = Maze.PENDING
+        elif not any(errors):
+            MazeBatch.solve(mazes, errors)
+        if any(errors):
+            return Response({'errors': errors}, status.HTTP_400_BAD_REQUEST)
+
+        ids = MazeBatch.create(mazes)
+        if is_async:
+            return Response({'ids': ids, 'status': Maze.PENDING}, status.HTTP_202_ACCEPTED)
+        return Response({'ids': ids}, status.HTTP_201_CREATED)
+
+
+class MazeDetailView(GenericAPIView):
+    permission_classes = (IsAuthenticated,)
+    authentication_class = JSONWebTokenAuthentication
+
+    @metrics.timed('maze_request_duration_seconds', view='MazeDetailView.patch')
+    def patch(self, request, id):
+        """
+        Adds the addWalls and removes the removeWalls of a solved maze,
+        updating its shortest path incrementally.
+        """
+        serializer = MazeEditSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        added, removed = serializer.validated_data['addWalls'], serializer.validated_data['removeWalls']
+        if not added and not removed:
+            raise ValidationError('Expected addWalls or removeWalls')
         try:
             maze = Maze.objects.get(id=id, user=request.user.email)
         except Maze.DoesNotExist:
             return Response({'Response': 'Not Found'}, status.HTTP_404_NOT_FOUND)
+        if maze.status != Maze.DONE or not MazeEditor.edit(maze, added, removed):
+            return Response({'Response': 'Conflict', 'status': maze.status}, status.HTTP_409_CONFLICT)
+        return Response({'id': maze.id, 'status': maze.status}, status.HTTP_200_OK)
+
+
+class MovesJSONRenderer(JSONRenderer):
+    # DRF reads ?format= as the renderer to use, format=moves is still JSON.
+    format = 'moves'
 
+
+class MazeSolutionView(GenericAPIView, mixins.RetrieveModelMixin):
+    permission_classes = (IsAuthenticated,)
+    authentication_class = JSONWebTokenAuthentication
+    renderer_classes = (*api_settings.DEFAULT_RENDERER_CLASSES, MovesJSONRenderer)
+
+    @metrics.timed('maze_request_duration_seconds', view='MazeSolutionView.get')
+    def get(self, request, id):
+        """
+        The min or max path, as a list of cells, as the first cell and a
+        string of moves with format=moves, or streamed as NDJSON with
+        stream=1. Only the packed path asked for is read, and the max path
+        is solved the first time it is asked for.
+        """
+        steps = 'min' if request.GET.get('steps', 'min') == 'min' else 'max'
+        key = ResponseCache.key(request.user.email, 'solution', id, steps)
+        cached = ResponseCache.get(key, 'solution')
+        if cached is not None:
+            # Hot reads are answered without a query for the maze.
+            content_hash, moves = cached
+            etag = _etag(request, content_hash)
+            if _not_modified(request, etag):
+                return _cacheable(HttpResponseNotModified(), etag)
+            return _cacheable(_solution_response(request, steps, moves), etag)
+
+        # A conditional request leaves the path out until the maze is known
+        # to have changed.
+        conditional = 'HTTP_IF_NONE_MATCH' in request.META
+        row = Maze.objects.filter(id=id, user=request.user.email).values_list(
+            'status', 'error', 'content_hash', *(() if conditional else (f'{steps}_moves',))
+        ).first()
+        if row is None:
+            return Response({'Response': 'Not Found'}, status.HTTP_404_NOT_FOUND)
+
+        maze_status, error, content_hash = row[:3]
+        if maze_status in (Maze.PENDING, Maze.RUNNING):
+            return _uncacheable(Response({'status': maze_status}, status.HTTP_202_ACCEPTED))
+        if maze_status == Maze.FAILED:
+            return Response({'status': maze_status, 'error': error}, status.HTTP_200_OK)
+        etag = _etag(request, content_hash)
+        if _not_modified(request, etag):
+            return _cacheable(HttpResponseNotModified(), etag)
+        if conditional:
+            moves = Maze.objects.filter(id=id).values_list(f'{steps}_moves', flat=True).first()
+        else:
+            moves = row[3]
+        if moves is None:
+            # Max paths are solved on their first read.
+            moves = LazySolution.max_moves(Maze.objects.get(id=id))
+        moves = bytes(moves)
+        ResponseCache.put(key, (content_hash, moves))
+        return _cacheable(_solution_response(request, steps, moves), etag)
+
+
+def _solution_response(request, steps, moves):
+    if moves == path_codec.NOT_SOLVED:
         return Response(
-            {'min_path': maze.min_path} if steps == 'min' else {'max_path': maze.max_path},
-            status.HTTP_200_OK
+            {'status': Maze.DONE, 'error': 'Maze is over the limits its max path is solved within'},
+            status.HTTP_422_UNPROCESSABLE_ENTITY
         )
+    if request.GET.get('stream') == '1':
+        return StreamingHttpResponse(_ndjson_path(moves), content_type='application/x-ndjson')
+    if request.GET.get('format') == 'moves':
+        start, path_moves = path_codec.decode_moves(moves)
+        return Response({'status': Maze.DONE, 'start': start, f'{steps}_moves': path_moves}, status.HTTP_200_OK)
+    return Response({'status': Maze.DONE, f'{steps}_path': path_codec.decode_coordinates(moves)}, status.HTTP_200_OK)
+
+
+def _etag(request, content_hash):
+    """
+    Strong validator of a representation of what is solved from a maze: it
+    only depends on the maze content, the query and the renderer, so it
+    changes with every edit. None for mazes saved without a content hash.
+    """
+    if content_hash is None:
+        return None
+    variant = f'{content_hash}?{request.GET.urlencode()}:{request.accepted_renderer.format}'
+    return f'"{hashlib.sha256(variant.encode()).hexdigest()[:32]}"'
+
+
+def _not_modified(request, etag):
+    header = request.META.get('HTTP_IF_NONE_MATCH')
+    return etag is not None and header is not None and (header.strip() == '*' or etag in parse_etags(header))
+
+
+def _cacheable(response, etag):
+    # Shared caches keep a copy for each token, revalidated after
+    # MAZE_SOLUTION_MAX_AGE seconds since a PATCH can change it.
+    if etag is None:
+        return response
+    response['ETag'] = etag
+    patch_cache_control(response, public=True, max_age=settings.MAZE_SOLUTION_MAX_AGE)
+    patch_vary_headers(response, ('Accept', 'Authorization'))
+    return response
+
+
+def _uncacheable(response):
+    patch_cache_control(response, no_cache=True)
+    return response
+
+
+def _ndjson_path(moves):
+    # One JSON encoded cell a line, sent a chunk at a time as it is decoded.
+    if not moves:
+        yield 'null\n'
+        return
+    for coordinates in path_codec.iter_coordinates(moves):
+        yield ''.join(f'"{cell}"\n' for cell in coordinates)
+
+
+class MazeDistancesView(GenericAPIView):
+    permission_classes = (IsAuthenticated,)
+    authentication_class = JSONWebTokenAuthentication
+
+    @metrics.timed('maze_request_duration_seconds', view='MazeDistancesView.get')
+    def get(self, request, id):
+        """
+        Steps from the entrance to each cell, row by row, null for walls and
+        cells out of reach. The maze is only searched when the response is
+        not cached, and its walls are not loaded for a request its ETag
+        answers.
+        """
+        key = ResponseCache.key(request.user.email, 'distances', id)
+        cached = ResponseCache.get(key, 'distances')
+        if cached is not None:
+            content_hash, data = cached
+            etag = _etag(request, content_hash)
+            if _not_modified(request, etag):
+                return _cacheable(HttpResponseNotModified(), etag)
+            return _cacheable(Response(data, status.HTTP_200_OK), etag)
+
+        row = Maze.objects.filter(id=id, user=request.user.email).values_list(
+            'status', 'error', 'content_hash'
+        ).first()
+        if row is None:
+            return Response({'Response': 'Not Found'}, status.HTTP_404_NOT_FOUND)
+
+        maze_status, error, content_hash = row
+        if maze_status in (Maze.PENDING, Maze.RUNNING):
+            return _uncacheable(Response({'status': maze_status}, status.HTTP_202_ACCEPTED))
+        if maze_status == Maze.FAILED:
+            return Response({'status': maze_status, 'error': error}, status.HTTP_200_OK)
+        etag = _etag(request, content_hash)
+        if _not_modified(request, etag):
+            return _cacheable(HttpResponseNotModified(), etag)
+        maze = Maze.objects.get(id=id)
+        parsed = maze.parsed()
+        grid = parsed.grid()
+        visited = ShortestPathSolver.search(grid, parsed.entrance_cell(grid))
+        distances = ShortestPathSolver.distances(grid, visited)[1:-1, 1:-1]
+        data = {
+            'status': maze_status,
+            'gridSize': maze.grid_size,
+            'entrance': maze.entrance,
+            'distances': [
+                [distance if distance != UNREACHED else None for distance in row]
+                for row in distances.tolist()
+            ]
+        }
+        ResponseCache.put(key, (content_hash, data))
+        return _cacheable(Response(data, status.HTTP_200_OK), etag)
+
+
+class MazeReachableView(GenericAPIView):
+    permission_classes = (IsAuthenticated,)
+    authentication_class = JSONWebTokenAuthentication
+
+    @metrics.timed('maze_request_duration_seconds', view='MazeReachableView.get')
+    def get(self, request, id):
+        """
+        Whether each of cells, a comma separated list, can be reached from
+        the entrance, read from the index stored when the maze was solved:
+        neither the walls nor the paths are loaded. Without cells, the open
+        cells that cannot be reached are listed, loading the walls to tell
+        them from the walls in the index.
+        """
+        cells = [cell for cell in request.GET.get('cells', '').split(',') if cell]
+        row = Maze.objects.filter(id=id, user=request.user.email).values_list(
+            'status', 'error', 'content_hash', 'grid_size', 'entrance', 'reachable'
+        ).first()
+        if row is None:
+            return Response({'Response': 'Not Found'}, status.HTTP_404_NOT_FOUND)
+
+        maze_status, error, content_hash, grid_size, entrance, index = row
+        if maze_status in (Maze.PENDING, Maze.RUNNING):
+            return _uncacheable(Response({'status': maze_status}, status.HTTP_202_ACCEPTED))
+        if maze_status == Maze.FAILED:
+            return Response({'status': maze_status, 'error': error}, status.HTTP_200_OK)
+        etag = _etag(request, content_hash)
+        if _not_modified(request, etag):
+            return _cacheable(HttpResponseNotModified(), etag)
+        if not cells:
+            maze = Maze.objects.get(id=id)
+            (rows, cols) = reachability.unreachable(maze.reachable_index(), maze.parsed())
+            return _cacheable(Response(
+                {'status': maze_status, 'unreachable': list(map(as_cell_coordinates, rows, cols))},
+                status.HTTP_200_OK
+            ), etag)
+        if index is None:
+            index = Maze.objects.get(id=id).reachable_index()
+        queried = maze_validator.validate_maze(grid_size, cells, entrance)
+        return _cacheable(Response(
+            {
+                'status': maze_status,
+                'reachable': {
+                    cell: reachability.is_reachable(index, queried.cols_size, cell_row, cell_col)
+                    for cell, cell_row, cell_col in zip(cells, queried.wall_rows, queried.wall_cols)
+                }
+            },
+            status.HTTP_200_OK
+        ), etag)
+
+
+class MazePathView(GenericAPIView):
+    permission_classes = (IsAuthenticated,)
+    authentication_class = JSONWebTokenAuthentication
+
+    @metrics.timed('maze_request_duration_seconds', view='MazePathView.get')
+    def get(self, request, id):
+        """
+        Shortest path to the exit from each of from, a comma separated list
+        of cells, null for the cells that cannot reach it. Paths are read
+        from a tree of the shortest paths to the exit, built on the first
+        query and stored, in time linear in their length.
+        """
+        sources = [cell for cell in request.GET.get('from', '').split(',') if cell]
+        if not sources:
+            raise ValidationError('Expected from, a comma separated list of cells')
+        if len(sources) > settings.MAZE_PATH_MAX_SOURCES:
+            raise ValidationError(f'At most {settings.MAZE_PATH_MAX_SOURCES} paths can be asked for at once')
+        row = Maze.objects.filter(id=id, user=request.user.email).values_list(
+            'status', 'error', 'content_hash', 'grid_size', 'entrance', 'exit_coordinates', 'reachable', 'exit_tree'
+        ).first()
+        if row is None:
+            return Response({'Response': 'Not Found'}, status.HTTP_404_NOT_FOUND)
+
+        maze_status, error, content_hash, grid_size, entrance, exit_coordinates, index, tree = row
+        if maze_status in (Maze.PENDING, Maze.RUNNING):
+            return _uncacheable(Response({'status': maze_status}, status.HTTP_202_ACCEPTED))
+        if maze_status == Maze.FAILED:
+            return Response({'status': maze_status, 'error': error}, status.HTTP_200_OK)
+        etag = _etag(request, content_hash)
+        if _not_modified(request, etag):
+            return _cacheable(HttpResponseNotModified(), etag)
+        queried = maze_validator.validate_maze(grid_size, sources, entrance)
+        paths = dict.fromkeys(sources)
+        if exit_coordinates is None:
+            # Mazes saved before an exit was required have no path to it.
+            return _cacheable(Response({'status': maze_status, 'paths': paths}, status.HTTP_200_OK), etag)
+        if index is None or tree is None:
+            maze = Maze.objects.get(id=id)
+            index, tree = maze.reachable_index(), maze.exit_tree_index()
+        cols_size = queried.cols_size
+        exit_row, exit_col = cell_as_indexes(exit_coordinates)
+        for cell, cell_row, cell_col in zip(sources, queried.wall_rows, queried.wall_cols):
+            if reachability.is_reachable(index, cols_size, cell_row, cell_col):
+                paths[cell] = exit_tree.path_to_exit(tree, cols_size, cell_row, cell_col, exit_row, exit_col)
+        return _cacheable(Response({'status': maze_status, 'paths': paths}, status.HTTP_200_OK), etag)
+
+
+class SolutionCacheView(GenericAPIView):
+    permission_classes = (IsAdminUser,)
+    authentication_class = JSONWebTokenAuthentication
+
+    def get(self, request):
+        return Response(SolutionCache.stats(), status.HTTP_200_OK)
+
 
+def metrics_view(request):
+    return HttpResponse(metrics.render(), content_type='text/plain; version=0.0.4; charset=utf-8')